@@ -0,0 +1,106 @@
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import HTMLResponse
+from starlette.routing import Match
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from argowrapper import logger
+
+
+def parse_route_concurrency_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """parses the ROUTE_CONCURRENCY_LIMITS config value
+
+    Args:
+        value (str): comma separated list of "<route>:<max concurrent>:<max waiting>",
+            with the route path as declared, e.g. "submit:4:8,logs/{workflow_name}:8:16"
+
+    Returns:
+        Dict[str, Tuple[int, int]]: max concurrent and max waiting requests per route
+    """
+    route_limits = {}
+    for route_limit in value.split(","):
+        if not route_limit.strip():
+            continue
+        route, max_concurrent, max_waiting = route_limit.strip().split(":")
+        route_limits[route.strip("/ ")] = (int(max_concurrent), int(max_waiting))
+    return route_limits
+
+
+class RouteConcurrencyLimiter:
+    """
+    Lets at most max_concurrent requests run at a time, and at most max_waiting
+    requests wait for their turn. Any request beyond that is rejected right away
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_waiting = max_waiting
+        self.waiting = 0
+
+    def is_full(self) -> bool:
+        return self.semaphore.locked() and self.waiting >= self.max_waiting
+
+    async def acquire(self) -> None:
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that limits the number of requests each route handles at
+    once, so a burst of slow requests (e.g. /submit or /logs/{workflow_name})
+    cannot starve the cheap ones (e.g. /status/{workflow_name}). Requests are
+    matched to the routes of the app like the router does, so e.g. the
+    long-lived /logs/{workflow_name}/{node_id} streams don't count against the
+    limit of /logs/{workflow_name}. Routes without a configured limit are not limited.
+    """
+
+    def __init__(self, app: ASGIApp, route_limits: Dict[str, Tuple[int, int]]):
+        self.app = app
+        self.limiters = {
+            route: RouteConcurrencyLimiter(max_concurrent, max_waiting)
+            for route, (max_concurrent, max_waiting) in route_limits.items()
+        }
+
+    @staticmethod
+    def _get_route_path(scope: Scope) -> Optional[str]:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path.strip("/")
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.limiters:
+            await self.app(scope, receive, send)
+            return
+
+        route_path = self._get_route_path(scope)
+        limiter = self.limiters.get(route_path)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if limiter.is_full():
+            logger.warning(f"too many concurrent requests to /{route_path}, rejecting")
+            response = HTMLResponse(
+                content="Service is busy, please try again later",
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        await limiter.acquire()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
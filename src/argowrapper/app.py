@@ -1,9 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 
+from argowrapper.admission_control import (
+    AdmissionControlMiddleware,
+    parse_route_concurrency_limits,
+)
+from argowrapper.compression import CompressionMiddleware, parse_compression_encodings
+from argowrapper.constants import (
+    BROTLI_COMPRESSION_LEVEL,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_MIN_SIZE,
+    GZIP_COMPRESSION_LEVEL,
+    ROUTE_CONCURRENCY_LIMITS,
+    WORKER_THREAD_POOL_SIZE,
+)
+
 from .routes import routes
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        WORKER_THREAD_POOL_SIZE
+    )
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=WORKER_THREAD_POOL_SIZE)
+    )
+    yield
+    # close the pooled connections of the engine's http client:
+    await routes.argo_engine.aclose()
+
+
 def get_app():
-    app = FastAPI(title="argo wrapper")
+    app = FastAPI(title="argo wrapper", lifespan=lifespan)
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        route_limits=parse_route_concurrency_limits(ROUTE_CONCURRENCY_LIMITS),
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=parse_compression_encodings(COMPRESSION_ENCODINGS),
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=GZIP_COMPRESSION_LEVEL,
+        brotli_level=BROTLI_COMPRESSION_LEVEL,
+    )
     app.include_router(routes.router)
     return app
@@ -1,6 +1,8 @@
 from typing import Optional
 
-from gen3authz.client.arborist.client import ArboristClient
+from gen3authz.client.arborist.async_client import (
+    ArboristClient as AsyncArboristClient,
+)
 from gen3authz.client.arborist.errors import ArboristError
 
 from argowrapper import logger
@@ -14,10 +16,10 @@ from argowrapper.constants import (
 )
 
 
-class Auth:
+class AsyncAuth:
     """
 
-    A class to interact with arborist for authentication
+    A class to interact with arborist for authentication, without blocking the event loop
 
     """
 
@@ -25,7 +27,7 @@ class Auth:
         if ARGO_ACCESS_METHOD == "NONE":
             pass
         else:
-            self.arborist_client = ArboristClient(logger=logger)
+            self.arborist_client = AsyncArboristClient(logger=logger)
 
     def _parse_jwt(self, token: Optional[str]) -> str:
 
@@ -37,13 +39,34 @@ class Auth:
 
         return parsed_token
 
-    def authenticate(self, token, team_project=None):
+    def _get_auth_requests(self, team_project=None):
+        """
+        Returns the (service, method, resources) of each arborist auth request a
+        user has to pass: access to argo-wrapper itself and, if given, to the team project
+        """
+        auth_requests = [
+            (ARGO_ACCESS_SERVICE, ARGO_ACCESS_METHOD, ARGO_ACCESS_RESOURCES)
+        ]
+        if team_project:
+            auth_requests.append(
+                (TEAM_PROJECT_ACCESS_SERVICE, TEAM_PROJECT_ACCESS_METHOD, team_project)
+            )
+        return auth_requests
+
+    @staticmethod
+    def _is_authorized(auth_requests, auth_results):
+        for (service, _, resources), authorized in zip(auth_requests, auth_results):
+            logger.debug(f"authorized for {service} {resources}: {authorized}")
+        return all(auth_results)
+
+    async def authenticate(self, token, team_project=None):
         """
 
         jwt token authentication for mariner access
 
         Args:
             token (str): authorization token
+            team_project (str): team project the user also needs access to, if any
 
         Returns:
             bool: True if user is authorized to access resources in argo
@@ -53,35 +76,19 @@ class Auth:
             return False
 
         jwt = self._parse_jwt(token)
+        if ARGO_ACCESS_METHOD == "NONE":
+            return True
 
+        auth_requests = self._get_auth_requests(team_project)
         try:
-            if ARGO_ACCESS_METHOD == "NONE":
-                return True
-            else:
-                # check if user has been granted access to argo-wrapper itself:
-                authorized_for_argo = self.arborist_client.auth_request(
-                    jwt,
-                    ARGO_ACCESS_SERVICE,
-                    ARGO_ACCESS_METHOD,
-                    resources=ARGO_ACCESS_RESOURCES,
+            auth_results = [
+                await self.arborist_client.auth_request(
+                    jwt, service, method, resources=resources
                 )
-                logger.debug(f"authorized for argo-wrapper {authorized_for_argo}")
-                if team_project:
-                    # check if user has been granted access to this teamproject:
-                    authorized_for_team_project = self.arborist_client.auth_request(
-                        jwt,
-                        TEAM_PROJECT_ACCESS_SERVICE,
-                        TEAM_PROJECT_ACCESS_METHOD,
-                        resources=team_project,
-                    )
-                    logger.debug(
-                        f"authorized for team-project {authorized_for_team_project}"
-                    )
-
+                for service, method, resources in auth_requests
+            ]
         except ArboristError as exception:
             logger.error(f"error while talking to arborist with error {exception}")
             return False
 
-        return authorized_for_argo and (
-            (not team_project) or authorized_for_team_project
-        )
+        return self._is_authorized(auth_requests, auth_results)
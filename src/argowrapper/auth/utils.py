@@ -1,9 +1,11 @@
-import requests
+import httpx
 from argowrapper import logger
 from argowrapper.constants import COHORT_MIDDLEWARE_URL
 
 
-def get_cohort_ids_for_team_project(token, source_id, team_project):
+async def get_cohort_ids_for_team_project(
+    token, source_id, team_project, http_client: httpx.AsyncClient
+):
     header = {"Authorization": token, "cookie": "fence={}".format(token)}
     api_url = (
         COHORT_MIDDLEWARE_URL
@@ -12,7 +14,7 @@ def get_cohort_ids_for_team_project(token, source_id, team_project):
     api_url = api_url.format(source_id, team_project)
 
     try:
-        r = requests.get(url=api_url, headers=header)
+        r = await http_client.get(url=api_url, headers=header)
         r.raise_for_status()
         team_cohort_info = r.json()
         team_cohort_id_set = set()
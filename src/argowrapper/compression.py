@@ -0,0 +1,165 @@
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from argowrapper import logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# responses that must not be compressed: server-sent events are read as they
+# arrive, and a range's Content-Range refers to the uncompressed log:
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream",)
+UNCOMPRESSED_STATUS_CODES = (204, 206, 304)
+
+
+def parse_compression_encodings(value: str) -> List[str]:
+    """parses the COMPRESSION_ENCODINGS config value, leaving out the ones that are not available"""
+    encodings = []
+    for encoding in value.split(","):
+        encoding = encoding.strip()
+        if not encoding:
+            continue
+        if encoding not in ("br", "gzip"):
+            raise Exception(f"unsupported compression encoding {encoding}")
+        if encoding == "br" and brotli is None:
+            logger.warning("brotli is not installed, br compression disabled")
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+def get_accepted_encodings(accept_encoding: str) -> List[str]:
+    """the encodings of an Accept-Encoding header that the client accepts (q > 0)"""
+    accepted_encodings = []
+    for item in accept_encoding.split(","):
+        encoding, _, parameters = item.partition(";")
+        quality = 1.0
+        if parameters.strip().startswith("q="):
+            try:
+                quality = float(parameters.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted_encodings.append(encoding.strip().lower())
+    return accepted_encodings
+
+
+class _Compressor:
+    """an incremental gzip or brotli compressor"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            # wbits 31 means the gzip format:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """compresses data and flushes it, so streamed chunks reach the client right away"""
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with the first of the configured
+    encodings the client accepts. Responses smaller than minimum_size are sent
+    as is, as compressing them costs more CPU than the bytes it saves. Streamed
+    responses are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: List[str],
+        minimum_size: int,
+        gzip_level: int,
+        brotli_level: int,
+    ):
+        self.app = app
+        self.encodings = encodings
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_level}
+
+    def _get_encoding(self, scope: Scope) -> Optional[str]:
+        accepted_encodings = get_accepted_encodings(
+            Headers(scope=scope).get("Accept-Encoding", "")
+        )
+        for encoding in self.encodings:
+            if encoding in accepted_encodings or "*" in accepted_encodings:
+                return encoding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._get_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # wait for the first body chunk to decide whether to compress:
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if (
+                    "Content-Encoding" in headers
+                    or start_message["status"] in UNCOMPRESSED_STATUS_CODES
+                    or headers.get("Content-Type", "").startswith(
+                        UNCOMPRESSED_CONTENT_TYPES
+                    )
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.levels[encoding])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "ETag" in headers and not headers["ETag"].startswith("W/"):
+                    # the compressed body is a different representation:
+                    headers["ETag"] = "W/" + headers["ETag"]
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+
+            body = compressor.compress(body) if more_body else compressor.finish(body)
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
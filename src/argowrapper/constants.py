@@ -40,10 +40,81 @@ WORKFLOW_KIND: Final = "workflow"
 GEN3_USER_METADATA_LABEL: Final = "gen3username"
 GEN3_TEAM_PROJECT_METADATA_LABEL: Final = "gen3teamproject"
 GEN3_WORKFLOW_PHASE_LABEL: Final = "phase"
+# label the argo controller sets to the phase of a workflow:
+ARGO_WORKFLOW_PHASE_LABEL: Final = "workflows.argoproj.io/phase"
+# label the argo controller sets to "true" once a workflow is finished:
+ARGO_WORKFLOW_COMPLETED_LABEL: Final = "workflows.argoproj.io/completed"
 GEN3_SUBMIT_TIMESTAMP_LABEL: Final = "submittedAt"
+WORKFLOW_TERMINAL_PHASES: Final = ("Succeeded", "Failed", "Error")
 GEN3_NON_VA_WORKFLOW_MONTHLY_CAP: Final = 20
 GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP: Final = 50
 EXCEED_WORKFLOW_LIMIT_ERROR: Final = "User has reached monthly workflow limit."
+# size of the thread pools that run blocking work: anyio's, for sync endpoints and
+# dependencies, and the default executor of the event loop, for asyncio.to_thread
+# (e.g. reading and writing the logs cache):
+WORKER_THREAD_POOL_SIZE: Final = config["DEFAULT"].getint(
+    "WORKER_THREAD_POOL_SIZE", fallback=40
+)
+# max size of the part of a failed step's log that is kept for error interpretation:
+LOG_ERROR_MAX_BYTES: Final = config["DEFAULT"].getint(
+    "LOG_ERROR_MAX_BYTES", fallback=64 * 1024
+)
+LOG_ARTIFACT_CHUNK_SIZE: Final = 64 * 1024
+# max size of the end of a log that is buffered to return its last lines or bytes:
+LOG_TAIL_MAX_BYTES: Final = config["DEFAULT"].getint(
+    "LOG_TAIL_MAX_BYTES", fallback=1024 * 1024
+)
+# json file with the rules to interpret gwas step errors (built-in rules if empty):
+GWAS_ERROR_RULES_FILE: Final = config["DEFAULT"].get(
+    "GWAS_ERROR_RULES_FILE", fallback=""
+)
+# local directory to cache the logs of archived failed workflows in (no caching if empty):
+LOGS_CACHE_DIR: Final = config["DEFAULT"].get("LOGS_CACHE_DIR", fallback="")
+LOGS_CACHE_MAX_BYTES: Final = config["DEFAULT"].getint(
+    "LOGS_CACHE_MAX_BYTES", fallback=100 * 1024 * 1024
+)
+# max number of workflows the in-memory owner labels, location and ETag caches each remember:
+WORKFLOW_CACHES_MAX_SIZE: Final = config["DEFAULT"].getint(
+    "WORKFLOW_CACHES_MAX_SIZE", fallback=10000
+)
+# max number of archived workflow documents remembered in memory. These don't change
+# anymore, so the owner check and the logs of a request can share one fetch:
+ARCHIVED_WORKFLOWS_CACHE_MAX_SIZE: Final = config["DEFAULT"].getint(
+    "ARCHIVED_WORKFLOWS_CACHE_MAX_SIZE", fallback=16
+)
+# number of workflows on a page of GET /workflows if only a continue token is given:
+DEFAULT_WORKFLOWS_PAGE_SIZE: Final = 50
+MAX_WORKFLOWS_PAGE_SIZE: Final = 500
+# max number of workflows in one request to the batch endpoints:
+MAX_WORKFLOWS_BATCH_SIZE: Final = 100
+# number of workflows parsed at a time when streaming a workflow list:
+WORKFLOWS_STREAM_BATCH_SIZE: Final = 50
+# seconds between two polls of a workflow whose status is streamed to clients:
+WORKFLOW_STATUS_POLL_INTERVAL: Final = config["DEFAULT"].getfloat(
+    "WORKFLOW_STATUS_POLL_INTERVAL", fallback=5.0
+)
+# seconds after which an unchanged status stream sends a keep-alive comment:
+WORKFLOW_STATUS_HEARTBEAT_INTERVAL: Final = 15.0
+# response compression: encodings in order of preference ("br" needs brotli installed), none if empty:
+COMPRESSION_ENCODINGS: Final = config["DEFAULT"].get(
+    "COMPRESSION_ENCODINGS", fallback="gzip"
+)
+# responses smaller than this many bytes are not compressed:
+COMPRESSION_MIN_SIZE: Final = config["DEFAULT"].getint(
+    "COMPRESSION_MIN_SIZE", fallback=1024
+)
+GZIP_COMPRESSION_LEVEL: Final = config["DEFAULT"].getint(
+    "GZIP_COMPRESSION_LEVEL", fallback=5
+)
+BROTLI_COMPRESSION_LEVEL: Final = config["DEFAULT"].getint(
+    "BROTLI_COMPRESSION_LEVEL", fallback=4
+)
+# json encoder for responses: "orjson", "json" (the standard library) or "auto" (orjson if installed):
+JSON_ENCODER: Final = config["DEFAULT"].get("JSON_ENCODER", fallback="auto")
+# "<route path>:<max concurrent requests>:<max waiting requests>" entries, comma separated:
+ROUTE_CONCURRENCY_LIMITS: Final = config["DEFAULT"].get(
+    "ROUTE_CONCURRENCY_LIMITS", fallback=""
+)
 
 
 class POD_COMPLETION_STRATEGY(Enum):
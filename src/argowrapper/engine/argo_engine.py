@@ -1,59 +1,57 @@
-import traceback
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Union, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
-import argo_workflows
-from argo_workflows.api import (
-    archived_workflow_service_api,
-    artifact_service_api,
-    workflow_service_api,
-)
 from argo_workflows.exceptions import NotFoundException
-from argo_workflows.model.io_argoproj_workflow_v1alpha1_retry_archived_workflow_request import (
-    IoArgoprojWorkflowV1alpha1RetryArchivedWorkflowRequest,
-)
-from argo_workflows.model.io_argoproj_workflow_v1alpha1_workflow_create_request import (
-    IoArgoprojWorkflowV1alpha1WorkflowCreateRequest,
-)
-from argo_workflows.model.io_argoproj_workflow_v1alpha1_workflow_retry_request import (
-    IoArgoprojWorkflowV1alpha1WorkflowRetryRequest,
-)
-from argo_workflows.model.io_argoproj_workflow_v1alpha1_workflow_terminate_request import (
-    IoArgoprojWorkflowV1alpha1WorkflowTerminateRequest,
-)
 
 from argowrapper import logger
 from argowrapper.constants import (
-    ARGO_HOST,
-    ARGO_NAMESPACE,
     GEN3_SUBMIT_TIMESTAMP_LABEL,
     GEN3_TEAM_PROJECT_METADATA_LABEL,
     GEN3_USER_METADATA_LABEL,
     GEN3_WORKFLOW_PHASE_LABEL,
-    WORKFLOW,
+    WORKFLOW_TERMINAL_PHASES,
     GEN3_NON_VA_WORKFLOW_MONTHLY_CAP,
     GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP,
-    EXCEED_WORKFLOW_LIMIT_ERROR,
+    LOGS_CACHE_DIR,
+    LOGS_CACHE_MAX_BYTES,
+    WORKFLOW_CACHES_MAX_SIZE,
+    ARCHIVED_WORKFLOWS_CACHE_MAX_SIZE,
 )
 from argowrapper.engine.helpers import argo_engine_helper
-from argowrapper.engine.helpers.workflow_factory import WorkflowFactory
+from argowrapper.engine.helpers.lru_dict import LRUDict
+from argowrapper.engine.helpers.workflow_logs_cache import WorkflowLogsCache
+from argowrapper.engine.helpers.workflow_node_index import WorkflowNodeIndex
 from argowrapper.workflows.argo_workflows.gwas import GWAS
-import requests
-import time
-from threading import Lock
 
 
-class ArgoEngine:
+class ArgoEngineBase:
     """
-    A class to interact with argo engine
+    The state and parsing logic of AsyncArgoEngine, i.e. everything that does
+    not talk to argo or to other services itself
 
     Attributes:
         dry_run (bool): is dry run
-        api_instance (WorkFlowServiceAPi): api client to interact with
-        non-archived workflows archive_api_instance (ArchivedWorkflowServiceApi):
-        api client to interact with archived workflows
+        user_locks (Dict): submission lock by username
+        workflow_given_names_cache (Dict): archived workflow given names by uid
+        workflow_location_cache (LRUDict): workflow location by uid
+        workflow_owner_labels_cache (LRUDict): workflow owner labels by (workflow name, uid)
+        workflow_details_etag_cache (LRUDict): ETag of finished workflow details by (uid, summary)
+        archived_workflow_cache (LRUDict): the most recently fetched archived workflows by uid
+        workflow_logs_cache (WorkflowLogsCache): logs of archived failed workflows by uid
     """
 
+    WORKFLOW_DETAILS_FIELDS = "metadata.name,metadata.uid,metadata.annotations,metadata.creationTimestamp,metadata.labels,spec.arguments,spec.shutdown,status.phase,status.progress,status.startedAt,status.finishedAt,status.outputs,status.nodes"
+    # what parse_summary needs, so without the big spec.arguments, status.outputs and status.nodes:
+    WORKFLOW_SUMMARY_FIELDS = "metadata.name,metadata.uid,metadata.annotations,metadata.creationTimestamp,metadata.labels,spec.shutdown,status.phase,status.progress,status.startedAt,status.finishedAt"
+    # the phase plus the nodes the error extraction looks at, in one request:
+    WORKFLOW_LOGS_FIELDS = "status.phase,status.nodes"
+    WORKFLOW_LIST_FIELDS = "items.metadata.name,items.metadata.namespace,items.metadata.annotations,items.metadata.uid,items.metadata.creationTimestamp,items.metadata.labels,items.spec.arguments,items.spec.shutdown,items.status.phase,items.status.startedAt,items.status.finishedAt"
+    MAX_CONCURRENT_ARGO_REQUESTS = 10
+    # how long the next submission of a user waits for the previous one to register in Argo:
+    SUBMISSION_REGISTRATION_SECONDS = 5
+    # TODO: Make this configurable
+    FENCE_USER_INFO_URL = "http://fence-service/user"
+
     def __repr__(self) -> str:
         return f"dry_run={self.dry_run}"
 
@@ -62,302 +60,155 @@ class ArgoEngine:
         self.dry_run = dry_run
         # workflow "given names" by uid cache:
         self.workflow_given_names_cache = {}
-
-        configuration = argo_workflows.Configuration(
-            host=ARGO_HOST,
+        # workflow location ("active_workflow" or "archived_workflow") by uid cache:
+        self.workflow_location_cache = LRUDict(WORKFLOW_CACHES_MAX_SIZE)
+        # workflow owner labels by (workflow name, uid) index:
+        self.workflow_owner_labels_cache = LRUDict(WORKFLOW_CACHES_MAX_SIZE)
+        # ETag of the details of finished workflows by (uid, summary) cache:
+        self.workflow_details_etag_cache = LRUDict(WORKFLOW_CACHES_MAX_SIZE)
+        # the most recently fetched archived workflows by uid, which don't change anymore:
+        self.archived_workflow_cache = LRUDict(ARCHIVED_WORKFLOWS_CACHE_MAX_SIZE)
+        # interpreted logs of archived failed workflows by uid, on local disk:
+        self.workflow_logs_cache = WorkflowLogsCache(
+            LOGS_CACHE_DIR, LOGS_CACHE_MAX_BYTES
         )
-        configuration.verify_ssl = False
 
-        api_client = argo_workflows.ApiClient(configuration)
-        self.api_instance = workflow_service_api.WorkflowServiceApi(api_client)
-        self.archive_api_instance = (
-            archived_workflow_service_api.ArchivedWorkflowServiceApi(api_client)
-        )
-        self.artifact_api_instance = artifact_service_api.ArtifactServiceApi(api_client)
-
-    def _get_workflow_details_dict(self, workflow_name: Optional[str]) -> Dict:
-        return self.api_instance.get_workflow(
-            namespace=ARGO_NAMESPACE,
-            name=workflow_name,
-            fields="metadata.name,metadata.annotations,metadata.creationTimestamp,metadata.labels,spec.arguments,spec.shutdown,status.phase,status.progress,status.startedAt,status.finishedAt,status.outputs,status.nodes",
-            # Note that _check_return_type=False avoids an existing issue with OpenAPI generator.
-            _check_return_type=False,
-        ).to_dict()
-
-    def _get_archived_workflow_details_dict(self, uid: Optional[str]) -> Dict:
+    def _is_active_workflow(self, uid: Optional[str]) -> bool:
+        return self.workflow_location_cache.get(uid) == "active_workflow"
+
+    def _update_workflow_location(
+        self, uid: Optional[str], workflow_type: str, phase: Optional[str] = None
+    ) -> None:
         """
-        Queries the archived workflows api.
-        Raises a argo_workflows.exceptions.NotFoundException if the workflow uid cannot be found
-        as an archived workflow
+        Remembers whether a workflow should be looked up at the workflow endpoint
+        or at the archived workflow endpoint. An active workflow that reached a
+        terminal phase gets archived, so from then on it is looked up as archived.
         """
-        # good to know: this one by default already includes some of the necessary fields like metadata.annotations,metadata.creationTimestamp ...and unfortunately we can't control the fields like in the call to get_workflow() above with "fields" parameter...
-        return self.archive_api_instance.get_archived_workflow(
-            uid=uid, _check_return_type=False
-        ).to_dict()
-
-    def _get_workflow_log_dict(self, workflow_name: str) -> Dict:
-        return self.api_instance.get_workflow(
-            namespace=ARGO_NAMESPACE,
-            name=workflow_name,
-            fields="status.nodes",
-            _check_return_type=False,
-        ).to_dict()
-
-    def _get_workflow_phase(self, workflow_name: str) -> str:
-        phase_return = self.api_instance.get_workflow(
-            namespace=ARGO_NAMESPACE,
-            name=workflow_name,
-            fields="status.phase",
-            _check_return_type=False,
-        ).to_dict()
-        return phase_return["status"].get("phase")
-
-    def _get_workflow_node_artifact(self, uid: str, node_id: str) -> str:
-        return (
-            self.artifact_api_instance.get_output_artifact_by_uid(
-                uid=uid,
-                node_id=node_id,
-                artifact_name="main-logs",
-                _check_return_type=False,
-            )
-            .read()
-            .decode()
-        )
-
-    def _find_first_failed_node(self, uid: str):
-        failed_nodes = []
-        archived_workflow_dict = self._get_archived_workflow_details_dict(uid)
-        archived_workflow_details_nodes = archived_workflow_dict["status"].get("nodes")
-        for node_id, node_info in archived_workflow_details_nodes.items():
-            if node_info.get("phase") == "Failed" and node_info.get("type") == "Retry":
-                start_time = datetime.strptime(
-                    node_info["startedAt"], "%Y-%m-%dT%H:%M:%SZ"
-                )
-                failed_nodes.append((node_id, node_info, start_time))
-        failed_nodes.sort(key=lambda x: x[2])
-        if failed_nodes:
-            first_failed_node = failed_nodes[0][1]
-            return first_failed_node.get("name")
-        else:
-            return None
-
-    def _get_log_errors(
-        self, uid: str, status_nodes_dict: Dict
-    ) -> List[Dict[str, Any]]:
-        errors = []
-        first_failed_node = self._find_first_failed_node(uid)
-
-        if first_failed_node is None:
-            logger.warning(f"No failed nodes found for workflow {uid}")
-            return errors
-
-        for node_id, step in status_nodes_dict.items():
-            if (
-                step.get("phase") in ("Failed", "Error")
-                and step.get("type") == "Pod"
-                and step.get("name") == first_failed_node + "(0)"
-            ):
-                message = []
-                if step.get("message"):
-                    message.append(step["message"])
-
-                node_outputs_mainlog = self._get_workflow_node_artifact(
-                    uid=uid, node_id=node_id
-                )
-                log_lines = node_outputs_mainlog.split("\n")
-                cleaned_log_lines = [line.strip() for line in log_lines]
-                error_line_index = next(
-                    (i for i, line in enumerate(cleaned_log_lines) if "Error" in line),
-                    None,
-                )
-                if error_line_index is not None:
-                    error_message = "\n".join(cleaned_log_lines[error_line_index:])
-                    message.append(error_message)
-                else:
-                    message.append(node_outputs_mainlog)
-
-                node_type = step.get("type")
-                node_step = step.get("displayName").split("(")[0]
-                node_step_template = step.get("templateName")
-                node_phase = step.get("phase")
-                node_outputs_mainlog = self._get_workflow_node_artifact(
-                    uid=uid, node_id=node_id
-                )
-                step_log = "\n".join(message)
-                node_log_interpreted = GWAS.interpret_gwas_workflow_error(
-                    step_name=node_step, step_log=step_log
-                )
-                errors.append(
-                    {
-                        "name": step.get("name"),
-                        "node_type": node_type,
-                        "node_phase": node_phase,
-                        "step_name": node_step,
-                        "step_template": node_step_template,
-                        "error_interpreted": node_log_interpreted,
-                    }
-                )
-            else:
-                pass
-        return errors
-
-    def _get_lock_for_user(self, username: str) -> Lock:
-        if username not in self.user_locks:
-            self.user_locks[username] = Lock()
-        return self.user_locks[username]
-
-    def get_workflow_details(
-        self, workflow_name: Optional[str], uid: Optional[str] = None
-    ) -> Union[Dict[str, Any], str]:
+        if uid is None:
+            return
+        if workflow_type == "active_workflow" and phase in WORKFLOW_TERMINAL_PHASES:
+            workflow_type = "archived_workflow"
+        self.workflow_location_cache[uid] = workflow_type
+
+    def remember_workflow_details_etag(
+        self, uid: Optional[str], etag: str, summary: bool = False
+    ) -> None:
         """
-        Gets the workflow status
-
-        Args:
-            workflow_name (str): name of an active workflow to get status of
-            uid (str): uid of an archived workflow to get status of
-
-        Returns:
-            Union[Dict[str, Any], str]: returns a dict that looks like the below
-                            {
-                                "name": {workflow_name},
-                                "arguments": {workflow_arguments},
-                                "phase": {workflow_status} can be running, failed, succeded, canceling, canceled
-                                "progress": {x/total_steps}, tracks which step the workflow is on
-                                "startedAt": {workflow_start_time},
-                                "finishedAt": {workflow_end_time},
-                                "outputs": {workflow_outputs}
-                            }
+        Remembers the ETag of the details (or summary) of a workflow once it is finished,
+        i.e. looked up as archived, as from then on its details don't change anymore
         """
-        if self.dry_run:
-            return "workflow status"
-        try:
-            archived_workflow_details = self._get_archived_workflow_details_dict(uid)
-            archived_wf_details_parsed = argo_engine_helper.parse_details(
-                archived_workflow_details, "archived_workflow"
-            )
-            return archived_wf_details_parsed
-        except NotFoundException as exception:
-            logger.info(
-                f"Can't find {workflow_name} workflow at archived workflow endpoint"
-            )
-            logger.info(f"Look up {workflow_name} workflow at workflow endpoint")
-            activate_workflow_details_parsed = self._get_workflow_details_dict(
-                workflow_name
-            )
-            return argo_engine_helper.parse_details(
-                activate_workflow_details_parsed, "active_workflow"
-            )
-        except Exception as exception:
-            logger.error(traceback.format_exc())
-            logger.error(
-                f"getting workflow status for {workflow_name} due to {exception}"
-            )
-            raise Exception(
-                f"could not get status of {workflow_name}, workflow does not exist"
-            )
+        if self.workflow_location_cache.get(uid) == "archived_workflow":
+            self.workflow_details_etag_cache[(uid, summary)] = etag
 
-    def cancel_workflow(self, workflow_name: str) -> str:
+    def get_finished_workflow_details_etag(
+        self, workflow_name: Optional[str], uid: Optional[str], summary: bool = False
+    ) -> Optional[str]:
         """
-        Cancels a workflow that's running, this will delete the workflow
-
-        Args:
-            workflow_name (str): name of the workflow whose status will be canceled
-
-        Returns:
-            str : "{workflow_name} canceled sucessfully" if suceed, error message if not
+        Returns the ETag of the details (or summary) of a finished workflow if both it
+        and the owner labels of the workflow are known, so a conditional request for
+        the details can be authorized and answered without fetching them
         """
-        if self.dry_run:
-            logger.info(f"dry run for canceling {workflow_name}")
-            return f"{workflow_name} canceled sucessfully"
-        try:
-            self.api_instance.terminate_workflow(
-                namespace=ARGO_NAMESPACE,
-                name=workflow_name,
-                body=IoArgoprojWorkflowV1alpha1WorkflowTerminateRequest(
-                    name=workflow_name,
-                    namespace=ARGO_NAMESPACE,
-                    _check_type=False,
-                ),
-                _check_return_type=False,
-            )
-            return f"{workflow_name} canceled sucessfully"
-
-        except Exception as exception:
-            logger.error(traceback.format_exc())
-            logger.error(
-                f"could not cancel {workflow_name}, failed with error {exception}"
-            )
-            raise Exception(
-                f"could not cancel {workflow_name} because workflow not found"
-            )
+        if (workflow_name, uid) not in self.workflow_owner_labels_cache:
+            return None
+        return self.workflow_details_etag_cache.get((uid, summary))
 
-    def retry_workflow(self, workflow_name: str, uid: str) -> str:
+    @staticmethod
+    def _check_workflow_reference(
+        workflow_name: Optional[str], uid: Optional[str], workflow: Dict
+    ) -> None:
         """
-        Retries a failed workflow
-
-        Args:
-            workflow_name (str): name of the failed workflow to retry
-            uid (str): uid of an failed AND archived workflow to retry
-        Returns:
-            str : "{workflow_name} retried sucessfully" if suceed, error message if not
+        Raises a argo_workflows.exceptions.NotFoundException if the given workflow
+        dict, looked up by either its name or its uid, is not the workflow with the
+        given name AND uid. Otherwise the name of one workflow could be combined
+        with the uid of another one to pass the access checks of the first one
         """
-        if self.dry_run:
-            logger.info(f"dry run for retrying {workflow_name}")
-            return f"{workflow_name} retried sucessfully"
-        try:
-            # Try the regular retry first (will raise NotFoundException if workflow is not on cluster anymore):
-            self.api_instance.retry_workflow(
-                namespace=ARGO_NAMESPACE,
-                name=workflow_name,
-                body=IoArgoprojWorkflowV1alpha1WorkflowRetryRequest(
-                    name=workflow_name,  # TODO - understand why we repeat these args
-                    namespace=ARGO_NAMESPACE,
-                    _check_type=False,
-                ),
-                _check_return_type=False,
-            )
-            return f"{workflow_name} retried sucessfully"
-        except NotFoundException:
-            # Workflow not found on cluster, try archived workflow endpoint:
-            logger.info(f"Can't find the {workflow_name} workflow on the cluster")
-            logger.info(
-                f"Will try to retry the {workflow_name} workflow using the archived workflow endpoint"
+        metadata = workflow.get("metadata", {})
+        if (workflow_name is not None and metadata.get("name") != workflow_name) or (
+            uid is not None and metadata.get("uid") != uid
+        ):
+            logger.warning(f"workflow {workflow_name} does not have the uid {uid}")
+            raise NotFoundException(
+                reason=f"no workflow {workflow_name} with uid {uid}"
             )
-            self.archive_api_instance.retry_archived_workflow(
-                uid=uid,
-                body=IoArgoprojWorkflowV1alpha1RetryArchivedWorkflowRequest(
-                    uid=uid,
-                    namespace=ARGO_NAMESPACE,
-                    _check_type=False,
-                ),
-                _check_return_type=False,
-            )
-            return f"archived {workflow_name} retried sucessfully"
 
-    def _get_archived_workflow_wf_name_and_team_project(
-        self, archived_workflow_uid
-    ) -> Tuple[str, str, str]:
+    def _index_workflow_owner(
+        self, workflow_name: Optional[str], uid: Optional[str], workflow: Dict
+    ) -> None:
         """
-        Gets the name and team project details for the given archived workflow
-
-        It tries to get it from cache first. If not in cache, it will query the
-        argo endpoint for archived workflows and parse out the 'workflow_name'
-        from the annotations section (aka 'workflow given name' or
-        'workflow name given by the user').
+        Remembers the user and team project labels of a workflow, taken from any
+        parsed workflow dict (details, list item or owner labels). These labels
+        never change after submission, so entries don't need to be invalidated.
+        The workflow name and uid must be the ones argo returned for the workflow,
+        not the ones of the request, as the index is used for access checks.
+        """
+        if workflow_name is None or uid is None:
+            return
+        self.workflow_owner_labels_cache[(workflow_name, uid)] = {
+            GEN3_USER_METADATA_LABEL: workflow.get(GEN3_USER_METADATA_LABEL),
+            GEN3_TEAM_PROJECT_METADATA_LABEL: workflow.get(
+                GEN3_TEAM_PROJECT_METADATA_LABEL
+            ),
+        }
+
+    def _index_submitted_workflow(
+        self,
+        workflow_name: str,
+        created_workflow: Optional[Dict],
+        workflow_yaml: Dict,
+    ) -> None:
+        created_uid = (
+            created_workflow["metadata"].get("uid") if created_workflow else None
+        )
+        self._index_workflow_owner(
+            workflow_name,
+            created_uid,
+            argo_engine_helper.parse_owner_labels(workflow_yaml),
+        )
 
-        **Only for archived workflows**: active workflows return in the /workflows
-        list with their annotations, so this method of getting the annotations
-        via a second request is really only needed as a workaround for archived
-        workflows.
+    def _parse_active_workflow_details(
+        self, active_workflow_details: Dict, uid: Optional[str], summary: bool = False
+    ) -> Dict[str, Any]:
+        # looked up by name, so only remember it for the uid if that's its uid:
+        active_workflow_uid = active_workflow_details["metadata"].get("uid")
+        if active_workflow_uid == uid:
+            self._update_workflow_location(
+                uid, "active_workflow", active_workflow_details["status"].get("phase")
+            )
+        parse = (
+            argo_engine_helper.parse_summary
+            if summary
+            else argo_engine_helper.parse_details
+        )
+        active_wf_details_parsed = parse(active_workflow_details, "active_workflow")
+        self._index_workflow_owner(
+            active_wf_details_parsed["name"],
+            active_workflow_uid,
+            active_wf_details_parsed,
+        )
+        return active_wf_details_parsed
+
+    def _parse_archived_workflow_details(
+        self, archived_workflow_details: Dict, uid: Optional[str], summary: bool = False
+    ) -> Dict[str, Any]:
+        self._update_workflow_location(uid, "archived_workflow")
+        parse = (
+            argo_engine_helper.parse_summary
+            if summary
+            else argo_engine_helper.parse_details
+        )
+        archived_wf_details_parsed = parse(
+            archived_workflow_details, "archived_workflow"
+        )
+        self._index_workflow_owner(
+            archived_wf_details_parsed["name"],
+            archived_workflow_details["metadata"].get("uid"),
+            archived_wf_details_parsed,
+        )
+        return archived_wf_details_parsed
 
-        Returns:
-            str, str: the custom, user given, workflow name found in the annotations
-                 section of the workflow AND the "team project" label
-        """
-        if archived_workflow_uid in self.workflow_given_names_cache:
-            return self.workflow_given_names_cache[archived_workflow_uid]
-        # call workflow details endpoint:
-        workflow_details = self.get_workflow_details(None, archived_workflow_uid)
+    def _cache_archived_workflow_wf_name_and_team_project(
+        self, archived_workflow_uid: str, workflow_details: Dict[str, Any]
+    ) -> Tuple[str, str, str]:
         #  get the workflow given name from the parsed details:
         given_name = workflow_details["wf_name"]
         team_project = workflow_details[GEN3_TEAM_PROJECT_METADATA_LABEL]
@@ -369,67 +220,137 @@ class ArgoEngine:
         )
         return given_name, team_project, gen3username
 
-    def get_workflows_for_team_projects_and_user(
-        self, team_projects: List[str], auth_header: Optional[str]
+    def _parse_workflow_lists(
+        self,
+        label_selector: str,
+        workflow_items: Optional[List[Dict]],
+        archived_workflow_items: Optional[List[Dict]],
+        get_archived_workflow_wf_name_and_team_project: Callable,
     ) -> List[Dict]:
-        team_project_workflows = self.get_workflows_for_team_projects(team_projects)
-        user_workflows = self.get_workflows_for_user(auth_header)
-
-        uniq_workflows = argo_engine_helper.remove_list_duplicate(
-            team_project_workflows, user_workflows
-        )
-        return uniq_workflows
+        """
+        Parses and merges the active and archived workflow list responses
+        """
+        if not (workflow_items or archived_workflow_items):
+            logger.info(
+                f"no active workflows or archived workflow exist for label_selector {label_selector}"
+            )
+            return []
 
-    def get_workflows_for_team_projects(self, team_projects: List[str]) -> List[Dict]:
-        result = []
-        for team_project in team_projects:
-            result.extend(self.get_workflows_for_team_project(team_project))
-        return result
+        if workflow_items:
+            workflow_list = [
+                argo_engine_helper.parse_list_item(
+                    workflow, workflow_type="active_workflow"
+                )
+                for workflow in workflow_items
+            ]
+            for workflow in workflow_items:
+                self._update_workflow_location(
+                    workflow["metadata"].get("uid"),
+                    "active_workflow",
+                    workflow["status"].get("phase"),
+                )
+        else:
+            workflow_list = []
+
+        if archived_workflow_items:
+            archived_workflow_list = [
+                argo_engine_helper.parse_list_item(
+                    workflow,
+                    workflow_type="archived_workflow",
+                    get_archived_workflow_wf_name_and_team_project=get_archived_workflow_wf_name_and_team_project,
+                )
+                for workflow in archived_workflow_items
+            ]
+            for workflow in archived_workflow_items:
+                self._update_workflow_location(
+                    workflow["metadata"].get("uid"), "archived_workflow"
+                )
+        else:
+            archived_workflow_list = []
 
-    def get_workflows_for_team_project(self, team_project: str) -> List[Dict]:
+        uniq_workflow = argo_engine_helper.remove_list_duplicate(
+            workflow_list, archived_workflow_list
+        )
+        for workflow in uniq_workflow:
+            self._index_workflow_owner(workflow["name"], workflow["uid"], workflow)
+        return uniq_workflow
+
+    @staticmethod
+    def _get_failed_pods(
+        uid: str, status_nodes_dict: Dict, max_failed_nodes: Optional[int] = 1
+    ) -> List[Tuple[str, Dict]]:
+        """
+        Returns the (node id, node) pairs of the failed pods of the first
+        max_failed_nodes failed nodes (all if None), in the order the nodes
+        started. Uses the node tree the caller already has
         """
-        Get the list of all workflows for the given team_project. Each item in the list
-        contains the workflow name, its status, start and end time.
+        node_index = WorkflowNodeIndex(status_nodes_dict)
+        failed_nodes = node_index.get_nodes_by_start_time(
+            "Retry", "Failed", max_failed_nodes
+        )
 
-        Args:
-            team_project: team project name
+        if not failed_nodes:
+            logger.warning(f"No failed nodes found for workflow {uid}")
+            return []
 
-        Returns:
-            List[Dict]: List of workflow dictionaries.
+        failed_pods = []
+        for _, failed_node in failed_nodes:
+            # the pod of the first attempt of the failed node:
+            failed_pod = node_index.get_node_by_name(failed_node.get("name") + "(0)")
+            if (
+                failed_pod is not None
+                and failed_pod[1].get("phase") in ("Failed", "Error")
+                and failed_pod[1].get("type") == "Pod"
+            ):
+                failed_pods.append(failed_pod)
+        return failed_pods
+
+    @staticmethod
+    def _get_workflow_logs_cache_key(uid: str, max_failed_nodes: Optional[int]) -> str:
+        if max_failed_nodes == 1:
+            return uid
+        return f"{uid}/{max_failed_nodes or 'all'}"
+
+    @staticmethod
+    def _get_log_error(step: Dict, node_log_excerpt: str) -> Dict[str, Any]:
+        """Interprets the main-logs excerpt (see LogErrorScanner) of a failed Pod node"""
+        message = []
+        if step.get("message"):
+            message.append(step["message"])
+        message.append(node_log_excerpt)
+
+        node_type = step.get("type")
+        node_step = step.get("displayName").split("(")[0]
+        node_step_template = step.get("templateName")
+        node_phase = step.get("phase")
+        step_log = "\n".join(message)
+        node_log_interpreted = GWAS.interpret_gwas_workflow_error(
+            step_name=node_step, step_log=step_log
+        )
+        return {
+            "name": step.get("name"),
+            "node_type": node_type,
+            "node_phase": node_phase,
+            "step_name": node_step,
+            "step_template": node_step_template,
+            "error_interpreted": node_log_interpreted,
+        }
+
+    @staticmethod
+    def _get_user_label_selector(auth_header: Optional[str]) -> str:
+        username = argo_engine_helper.get_username_from_token(auth_header)
+        user_label = argo_engine_helper.convert_gen3username_to_pod_label(username)
+        return f"{GEN3_USER_METADATA_LABEL}={user_label}"
 
-        Raises:
-            raises Exception in case of any error.
-        """
+    @staticmethod
+    def _get_team_project_label_selector(team_project: str) -> str:
         team_project_label = argo_engine_helper.convert_gen3teamproject_to_pod_label(
             team_project
         )
-        label_selector = f"{GEN3_TEAM_PROJECT_METADATA_LABEL}={team_project_label}"
-        workflows = self.get_workflows_for_label_selector(label_selector=label_selector)
-        return workflows
-
-    def get_workflows_for_user(self, auth_header: Optional[str]) -> List[Dict]:
-        """
-        Get the list of all workflows for the current user. Each item in the list
-        contains the workflow name, its status, start and end time.
-        Considers solely the workflows that are labelled with ONLY the user name (so no
-        team project label)
+        return f"{GEN3_TEAM_PROJECT_METADATA_LABEL}={team_project_label}"
 
-        Args:
-            auth_header: authorization header that contains the user's jwt token
-
-        Returns:
-            List[Dict]: List of workflow dictionaries with details of workflows
-            that the user has ran.
-
-        Raises:
-            raises Exception in case of any error.
-        """
-        username = argo_engine_helper.get_username_from_token(auth_header)
-        user_label = argo_engine_helper.convert_gen3username_to_pod_label(username)
-        label_selector = f"{GEN3_USER_METADATA_LABEL}={user_label}"
-        all_user_workflows = self.get_workflows_for_label_selector(
-            label_selector=label_selector
-        )  # TODO - this part would benefit from a system test
+    @staticmethod
+    def _filter_user_only_workflows(all_user_workflows: List[Dict]) -> List[Dict]:
         user_only_workflows = []
         for workflow in all_user_workflows:
             # keep only workflows that have an empty team project:
@@ -437,27 +358,8 @@ class ArgoEngine:
                 user_only_workflows.append(workflow)
         return user_only_workflows
 
-    def get_user_workflows_for_current_month(self, auth_header: str) -> List[Dict]:
-        """
-        Get the list of all succeeded and running workflows the current user owns in the current month.
-        Each item in the list contains the workflow name, its status, start and end time.
-
-        Args:
-            auth_header: authorization header that contains the user's jwt token
-
-        Returns:
-            List[Dict]: List of workflow dictionaries with details of workflows
-            that the user has ran.
-
-        Raises:
-            raises Exception in case of any error.
-        """
-        username = argo_engine_helper.get_username_from_token(auth_header)
-        user_label = argo_engine_helper.convert_gen3username_to_pod_label(username)
-        label_selector = f"{GEN3_USER_METADATA_LABEL}={user_label}"
-        all_user_workflows = self.get_workflows_for_label_selector(
-            label_selector=label_selector
-        )
+    @staticmethod
+    def _filter_current_month_workflows(all_user_workflows: List[Dict]) -> List[Dict]:
         user_monthly_workflows = []
         for workflow in all_user_workflows:
             if workflow[GEN3_WORKFLOW_PHASE_LABEL] in {
@@ -475,210 +377,10 @@ class ArgoEngine:
 
         return user_monthly_workflows
 
-    def get_workflows_for_label_selector(self, label_selector: str) -> List[Dict]:
-        try:
-            workflow_list_return = self.api_instance.list_workflows(
-                namespace=ARGO_NAMESPACE,
-                list_options_label_selector=label_selector,
-                _check_return_type=False,
-                fields="items.metadata.name,items.metadata.namespace,items.metadata.annotations,items.metadata.uid,items.metadata.creationTimestamp,items.metadata.labels,items.spec.arguments,items.spec.shutdown,items.status.phase,items.status.startedAt,items.status.finishedAt",
-            )
-            archived_workflow_list_return = (
-                self.archive_api_instance.list_archived_workflows(
-                    namespace=ARGO_NAMESPACE,
-                    list_options_label_selector=label_selector,
-                    _check_return_type=False,
-                )
-            )
-
-            if not (workflow_list_return.items or archived_workflow_list_return.items):
-                logger.info(
-                    f"no active workflows or archived workflow exist for label_selector {label_selector}"
-                )
-                return []
-
-            if workflow_list_return.items:
-                workflow_list = [
-                    argo_engine_helper.parse_list_item(
-                        workflow, workflow_type="active_workflow"
-                    )
-                    for workflow in workflow_list_return.items
-                ]
-            else:
-                workflow_list = []
-
-            if archived_workflow_list_return.items:
-                archived_workflow_list = [
-                    argo_engine_helper.parse_list_item(
-                        workflow,
-                        workflow_type="archived_workflow",
-                        get_archived_workflow_wf_name_and_team_project=self._get_archived_workflow_wf_name_and_team_project,
-                    )
-                    for workflow in archived_workflow_list_return.items
-                ]
-            else:
-                archived_workflow_list = []
-
-            uniq_workflow = argo_engine_helper.remove_list_duplicate(
-                workflow_list, archived_workflow_list
-            )
-            return uniq_workflow
-
-        except Exception as exception:
-            logger.error(traceback.format_exc())
-            logger.error(
-                f"could not get workflows for label_selector={label_selector}, failed with error {exception}"
-            )
-            raise exception
-
-    def get_workflow_logs(self, workflow_name: str, uid: str) -> List[Dict[str, Any]]:
-        """
-        Gets the workflow errors from failed workflow
-
-        Args:
-            workflow_name (str): name of an active workflow to get status of
-            uid (str): uid of an archived workflow to get status of
-
-        Returns:
-            List[Dict[str, Any]]: returns a list of dictionaries of errors of Retry nodes
-        """
-        try:
-            archived_workflow_dict = self._get_archived_workflow_details_dict(uid)
-            archived_workflow_phase = archived_workflow_dict["status"].get("phase")
-            if archived_workflow_phase in ("Failed", "Error"):
-                archived_workflow_details_nodes = archived_workflow_dict["status"].get(
-                    "nodes"
-                )
-                archived_workflow_errors = self._get_log_errors(
-                    uid=uid, status_nodes_dict=archived_workflow_details_nodes
-                )
-                return archived_workflow_errors
-            else:
-                logger.info(
-                    f"Workflow {workflow_name} with uid {uid} doesn't have a Failed or Error phase"
-                )
-                return []
-
-        except (KeyError, NotFoundException):
-            logger.info(
-                f"Can't find the log of {workflow_name} workflow at archived workflow endpoint"
-            )
-            logger.info(
-                f"Look up the log of {workflow_name} workflow at workflow endpoint"
-            )
-            active_workflow_phase = self._get_workflow_phase(workflow_name)
-            if active_workflow_phase in ("Failed", "Error"):
-                active_workflow_log_return = self._get_workflow_log_dict(workflow_name)
-                active_workflow_details_nodes = active_workflow_log_return[
-                    "status"
-                ].get("nodes")
-                active_workflow_errors = self._get_log_errors(
-                    uid=uid, status_nodes_dict=active_workflow_details_nodes
-                )
-                return active_workflow_errors
-            else:
-                logger.info(
-                    f"Workflow {workflow_name} with uid {uid} doesn't have a Failed or Error phase"
-                )
-                return []
-
-        except Exception as exception:
-            logger.error(traceback.format_exc())
-            logger.error(
-                f"getting workflow status for {workflow_name} due to {exception}"
-            )
-            raise Exception(
-                f"could not get status of {workflow_name}, workflow does not exist"
-            )
-
-    def workflow_submission(self, request_body: Dict, auth_header: Optional[str]):
-        # Lock function so only one can run at a time per user
-        username = argo_engine_helper.get_username_from_token(auth_header)
-        user_lock = self._get_lock_for_user(username)
-        user_lock.acquire()
-
-        try:
-            if "workflow_name" in request_body.keys():
-                logger.info(f"lock acquired for {request_body['workflow_name']}")
-            workflow = WorkflowFactory._get_workflow(
-                ARGO_NAMESPACE, request_body, auth_header, WORKFLOW.GWAS
-            )
-            workflow_yaml = workflow._to_dict()
-
-            reached_monthly_cap = True
-
-            # check if user has a billing id tag:
-            (
-                billing_id,
-                workflow_limit,
-            ) = self.check_user_info_for_billing_id_and_workflow_limit(auth_header)
-
-            # If billing_id exists for user, add it to workflow label and pod metadata
-            # remove gen3-username from pod metadata
-            if billing_id:
-                workflow_yaml["metadata"]["labels"]["billing_id"] = billing_id
-                pod_labels = workflow_yaml["spec"]["podMetadata"]["labels"]
-                pod_labels["billing_id"] = billing_id
-                pod_labels["gen3username"] = ""
-
-            # if user has billing_id (non-VA user), check if they already reached the monthly cap
-            workflow_run, workflow_limit = self.check_user_monthly_workflow_cap(
-                auth_header, billing_id, workflow_limit
-            )
-
-            reached_monthly_cap = workflow_run >= workflow_limit
-
-            # submit workflow:
-            if not reached_monthly_cap:
-                try:
-                    response = self.api_instance.create_workflow(
-                        namespace=ARGO_NAMESPACE,
-                        body=IoArgoprojWorkflowV1alpha1WorkflowCreateRequest(
-                            workflow=workflow_yaml,
-                            _check_return_type=False,
-                            _check_type=False,
-                        ),
-                        _check_return_type=False,
-                        async_req=False,
-                    )
-                    logger.debug(response)
-                except Exception as exception:
-                    logger.error(traceback.format_exc())
-                    logger.error(
-                        f"could not submit workflow, failed with error {exception}"
-                    )
-                    raise exception
-            else:
-                logger.warning(EXCEED_WORKFLOW_LIMIT_ERROR)
-                raise Exception(EXCEED_WORKFLOW_LIMIT_ERROR)
-
-            return workflow.wf_name
-        finally:
-            # Make sure current submission registers in Argo before allowing the next submission
-            time.sleep(5)
-            user_lock.release()
-
-    def check_user_info_for_billing_id_and_workflow_limit(self, request_token):
-        """
-        Check whether user is non-VA user
-        if user is VA-user, do nothing and proceed
-        if user is non-VA user () billing id tag exists in fence user info)
-        add billing Id to argo metadata and pod metadata
-        remove gen3 username from pod metadata
-        """
-
-        header = {"Authorization": request_token}
-        # TODO: Make this configurable
-        url = "http://fence-service/user"
-        try:
-            r = requests.get(url=url, headers=header)
-            r.raise_for_status()
-            user_info = r.json()
-        except Exception as e:
-            exception = Exception("Could not determine user billing info from fence", e)
-            logger.error(exception)
-            traceback.print_exc()
-            raise exception
+    @staticmethod
+    def _parse_billing_id_and_workflow_limit(
+        user_info: Dict,
+    ) -> Tuple[Optional[str], Optional[int]]:
         logger.info("Got user info successfully. Checking for billing id..")
 
         if "tags" in user_info:
@@ -699,31 +401,24 @@ class ArgoEngine:
             logger.info("User info does not have tags")
             return None, None
 
-    def check_user_monthly_workflow_cap(
-        self,
-        request_token: str,
-        billing_id: Optional[int] = None,
-        custom_limit: Optional[int] = None,
-    ):
-        """
-        Query Argo service to see how many workflow runs user already
-        have in the current calendar month. Return number of workflow runs and limit
-        """
-
-        try:
-            current_month_workflows = self.get_user_workflows_for_current_month(
-                request_token
-            )
-            username = argo_engine_helper.get_username_from_token(request_token)
-            if custom_limit and custom_limit > 0:
-                limit = custom_limit
+    @staticmethod
+    def _get_workflow_limit(
+        billing_id: Optional[int] = None, custom_limit: Optional[int] = None
+    ) -> int:
+        if custom_limit and custom_limit > 0:
+            return custom_limit
+        else:
+            if billing_id:
+                return GEN3_NON_VA_WORKFLOW_MONTHLY_CAP
             else:
-                if billing_id:
-                    limit = GEN3_NON_VA_WORKFLOW_MONTHLY_CAP
-                else:
-                    limit = GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP
-            return len(current_month_workflows), limit
-        except Exception as e:
-            logger.error(e)
-            traceback.print_exc()
-            raise e
+                return GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP
+
+    @staticmethod
+    def _add_billing_id(workflow_yaml: Dict, billing_id: Optional[str]) -> None:
+        # If billing_id exists for user, add it to workflow label and pod metadata
+        # remove gen3-username from pod metadata
+        if billing_id:
+            workflow_yaml["metadata"]["labels"]["billing_id"] = billing_id
+            pod_labels = workflow_yaml["spec"]["podMetadata"]["labels"]
+            pod_labels["billing_id"] = billing_id
+            pod_labels["gen3username"] = ""
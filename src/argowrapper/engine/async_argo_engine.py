@@ -0,0 +1,1209 @@
+import asyncio
+import traceback
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+from argo_workflows.exceptions import NotFoundException
+
+from argowrapper import logger
+from argowrapper.constants import (
+    ARGO_HOST,
+    ARGO_NAMESPACE,
+    ARGO_WORKFLOW_COMPLETED_LABEL,
+    EXCEED_WORKFLOW_LIMIT_ERROR,
+    GEN3_TEAM_PROJECT_METADATA_LABEL,
+    LOG_ARTIFACT_CHUNK_SIZE,
+    WORKFLOW,
+    WORKFLOWS_STREAM_BATCH_SIZE,
+)
+from argowrapper.engine.argo_engine import ArgoEngineBase
+from argowrapper.engine.helpers import argo_engine_helper
+from argowrapper.engine.helpers.log_error_scanner import LogErrorScanner
+from argowrapper.engine.helpers.workflow_factory import WorkflowFactory
+from argowrapper.engine.helpers.workflow_list_filter import WorkflowListFilter
+
+
+class AsyncArgoEngine(ArgoEngineBase):
+    """
+    A class to interact with argo engine. It talks to the argo server REST api
+    through one pooled httpx.AsyncClient, so waiting on argo (or fence) does
+    not hold a worker thread.
+
+    Attributes:
+        dry_run (bool): is dry run
+        http_client (httpx.AsyncClient): pooled http client for argo and other services
+    """
+
+    ARGO_REQUEST_TIMEOUT = httpx.Timeout(60.0, pool=None)
+
+    def __init__(self, dry_run: bool = False):
+        super().__init__(dry_run)
+        self.http_client = httpx.AsyncClient(
+            base_url=ARGO_HOST,
+            verify=False,
+            timeout=self.ARGO_REQUEST_TIMEOUT,
+        )
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    @staticmethod
+    def _check_argo_response(response: httpx.Response, reason: str) -> None:
+        """
+        Raises a argo_workflows.exceptions.NotFoundException if argo responded with 404,
+        just like the argo_workflows api clients do
+        """
+        if response.status_code == httpx.codes.NOT_FOUND:
+            raise NotFoundException(status=response.status_code, reason=reason)
+        response.raise_for_status()
+
+    async def _argo_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request to the argo server, see _check_argo_response for error handling
+        """
+        response = await self.http_client.request(method, url, **kwargs)
+        self._check_argo_response(response, response.text)
+        return response
+
+    async def _get_workflow_dict(
+        self, workflow_name: Optional[str], fields: str
+    ) -> Dict:
+        response = await self._argo_request(
+            "GET",
+            f"/api/v1/workflows/{ARGO_NAMESPACE}/{argo_engine_helper.quote_path_segment(workflow_name)}",
+            params={"fields": fields},
+        )
+        return response.json()
+
+    async def _get_workflow_details_dict(self, workflow_name: Optional[str]) -> Dict:
+        return await self._get_workflow_dict(
+            workflow_name, self.WORKFLOW_DETAILS_FIELDS
+        )
+
+    async def _get_archived_workflow_details_dict(self, uid: Optional[str]) -> Dict:
+        """
+        Queries the archived workflows api, unless the archived workflow was fetched
+        recently: it doesn't change anymore, so e.g. the owner check and the logs of a
+        request share one fetch.
+        Raises a argo_workflows.exceptions.NotFoundException if the workflow uid cannot be found
+        as an archived workflow
+        """
+        if uid is None:
+            raise NotFoundException(reason="no uid given for archived workflow")
+        archived_workflow = self.archived_workflow_cache.get(uid)
+        if archived_workflow is None:
+            response = await self._argo_request(
+                "GET",
+                f"/api/v1/archived-workflows/{argo_engine_helper.quote_path_segment(uid)}",
+            )
+            archived_workflow = self.archived_workflow_cache[uid] = response.json()
+        return archived_workflow
+
+    async def _get_workflow_labels_dict(self, workflow_name: Optional[str]) -> Dict:
+        return await self._get_workflow_dict(
+            workflow_name, "metadata.name,metadata.uid,metadata.labels"
+        )
+
+    async def _get_workflow_log_dict(self, workflow_name: str) -> Dict:
+        return await self._get_workflow_dict(workflow_name, self.WORKFLOW_LOGS_FIELDS)
+
+    @staticmethod
+    def _get_node_log_url(uid: str, node_id: str) -> str:
+        return "/artifacts-by-uid/{}/{}/main-logs".format(
+            argo_engine_helper.quote_path_segment(uid),
+            argo_engine_helper.quote_path_segment(node_id),
+        )
+
+    async def _get_workflow_node_log_excerpt(self, uid: str, node_id: str) -> str:
+        """Streams the main-logs artifact of a node through a LogErrorScanner"""
+        log_error_scanner = LogErrorScanner()
+        async with self.http_client.stream(
+            "GET", self._get_node_log_url(uid, node_id)
+        ) as response:
+            self._check_argo_response(response, f"no main-logs for node {node_id}")
+            async for chunk in response.aiter_bytes(LOG_ARTIFACT_CHUNK_SIZE):
+                log_error_scanner.feed(chunk)
+        return log_error_scanner.get_log_excerpt()
+
+    async def open_workflow_node_log(self, uid: str, node_id: str) -> httpx.Response:
+        """
+        Opens the main-logs artifact of a node as a stream. The caller reads it with
+        response.aiter_bytes() and must close it with response.aclose()
+        Raises a argo_workflows.exceptions.NotFoundException if the node has no main-logs
+        """
+        request = self.http_client.build_request(
+            "GET", self._get_node_log_url(uid, node_id)
+        )
+        response = await self.http_client.send(request, stream=True)
+        try:
+            self._check_argo_response(response, f"no main-logs for node {node_id}")
+        except Exception:
+            await response.aclose()
+            raise
+        return response
+
+    async def _get_log_errors(
+        self, uid: str, status_nodes_dict: Dict, max_failed_nodes: Optional[int] = 1
+    ) -> List[Dict[str, Any]]:
+        failed_pods = self._get_failed_pods(uid, status_nodes_dict, max_failed_nodes)
+        node_log_excerpts = await argo_engine_helper.gather_with_concurrency_limit(
+            self.MAX_CONCURRENT_ARGO_REQUESTS,
+            *[
+                self._get_workflow_node_log_excerpt(uid=uid, node_id=node_id)
+                for node_id, _ in failed_pods
+            ],
+        )
+        return [
+            self._get_log_error(step, node_log_excerpt)
+            for (_, step), node_log_excerpt in zip(failed_pods, node_log_excerpts)
+        ]
+
+    async def _get_active_workflow_details(
+        self, workflow_name: Optional[str], uid: Optional[str], summary: bool = False
+    ) -> Dict[str, Any]:
+        if summary:
+            active_workflow_details = await self._get_workflow_dict(
+                workflow_name, self.WORKFLOW_SUMMARY_FIELDS
+            )
+        else:
+            active_workflow_details = await self._get_workflow_details_dict(
+                workflow_name
+            )
+        return self._parse_active_workflow_details(
+            active_workflow_details, uid, summary
+        )
+
+    def _release_user_lock_later(self, user_lock: asyncio.Lock) -> None:
+        """
+        Releases the submission lock of a user once the current submission registered
+        in Argo, so the next submission sees it when checking the monthly cap. The
+        request itself returns right away, so it doesn't hold on to its admission slot
+        """
+        asyncio.get_running_loop().call_later(
+            self.SUBMISSION_REGISTRATION_SECONDS, user_lock.release
+        )
+
+    def _get_lock_for_user(self, username: str) -> asyncio.Lock:
+        if username not in self.user_locks:
+            self.user_locks[username] = asyncio.Lock()
+        return self.user_locks[username]
+
+    async def get_workflow_details(
+        self,
+        workflow_name: Optional[str],
+        uid: Optional[str] = None,
+        summary: bool = False,
+    ) -> Union[Dict[str, Any], str]:
+        """
+        Gets the workflow status
+
+        Args:
+            workflow_name (str): name of an active workflow to get status of
+            uid (str): uid of an archived workflow to get status of
+            summary (bool): only get what parse_summary returns. Only that is fetched
+                for an active workflow (archived workflows can only be fetched as a
+                whole, so they are just parsed that way)
+
+        Returns:
+            Union[Dict[str, Any], str]: returns a dict that looks like the below
+                            {
+                                "name": {workflow_name},
+                                "arguments": {workflow_arguments},
+                                "phase": {workflow_status} can be running, failed, succeded, canceling, canceled
+                                "progress": {x/total_steps}, tracks which step the workflow is on
+                                "startedAt": {workflow_start_time},
+                                "finishedAt": {workflow_end_time},
+                                "outputs": {workflow_outputs}
+                            }
+        """
+        if self.dry_run:
+            return "workflow status"
+        try:
+            if self._is_active_workflow(uid):
+                # known to be running, so skip the archived workflow endpoint:
+                try:
+                    return await self._get_active_workflow_details(
+                        workflow_name, uid, summary
+                    )
+                except NotFoundException:
+                    logger.info(f"{workflow_name} workflow is no longer on the cluster")
+            archived_workflow_details = await self._get_archived_workflow_details_dict(
+                uid
+            )
+            return self._parse_archived_workflow_details(
+                archived_workflow_details, uid, summary
+            )
+        except NotFoundException:
+            logger.info(
+                f"Can't find {workflow_name} workflow at archived workflow endpoint"
+            )
+            logger.info(f"Look up {workflow_name} workflow at workflow endpoint")
+            return await self._get_active_workflow_details(workflow_name, uid, summary)
+        except Exception as exception:
+            logger.error(traceback.format_exc())
+            logger.error(
+                f"getting workflow status for {workflow_name} due to {exception}"
+            )
+            raise Exception(
+                f"could not get status of {workflow_name}, workflow does not exist"
+            )
+
+    async def _list_running_workflow_details_items(
+        self, auth_header: Optional[str], team_projects: Optional[List[str]]
+    ) -> Dict[str, Dict]:
+        """
+        Lists the details of the workflows of the user and of the given team projects
+        that are not finished yet, by uid. The nodes are left out, as the details
+        don't need them and they make up most of the size of a running workflow.
+        """
+        label_selectors = [self._get_user_label_selector(auth_header)]
+        if team_projects:
+            team_project_labels = ",".join(
+                argo_engine_helper.convert_gen3teamproject_to_pod_label(team_project)
+                for team_project in team_projects
+            )
+            label_selectors.append(
+                f"{GEN3_TEAM_PROJECT_METADATA_LABEL} in ({team_project_labels})"
+            )
+        fields = ",".join(
+            f"items.{field}"
+            for field in self.WORKFLOW_DETAILS_FIELDS.split(",")
+            if field != "status.nodes"
+        )
+        responses = await asyncio.gather(
+            *[
+                self._argo_request(
+                    "GET",
+                    f"/api/v1/workflows/{ARGO_NAMESPACE}",
+                    params={
+                        "listOptions.labelSelector": f"{ARGO_WORKFLOW_COMPLETED_LABEL}!=true,{label_selector}",
+                        "fields": fields,
+                    },
+                )
+                for label_selector in label_selectors
+            ]
+        )
+        return {
+            workflow["metadata"].get("uid"): workflow
+            for response in responses
+            for workflow in response.json().get("items") or []
+        }
+
+    async def get_workflows_details(
+        self,
+        workflows: List[Tuple[str, Optional[str]]],
+        auth_header: Optional[str],
+        team_projects: Optional[List[str]] = None,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Gets the details of several workflows, given as (workflow name, uid) pairs.
+        The running ones of the user and of the given team projects are taken from
+        a single list request each, the others are looked up concurrently as in
+        get_workflow_details.
+
+        Returns:
+            List[Union[Dict[str, Any], Exception]]: for each workflow in the same order,
+                its details or the exception raised while getting them
+        """
+        running_workflow_items = {}
+        if any(
+            self.workflow_location_cache.get(uid) != "archived_workflow"
+            for _, uid in workflows
+        ):
+            try:
+                running_workflow_items = (
+                    await self._list_running_workflow_details_items(
+                        auth_header, team_projects
+                    )
+                )
+            except Exception:
+                logger.error(traceback.format_exc())
+                logger.error(
+                    "could not list running workflows, looking them up one by one"
+                )
+
+        async def _get_workflow_details(
+            workflow_name: str, uid: Optional[str]
+        ) -> Union[Dict[str, Any], Exception]:
+            workflow_item = running_workflow_items.get(uid)
+            try:
+                if (
+                    workflow_item is not None
+                    and workflow_item["metadata"].get("name") == workflow_name
+                ):
+                    return self._parse_active_workflow_details(workflow_item, uid)
+                return await self.get_workflow_details(workflow_name, uid)
+            except Exception as exception:
+                return exception
+
+        return await argo_engine_helper.gather_with_concurrency_limit(
+            self.MAX_CONCURRENT_ARGO_REQUESTS,
+            *[
+                _get_workflow_details(workflow_name, uid)
+                for workflow_name, uid in workflows
+            ],
+        )
+
+    async def get_workflow_owner_labels(
+        self, workflow_name: Optional[str], uid: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Gets only the user and team project labels of a workflow. This is much
+        cheaper than get_workflow_details for callers that just need to check
+        who may access the workflow: the labels are usually already known from
+        an earlier list, details or submission call, and otherwise just the
+        metadata.labels of the workflow are requested.
+
+        Args:
+            workflow_name (str): name of an active workflow
+            uid (str): uid of an archived workflow
+
+        Returns:
+            Dict[str, Optional[str]]: {"gen3username": ..., "gen3teamproject": ...}
+
+        Raises:
+            argo_workflows.exceptions.NotFoundException: if there is no workflow with
+                the given name and uid, e.g. because they belong to different workflows
+        """
+        if self.dry_run:
+            return argo_engine_helper.parse_owner_labels({})
+        if (workflow_name, uid) in self.workflow_owner_labels_cache:
+            return self.workflow_owner_labels_cache[(workflow_name, uid)]
+        try:
+            if self.workflow_location_cache.get(uid) == "archived_workflow":
+                # known to be archived, so skip the workflow endpoint:
+                workflow_labels = await self._get_archived_workflow_details_dict(uid)
+            else:
+                workflow_labels = await self._get_workflow_labels_dict(workflow_name)
+        except NotFoundException:
+            logger.info(f"Can't find {workflow_name} workflow at workflow endpoint")
+            logger.info(
+                f"Look up {workflow_name} workflow at archived workflow endpoint"
+            )
+            workflow_labels = await self._get_archived_workflow_details_dict(uid)
+            self._update_workflow_location(uid, "archived_workflow")
+        except Exception as exception:
+            logger.error(traceback.format_exc())
+            logger.error(
+                f"getting workflow labels for {workflow_name} due to {exception}"
+            )
+            raise Exception(
+                f"could not get labels of {workflow_name}, workflow does not exist"
+            )
+        self._check_workflow_reference(workflow_name, uid, workflow_labels)
+        owner_labels = argo_engine_helper.parse_owner_labels(workflow_labels)
+        self._index_workflow_owner(workflow_name, uid, owner_labels)
+        return owner_labels
+
+    async def get_workflows_owner_labels(
+        self, workflows: List[Tuple[str, Optional[str]]]
+    ) -> List[Union[Dict[str, Optional[str]], Exception]]:
+        """
+        Gets the owner labels of several workflows, given as (workflow name, uid) pairs.
+        Those not indexed yet are taken from a single list request of the running
+        workflows, the others are looked up concurrently as in get_workflow_owner_labels.
+
+        Returns:
+            List[Union[Dict[str, Optional[str]], Exception]]: for each workflow in the
+                same order, its owner labels or the exception raised while getting them
+        """
+        running_workflow_items = {}
+        if not self.dry_run and any(
+            workflow not in self.workflow_owner_labels_cache for workflow in workflows
+        ):
+            try:
+                response = await self._argo_request(
+                    "GET",
+                    f"/api/v1/workflows/{ARGO_NAMESPACE}",
+                    params={
+                        "listOptions.labelSelector": f"{ARGO_WORKFLOW_COMPLETED_LABEL}!=true",
+                        "fields": "items.metadata.name,items.metadata.uid,items.metadata.labels",
+                    },
+                )
+                running_workflow_items = {
+                    workflow["metadata"].get("name"): workflow
+                    for workflow in response.json().get("items") or []
+                }
+            except Exception:
+                logger.error(traceback.format_exc())
+                logger.error(
+                    "could not list running workflows, looking them up one by one"
+                )
+
+        async def _get_workflow_owner_labels(
+            workflow_name: str, uid: Optional[str]
+        ) -> Union[Dict[str, Optional[str]], Exception]:
+            workflow_item = running_workflow_items.get(workflow_name)
+            try:
+                if (
+                    workflow_item is not None
+                    and (workflow_name, uid) not in self.workflow_owner_labels_cache
+                    and uid in (None, workflow_item["metadata"].get("uid"))
+                ):
+                    owner_labels = argo_engine_helper.parse_owner_labels(workflow_item)
+                    self._index_workflow_owner(
+                        workflow_name,
+                        workflow_item["metadata"].get("uid"),
+                        owner_labels,
+                    )
+                    return owner_labels
+                return await self.get_workflow_owner_labels(workflow_name, uid)
+            except Exception as exception:
+                return exception
+
+        return await argo_engine_helper.gather_with_concurrency_limit(
+            self.MAX_CONCURRENT_ARGO_REQUESTS,
+            *[
+                _get_workflow_owner_labels(workflow_name, uid)
+                for workflow_name, uid in workflows
+            ],
+        )
+
+    async def cancel_workflow(self, workflow_name: str) -> str:
+        """
+        Cancels a workflow that's running, this will delete the workflow
+
+        Args:
+            workflow_name (str): name of the workflow whose status will be canceled
+
+        Returns:
+            str : "{workflow_name} canceled sucessfully" if suceed, error message if not
+        """
+        if self.dry_run:
+            logger.info(f"dry run for canceling {workflow_name}")
+            return f"{workflow_name} canceled sucessfully"
+        try:
+            await self._argo_request(
+                "PUT",
+                f"/api/v1/workflows/{ARGO_NAMESPACE}/{argo_engine_helper.quote_path_segment(workflow_name)}/terminate",
+                json={"name": workflow_name, "namespace": ARGO_NAMESPACE},
+            )
+            return f"{workflow_name} canceled sucessfully"
+
+        except Exception as exception:
+            logger.error(traceback.format_exc())
+            logger.error(
+                f"could not cancel {workflow_name}, failed with error {exception}"
+            )
+            raise Exception(
+                f"could not cancel {workflow_name} because workflow not found"
+            )
+
+    async def cancel_workflows(
+        self, workflow_names: List[str]
+    ) -> List[Union[str, Exception]]:
+        """
+        Cancels several running workflows concurrently, see cancel_workflow
+
+        Returns:
+            List[Union[str, Exception]]: for each workflow in the same order, the
+                success message or the exception raised while canceling it
+        """
+
+        async def _cancel_workflow(workflow_name: str) -> Union[str, Exception]:
+            try:
+                return await self.cancel_workflow(workflow_name)
+            except Exception as exception:
+                return exception
+
+        return await argo_engine_helper.gather_with_concurrency_limit(
+            self.MAX_CONCURRENT_ARGO_REQUESTS,
+            *[_cancel_workflow(workflow_name) for workflow_name in workflow_names],
+        )
+
+    async def retry_workflow(self, workflow_name: str, uid: str) -> str:
+        """
+        Retries a failed workflow
+
+        Args:
+            workflow_name (str): name of the failed workflow to retry
+            uid (str): uid of an failed AND archived workflow to retry
+        Returns:
+            str : "{workflow_name} retried sucessfully" if suceed, error message if not
+        """
+        if self.dry_run:
+            logger.info(f"dry run for retrying {workflow_name}")
+            return f"{workflow_name} retried sucessfully"
+        try:
+            # Try the regular retry first (will raise NotFoundException if workflow is not on cluster anymore):
+            await self._argo_request(
+                "PUT",
+                f"/api/v1/workflows/{ARGO_NAMESPACE}/{argo_engine_helper.quote_path_segment(workflow_name)}/retry",
+                json={"name": workflow_name, "namespace": ARGO_NAMESPACE},
+            )
+            return f"{workflow_name} retried sucessfully"
+        except NotFoundException:
+            # Workflow not found on cluster, try archived workflow endpoint:
+            logger.info(f"Can't find the {workflow_name} workflow on the cluster")
+            logger.info(
+                f"Will try to retry the {workflow_name} workflow using the archived workflow endpoint"
+            )
+            await self._argo_request(
+                "PUT",
+                f"/api/v1/archived-workflows/{argo_engine_helper.quote_path_segment(uid)}/retry",
+                json={"uid": uid, "namespace": ARGO_NAMESPACE},
+            )
+            # the archived workflow is replaced once the retried one finishes:
+            self.archived_workflow_cache.pop(uid, None)
+            return f"archived {workflow_name} retried sucessfully"
+
+    async def _get_archived_workflow_wf_name_and_team_project(
+        self, archived_workflow_uid
+    ) -> Tuple[str, str, str]:
+        """
+        Gets the name and team project details for the given archived workflow
+
+        It tries to get it from cache first. If not in cache, it will query the
+        argo endpoint for archived workflows and parse out the 'workflow_name'
+        from the annotations section (aka 'workflow given name' or
+        'workflow name given by the user').
+
+        **Only for archived workflows**: active workflows return in the /workflows
+        list with their annotations, so this method of getting the annotations
+        via a second request is really only needed as a workaround for archived
+        workflows.
+
+        Returns:
+            str, str: the custom, user given, workflow name found in the annotations
+                 section of the workflow AND the "team project" label
+        """
+        if archived_workflow_uid in self.workflow_given_names_cache:
+            return self.workflow_given_names_cache[archived_workflow_uid]
+        # call workflow details endpoint:
+        workflow_details = await self.get_workflow_details(None, archived_workflow_uid)
+        return self._cache_archived_workflow_wf_name_and_team_project(
+            archived_workflow_uid, workflow_details
+        )
+
+    async def get_workflows_for_team_projects_and_user(
+        self, team_projects: List[str], auth_header: Optional[str]
+    ) -> List[Dict]:
+        team_project_workflows, user_workflows = await asyncio.gather(
+            self.get_workflows_for_team_projects(team_projects),
+            self.get_workflows_for_user(auth_header),
+        )
+
+        uniq_workflows = argo_engine_helper.remove_list_duplicate(
+            team_project_workflows, user_workflows
+        )
+        return uniq_workflows
+
+    async def get_workflows_for_team_projects(
+        self, team_projects: List[str]
+    ) -> List[Dict]:
+        result = []
+        for team_project_workflows in await asyncio.gather(
+            *[
+                self.get_workflows_for_team_project(team_project)
+                for team_project in team_projects
+            ]
+        ):
+            result.extend(team_project_workflows)
+        return result
+
+    async def get_workflows_for_team_project(self, team_project: str) -> List[Dict]:
+        """
+        Get the list of all workflows for the given team_project. Each item in the list
+        contains the workflow name, its status, start and end time.
+
+        Args:
+            team_project: team project name
+
+        Returns:
+            List[Dict]: List of workflow dictionaries.
+
+        Raises:
+            raises Exception in case of any error.
+        """
+        label_selector = self._get_team_project_label_selector(team_project)
+        return await self.get_workflows_for_label_selector(
+            label_selector=label_selector
+        )
+
+    async def get_workflows_for_user(self, auth_header: Optional[str]) -> List[Dict]:
+        """
+        Get the list of all workflows for the current user. Each item in the list
+        contains the workflow name, its status, start and end time.
+        Considers solely the workflows that are labelled with ONLY the user name (so no
+        team project label)
+
+        Args:
+            auth_header: authorization header that contains the user's jwt token
+
+        Returns:
+            List[Dict]: List of workflow dictionaries with details of workflows
+            that the user has ran.
+
+        Raises:
+            raises Exception in case of any error.
+        """
+        label_selector = self._get_user_label_selector(auth_header)
+        all_user_workflows = await self.get_workflows_for_label_selector(
+            label_selector=label_selector
+        )
+        return self._filter_user_only_workflows(all_user_workflows)
+
+    async def get_user_workflows_for_current_month(
+        self, auth_header: str
+    ) -> List[Dict]:
+        """
+        Get the list of all succeeded and running workflows the current user owns in the current month.
+        Each item in the list contains the workflow name, its status, start and end time.
+
+        Args:
+            auth_header: authorization header that contains the user's jwt token
+
+        Returns:
+            List[Dict]: List of workflow dictionaries with details of workflows
+            that the user has ran.
+
+        Raises:
+            raises Exception in case of any error.
+        """
+        label_selector = self._get_user_label_selector(auth_header)
+        all_user_workflows = await self.get_workflows_for_label_selector(
+            label_selector=label_selector
+        )
+        return self._filter_current_month_workflows(all_user_workflows)
+
+    async def _list_workflow_items(self, label_selector: str) -> Optional[List[Dict]]:
+        response = await self._argo_request(
+            "GET",
+            f"/api/v1/workflows/{ARGO_NAMESPACE}",
+            params={
+                "listOptions.labelSelector": label_selector,
+                "fields": self.WORKFLOW_LIST_FIELDS,
+            },
+        )
+        return response.json().get("items")
+
+    async def _list_archived_workflow_items(
+        self, label_selector: str
+    ) -> Optional[List[Dict]]:
+        response = await self._argo_request(
+            "GET",
+            "/api/v1/archived-workflows",
+            params={
+                "namespace": ARGO_NAMESPACE,
+                "listOptions.labelSelector": label_selector,
+            },
+        )
+        return response.json().get("items")
+
+    async def get_workflows_for_label_selector(self, label_selector: str) -> List[Dict]:
+        try:
+            workflow_items, archived_workflow_items = await asyncio.gather(
+                self._list_workflow_items(label_selector),
+                self._list_archived_workflow_items(label_selector),
+            )
+            # archived list items lack the annotations, so fetch the details of the
+            # ones not seen before concurrently instead of one by one while parsing:
+            await argo_engine_helper.gather_with_concurrency_limit(
+                self.MAX_CONCURRENT_ARGO_REQUESTS,
+                *[
+                    self._get_archived_workflow_wf_name_and_team_project(
+                        workflow["metadata"].get("uid")
+                    )
+                    for workflow in archived_workflow_items or []
+                ],
+            )
+            return self._parse_workflow_lists(
+                label_selector,
+                workflow_items,
+                archived_workflow_items,
+                self.workflow_given_names_cache.__getitem__,
+            )
+
+        except Exception as exception:
+            logger.error(traceback.format_exc())
+            logger.error(
+                f"could not get workflows for label_selector={label_selector}, failed with error {exception}"
+            )
+            raise exception
+
+    async def _parse_workflow_page_candidates(
+        self,
+        candidates: List[Dict[str, Any]],
+        workflow_list_filter: WorkflowListFilter,
+    ) -> List[Dict]:
+        """
+        Parses the raw list items of a page, leaving out the user's workflows that
+        belong to a team project not asked for (see get_workflows_for_user) and the
+        workflows that don't match the filter
+        """
+        await argo_engine_helper.gather_with_concurrency_limit(
+            self.MAX_CONCURRENT_ARGO_REQUESTS,
+            *[
+                self._get_archived_workflow_wf_name_and_team_project(
+                    candidate["item"]["metadata"].get("uid")
+                )
+                for candidate in candidates
+                if candidate["workflow_type"] == "archived_workflow"
+            ],
+        )
+        workflows = []
+        for candidate in candidates:
+            workflow_item = candidate["item"]
+            if candidate["workflow_type"] == "active_workflow":
+                workflow = argo_engine_helper.parse_list_item(
+                    workflow_item, workflow_type="active_workflow"
+                )
+                self._update_workflow_location(
+                    workflow["uid"],
+                    "active_workflow",
+                    workflow_item["status"].get("phase"),
+                )
+            else:
+                workflow = argo_engine_helper.parse_list_item(
+                    workflow_item,
+                    workflow_type="archived_workflow",
+                    get_archived_workflow_wf_name_and_team_project=self.workflow_given_names_cache.__getitem__,
+                )
+                self._update_workflow_location(workflow["uid"], "archived_workflow")
+            if (
+                not candidate["from_team_project"]
+                and workflow[GEN3_TEAM_PROJECT_METADATA_LABEL]
+            ):
+                continue
+            self._index_workflow_owner(workflow["name"], workflow["uid"], workflow)
+            if workflow_list_filter.matches(workflow):
+                workflows.append(workflow)
+        return workflows
+
+    async def _get_workflow_list_candidates(
+        self,
+        team_projects: Optional[List[str]],
+        auth_header: Optional[str],
+        continue_token: Optional[str],
+        workflow_list_filter: WorkflowListFilter,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lists the workflows of the given team projects and of the user, and returns
+        their raw list items in the order of the filter, starting after the position
+        in the continue token
+        Raises a ValueError if the continue token is not valid
+        """
+        last_sort_key = (
+            argo_engine_helper.decode_continue_token(continue_token)
+            if continue_token
+            else None
+        )
+        label_selectors = [self._get_user_label_selector(auth_header)] + [
+            self._get_team_project_label_selector(team_project)
+            for team_project in team_projects or []
+        ]
+        item_lists = await asyncio.gather(
+            *[
+                list_items(workflow_list_filter.get_label_selector(label_selector))
+                for label_selector in label_selectors
+                for list_items in (
+                    self._list_workflow_items,
+                    self._list_archived_workflow_items,
+                )
+            ]
+        )
+
+        # merge the lists, keeping the active item of workflows that are in both:
+        candidates_by_uid: Dict[str, Dict[str, Any]] = {}
+        for index, workflow_items in enumerate(item_lists):
+            workflow_type = "archived_workflow" if index % 2 else "active_workflow"
+            # the first two lists are the ones of the user label selector:
+            from_team_project = index >= 2
+            for workflow_item in workflow_items or []:
+                if not workflow_list_filter.matches_list_item(workflow_item):
+                    continue
+                uid = workflow_item["metadata"].get("uid")
+                candidate = candidates_by_uid.get(uid)
+                if candidate is None:
+                    candidates_by_uid[uid] = candidate = {
+                        "item": workflow_item,
+                        "workflow_type": workflow_type,
+                        "from_team_project": False,
+                    }
+                elif workflow_type == "active_workflow":
+                    candidate["item"] = workflow_item
+                    candidate["workflow_type"] = workflow_type
+                candidate["from_team_project"] |= from_team_project
+
+        for candidate in candidates_by_uid.values():
+            candidate["sort_key"] = workflow_list_filter.get_sort_key(candidate["item"])
+        candidates = sorted(
+            candidates_by_uid.values(),
+            key=lambda candidate: candidate["sort_key"],
+            reverse=workflow_list_filter.descending,
+        )
+        if last_sort_key is not None:
+            candidates = [
+                candidate
+                for candidate in candidates
+                if (
+                    candidate["sort_key"] < last_sort_key
+                    if workflow_list_filter.descending
+                    else candidate["sort_key"] > last_sort_key
+                )
+            ]
+        return candidates
+
+    async def get_workflows_page(
+        self,
+        team_projects: Optional[List[str]],
+        auth_header: Optional[str],
+        limit: Optional[int],
+        continue_token: Optional[str] = None,
+        workflow_list_filter: Optional[WorkflowListFilter] = None,
+    ) -> Dict[str, Any]:
+        """
+        Gets one page of the workflows of the given team projects and of the user's
+        own workflows without team project, in the order of the filter (by default
+        newest first, by creationTimestamp, then uid).
+        Only the workflows on the page are parsed, so the archived workflows after it
+        are not looked up. The returned "continue" token gets the next page, it is None
+        on the last page. As the token holds the position of the last workflow of the
+        page, pages never repeat or skip workflows, also when workflows are added.
+
+        Args:
+            team_projects (Optional[List[str]]): team projects to list the workflows of
+            auth_header (Optional[str]): authorization header of the user
+            limit (Optional[int]): max number of workflows on the page, no limit if None
+            continue_token (Optional[str]): token returned with the previous page, if any
+            workflow_list_filter (Optional[WorkflowListFilter]): filters and sort order
+
+        Returns:
+            Dict[str, Any]: the "items" of the page and the "continue" token
+
+        Raises:
+            ValueError: if the continue token is not valid
+        """
+        workflow_list_filter = workflow_list_filter or WorkflowListFilter()
+        candidates = await self._get_workflow_list_candidates(
+            team_projects, auth_header, continue_token, workflow_list_filter
+        )
+
+        # parse in batches until the page is full, as some may be left out:
+        page: List[Dict] = []
+        consumed = 0
+        while (limit is None or len(page) < limit) and consumed < len(candidates):
+            batch = candidates[
+                consumed : (
+                    len(candidates) if limit is None else consumed + limit - len(page)
+                )
+            ]
+            consumed += len(batch)
+            page.extend(
+                await self._parse_workflow_page_candidates(batch, workflow_list_filter)
+            )
+
+        next_continue_token = None
+        if consumed < len(candidates):
+            next_continue_token = argo_engine_helper.encode_continue_token(
+                candidates[consumed - 1]["sort_key"]
+            )
+        return {"items": page, "continue": next_continue_token}
+
+    async def get_workflows_stream(
+        self,
+        team_projects: Optional[List[str]],
+        auth_header: Optional[str],
+        workflow_list_filter: Optional[WorkflowListFilter] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Lists the same workflows as get_workflows_page without a limit, but returns an
+        iterator that parses them a batch of WORKFLOWS_STREAM_BATCH_SIZE at a time, so
+        the first workflows can be sent while the next archived ones are looked up.
+        Listing errors are raised here, before the first workflow is yielded.
+        """
+        workflow_list_filter = workflow_list_filter or WorkflowListFilter()
+        candidates = await self._get_workflow_list_candidates(
+            team_projects, auth_header, None, workflow_list_filter
+        )
+
+        async def _iter_workflows() -> AsyncIterator[Dict]:
+            for batch_start in range(0, len(candidates), WORKFLOWS_STREAM_BATCH_SIZE):
+                for workflow in await self._parse_workflow_page_candidates(
+                    candidates[batch_start : batch_start + WORKFLOWS_STREAM_BATCH_SIZE],
+                    workflow_list_filter,
+                ):
+                    yield workflow
+
+        return _iter_workflows()
+
+    async def get_workflow_logs(
+        self, workflow_name: str, uid: str, max_failed_nodes: Optional[int] = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Gets the workflow errors from failed workflow
+
+        Args:
+            workflow_name (str): name of an active workflow to get status of
+            uid (str): uid of an archived workflow to get status of
+            max_failed_nodes (Optional[int]): number of failed Retry nodes to get the errors of,
+                in the order they started, or None for all of them
+
+        Returns:
+            List[Dict[str, Any]]: returns a list of dictionaries of errors of Retry nodes
+        """
+        workflow_logs_cache_key = self._get_workflow_logs_cache_key(
+            uid, max_failed_nodes
+        )
+        try:
+            cached_workflow_logs = await asyncio.to_thread(
+                self.workflow_logs_cache.get, workflow_logs_cache_key
+            )
+            if cached_workflow_logs is not None:
+                return cached_workflow_logs
+            if self._is_active_workflow(uid):
+                # known to be running, so skip the archived workflow endpoint:
+                try:
+                    return await self._get_active_workflow_logs(
+                        workflow_name, uid, max_failed_nodes
+                    )
+                except NotFoundException:
+                    logger.info(f"{workflow_name} workflow is no longer on the cluster")
+            archived_workflow_dict = await self._get_archived_workflow_details_dict(uid)
+            self._update_workflow_location(uid, "archived_workflow")
+            archived_workflow_phase = archived_workflow_dict["status"].get("phase")
+            if archived_workflow_phase in ("Failed", "Error"):
+                archived_workflow_details_nodes = archived_workflow_dict["status"].get(
+                    "nodes"
+                )
+                archived_workflow_errors = await self._get_log_errors(
+                    uid=uid,
+                    status_nodes_dict=archived_workflow_details_nodes,
+                    max_failed_nodes=max_failed_nodes,
+                )
+                # archived workflows don't change anymore:
+                await asyncio.to_thread(
+                    self.workflow_logs_cache.put,
+                    workflow_logs_cache_key,
+                    archived_workflow_errors,
+                )
+                return archived_workflow_errors
+            else:
+                logger.info(
+                    f"Workflow {workflow_name} with uid {uid} doesn't have a Failed or Error phase"
+                )
+                return []
+
+        except (KeyError, NotFoundException):
+            logger.info(
+                f"Can't find the log of {workflow_name} workflow at archived workflow endpoint"
+            )
+            logger.info(
+                f"Look up the log of {workflow_name} workflow at workflow endpoint"
+            )
+            return await self._get_active_workflow_logs(
+                workflow_name, uid, max_failed_nodes
+            )
+
+        except Exception as exception:
+            logger.error(traceback.format_exc())
+            logger.error(
+                f"getting workflow status for {workflow_name} due to {exception}"
+            )
+            raise Exception(
+                f"could not get status of {workflow_name}, workflow does not exist"
+            )
+
+    async def _get_active_workflow_logs(
+        self, workflow_name: str, uid: str, max_failed_nodes: Optional[int] = 1
+    ) -> List[Dict[str, Any]]:
+        active_workflow_log_return = await self._get_workflow_log_dict(workflow_name)
+        active_workflow_phase = active_workflow_log_return["status"].get("phase")
+        self._update_workflow_location(uid, "active_workflow", active_workflow_phase)
+        if active_workflow_phase in ("Failed", "Error"):
+            active_workflow_details_nodes = active_workflow_log_return["status"].get(
+                "nodes"
+            )
+            return await self._get_log_errors(
+                uid=uid,
+                status_nodes_dict=active_workflow_details_nodes,
+                max_failed_nodes=max_failed_nodes,
+            )
+        else:
+            logger.info(
+                f"Workflow {workflow_name} with uid {uid} doesn't have a Failed or Error phase"
+            )
+            return []
+
+    async def workflow_submission(self, request_body: Dict, auth_header: Optional[str]):
+        # Lock function so only one can run at a time per user
+        username = argo_engine_helper.get_username_from_token(auth_header)
+        user_lock = self._get_lock_for_user(username)
+        await user_lock.acquire()
+
+        try:
+            if "workflow_name" in request_body.keys():
+                logger.info(f"lock acquired for {request_body['workflow_name']}")
+            workflow = WorkflowFactory._get_workflow(
+                ARGO_NAMESPACE, request_body, auth_header, WORKFLOW.GWAS
+            )
+            workflow_yaml = workflow._to_dict()
+
+            # check if user has a billing id tag:
+            (
+                billing_id,
+                workflow_limit,
+            ) = await self.check_user_info_for_billing_id_and_workflow_limit(
+                auth_header
+            )
+            self._add_billing_id(workflow_yaml, billing_id)
+
+            # if user has billing_id (non-VA user), check if they already reached the monthly cap
+            workflow_run, workflow_limit = await self.check_user_monthly_workflow_cap(
+                auth_header, billing_id, workflow_limit
+            )
+
+            reached_monthly_cap = workflow_run >= workflow_limit
+
+            # submit workflow:
+            if not reached_monthly_cap:
+                try:
+                    response = await self._argo_request(
+                        "POST",
+                        f"/api/v1/workflows/{ARGO_NAMESPACE}",
+                        json={"workflow": workflow_yaml},
+                    )
+                    created_workflow = response.json()
+                    logger.debug(created_workflow)
+                    self._index_submitted_workflow(
+                        workflow.wf_name, created_workflow, workflow_yaml
+                    )
+                except Exception as exception:
+                    logger.error(traceback.format_exc())
+                    logger.error(
+                        f"could not submit workflow, failed with error {exception}"
+                    )
+                    raise exception
+            else:
+                logger.warning(EXCEED_WORKFLOW_LIMIT_ERROR)
+                raise Exception(EXCEED_WORKFLOW_LIMIT_ERROR)
+
+            return workflow.wf_name
+        finally:
+            self._release_user_lock_later(user_lock)
+
+    async def workflow_batch_submission(
+        self, request_bodies: List[Dict], auth_header: Optional[str]
+    ) -> List[Union[str, Exception]]:
+        """
+        Submits several workflows for the same user, see workflow_submission. The
+        user lock is taken, and the billing id and monthly cap are checked, once for
+        the whole batch. Workflows beyond the remaining monthly cap are not submitted,
+        the others are created concurrently.
+
+        Returns:
+            List[Union[str, Exception]]: for each request body in the same order, the
+                name of the submitted workflow or the exception raised while submitting it
+        """
+        username = argo_engine_helper.get_username_from_token(auth_header)
+        user_lock = self._get_lock_for_user(username)
+        await user_lock.acquire()
+
+        try:
+            logger.info(f"lock acquired for a batch of {len(request_bodies)} workflows")
+            workflows = []
+            for request_body in request_bodies:
+                try:
+                    workflow = WorkflowFactory._get_workflow(
+                        ARGO_NAMESPACE, request_body, auth_header, WORKFLOW.GWAS
+                    )
+                    workflows.append((workflow, workflow._to_dict()))
+                except Exception as exception:
+                    logger.error(traceback.format_exc())
+                    workflows.append(exception)
+
+            (
+                billing_id,
+                workflow_limit,
+            ) = await self.check_user_info_for_billing_id_and_workflow_limit(
+                auth_header
+            )
+            workflow_run, workflow_limit = await self.check_user_monthly_workflow_cap(
+                auth_header, billing_id, workflow_limit
+            )
+            remaining_workflows = workflow_limit - workflow_run
+
+            async def _submit_workflow(workflow_and_yaml) -> Union[str, Exception]:
+                if isinstance(workflow_and_yaml, Exception):
+                    return workflow_and_yaml
+                workflow, workflow_yaml = workflow_and_yaml
+                self._add_billing_id(workflow_yaml, billing_id)
+                try:
+                    response = await self._argo_request(
+                        "POST",
+                        f"/api/v1/workflows/{ARGO_NAMESPACE}",
+                        json={"workflow": workflow_yaml},
+                    )
+                    created_workflow = response.json()
+                    logger.debug(created_workflow)
+                    self._index_submitted_workflow(
+                        workflow.wf_name, created_workflow, workflow_yaml
+                    )
+                    return workflow.wf_name
+                except Exception as exception:
+                    logger.error(traceback.format_exc())
+                    logger.error(
+                        f"could not submit workflow, failed with error {exception}"
+                    )
+                    return exception
+
+            submissions = []
+            for workflow_and_yaml in workflows:
+                if (
+                    not isinstance(workflow_and_yaml, Exception)
+                    and remaining_workflows <= 0
+                ):
+                    logger.warning(EXCEED_WORKFLOW_LIMIT_ERROR)
+                    workflow_and_yaml = Exception(EXCEED_WORKFLOW_LIMIT_ERROR)
+                elif not isinstance(workflow_and_yaml, Exception):
+                    remaining_workflows -= 1
+                submissions.append(_submit_workflow(workflow_and_yaml))
+
+            return await argo_engine_helper.gather_with_concurrency_limit(
+                self.MAX_CONCURRENT_ARGO_REQUESTS, *submissions
+            )
+        finally:
+            self._release_user_lock_later(user_lock)
+
+    async def check_user_info_for_billing_id_and_workflow_limit(self, request_token):
+        """
+        Check whether user is non-VA user
+        if user is VA-user, do nothing and proceed
+        if user is non-VA user () billing id tag exists in fence user info)
+        add billing Id to argo metadata and pod metadata
+        remove gen3 username from pod metadata
+        """
+
+        header = {"Authorization": request_token}
+        try:
+            r = await self.http_client.get(url=self.FENCE_USER_INFO_URL, headers=header)
+            r.raise_for_status()
+            user_info = r.json()
+        except Exception as e:
+            exception = Exception("Could not determine user billing info from fence", e)
+            logger.error(exception)
+            traceback.print_exc()
+            raise exception
+        return self._parse_billing_id_and_workflow_limit(user_info)
+
+    async def check_user_monthly_workflow_cap(
+        self,
+        request_token: str,
+        billing_id: Optional[int] = None,
+        custom_limit: Optional[int] = None,
+    ):
+        """
+        Query Argo service to see how many workflow runs user already
+        have in the current calendar month. Return number of workflow runs and limit
+        """
+
+        try:
+            current_month_workflows = await self.get_user_workflows_for_current_month(
+                request_token
+            )
+            limit = self._get_workflow_limit(billing_id, custom_limit)
+            return len(current_month_workflows), limit
+        except Exception as e:
+            logger.error(e)
+            traceback.print_exc()
+            raise e
@@ -1,20 +1,25 @@
+import asyncio
+import base64
+import binascii
 import json
 import random
 import re
 import string
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 import jwt
+from argo_workflows.exceptions import NotFoundException
 
 from argowrapper import logger
-from argowrapper.auth import Auth
+from argowrapper.auth import AsyncAuth
 from argowrapper.constants import (
     ARGO_CONFIG_PATH,
     GEN3_USER_METADATA_LABEL,
     GEN3_TEAM_PROJECT_METADATA_LABEL,
 )
 
-auth = Auth()
+auth = AsyncAuth()
 
 
 def generate_workflow_name() -> str:
@@ -79,21 +84,44 @@ def parse_details(
     result["arguments"] = workflow_details["spec"].get("arguments")
     result["progress"] = workflow_details["status"].get("progress")
     result["outputs"] = workflow_details["status"].get("outputs", {})
-    if workflow_details["metadata"].get("labels"):
-        result[GEN3_USER_METADATA_LABEL] = convert_username_label_to_gen3username(
-            workflow_details["metadata"].get("labels").get(GEN3_USER_METADATA_LABEL)
-        )
-        result[GEN3_TEAM_PROJECT_METADATA_LABEL] = convert_pod_label_to_gen3teamproject(
-            workflow_details["metadata"]
-            .get("labels")
-            .get(GEN3_TEAM_PROJECT_METADATA_LABEL)
-        )
-    else:
-        result[GEN3_USER_METADATA_LABEL] = None
-        result[GEN3_TEAM_PROJECT_METADATA_LABEL] = None
+    result.update(parse_owner_labels(workflow_details))
+    return result
+
+
+def parse_summary(
+    workflow_details: Dict[str, Any], workflow_type: str
+) -> Dict[str, Any]:
+    """Parse just what status polls need: the common details, progress and owner labels"""
+    result = parse_common_details(
+        workflow_details=workflow_details, workflow_type=workflow_type
+    )
+    result["wf_name"] = (
+        workflow_details["metadata"].get("annotations", {}).get("workflow_name")
+    )
+    result["progress"] = workflow_details["status"].get("progress")
+    result.update(parse_owner_labels(workflow_details))
     return result
 
 
+def parse_owner_labels(workflow_details: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Parse the user and team project labels that determine who can access a workflow"""
+    labels = workflow_details.get("metadata", {}).get("labels")
+    if labels:
+        return {
+            GEN3_USER_METADATA_LABEL: convert_username_label_to_gen3username(
+                labels.get(GEN3_USER_METADATA_LABEL)
+            ),
+            GEN3_TEAM_PROJECT_METADATA_LABEL: convert_pod_label_to_gen3teamproject(
+                labels.get(GEN3_TEAM_PROJECT_METADATA_LABEL)
+            ),
+        }
+    else:
+        return {
+            GEN3_USER_METADATA_LABEL: None,
+            GEN3_TEAM_PROJECT_METADATA_LABEL: None,
+        }
+
+
 def parse_list_item(
     workflow_details: Dict[str, Any],
     workflow_type: str,
@@ -157,6 +185,55 @@ def remove_list_duplicate(
         return uniq_list
 
 
+async def gather_with_concurrency_limit(
+    limit: int, *coroutines: Awaitable
+) -> List[Any]:
+    """Like asyncio.gather, but with at most `limit` of the given coroutines running at a time"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run_with_semaphore(coroutine: Awaitable) -> Any:
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(
+        *[_run_with_semaphore(coroutine) for coroutine in coroutines]
+    )
+
+
+def encode_continue_token(sort_key: Tuple[str, str]) -> str:
+    """Encodes the (sort field, uid) of the last workflow of a list page as an opaque continue token"""
+    return base64.urlsafe_b64encode(json.dumps(sort_key).encode("utf-8")).decode(
+        "ascii"
+    )
+
+
+def decode_continue_token(continue_token: str) -> Tuple[str, str]:
+    """Decodes a continue token, raises a ValueError if it is not valid"""
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(continue_token.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exception:
+        raise ValueError(f"invalid continue token {continue_token}") from exception
+    if (
+        not isinstance(sort_key, list)
+        or len(sort_key) != 2
+        or not all(isinstance(value, str) for value in sort_key)
+    ):
+        raise ValueError(f"invalid continue token {continue_token}")
+    return sort_key[0], sort_key[1]
+
+
+def quote_path_segment(value: Optional[str]) -> str:
+    """
+    Quotes a caller supplied workflow name, uid or node id for use as one segment of
+    an argo url, so it cannot reach another endpoint with a "/" or a dot segment.
+    Raises a argo_workflows.exceptions.NotFoundException for "." and "..", as no
+    workflow or node has that name
+    """
+    if value in (".", ".."):
+        raise NotFoundException(reason=f"invalid path segment {value}")
+    return quote(str(value), safe="")
+
+
 def _get_argo_config_dict() -> Dict:
     with open(ARGO_CONFIG_PATH, encoding="utf-8") as file_stream:
         data = json.load(file_stream)
@@ -0,0 +1,69 @@
+import codecs
+from collections import deque
+from typing import Deque, Iterable, Optional
+
+from argowrapper.constants import LOG_ERROR_MAX_BYTES
+
+
+class LogErrorScanner:
+    """
+    Scans a main-logs artifact chunk by chunk for the first line that contains
+    "Error", so the artifact never has to be held in memory as a whole.
+
+    From the first error line on, the stripped lines are kept, up to max_bytes
+    of decoded text (older lines after the error line are dropped first). If no
+    line contains "Error", the last max_bytes of the log are kept instead.
+    """
+
+    def __init__(self, max_bytes: int = LOG_ERROR_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial_line = ""
+        self._error_line: Optional[str] = None
+        self._tail_lines: Deque[str] = deque()
+        self._tail_size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        lines = (self._partial_line + self._decoder.decode(chunk)).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._add_line(line)
+        if len(self._partial_line) > self.max_bytes:
+            # don't let a single line without line breaks grow without bounds:
+            self._add_line(self._partial_line)
+            self._partial_line = ""
+
+    def feed_all(self, chunks: Iterable[bytes]) -> str:
+        for chunk in chunks:
+            self.feed(chunk)
+        return self.get_log_excerpt()
+
+    def get_log_excerpt(self) -> str:
+        """Returns the log from the first error line on, or the end of the log if there is no error line"""
+        self._add_line(self._partial_line + self._decoder.decode(b"", final=True))
+        self._partial_line = ""
+        lines = list(self._tail_lines)
+        if self._error_line is not None:
+            lines.insert(0, self._error_line)
+        return "\n".join(lines)
+
+    def _add_line(self, line: str) -> None:
+        if self._error_line is None and "Error" in line:
+            self._error_line = line.strip()[: self.max_bytes]
+            self._tail_lines.clear()
+            self._tail_size = 0
+            return
+
+        if self._error_line is not None:
+            line = line.strip()
+            max_tail_size = self.max_bytes - len(self._error_line) - 1
+        else:
+            max_tail_size = self.max_bytes
+        if len(line) + 1 > max_tail_size:
+            # keep just the end of a very long line:
+            line = line[len(line) - max(max_tail_size - 1, 0) :]
+
+        self._tail_lines.append(line)
+        self._tail_size += len(line) + 1
+        while self._tail_lines and self._tail_size > max_tail_size:
+            self._tail_size -= len(self._tail_lines.popleft()) + 1
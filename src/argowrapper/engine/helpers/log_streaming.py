@@ -0,0 +1,94 @@
+import re
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+BYTE_RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_byte_range(
+    range_header: Optional[str],
+) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """parses a single range "Range" header, e.g. "bytes=0-99", "bytes=100-" or "bytes=-100"
+
+    Args:
+        range_header (Optional[str]): value of the Range header of the request
+
+    Returns:
+        Optional[Tuple[Optional[int], Optional[int]]]: (first byte, last byte) of the range,
+            with first byte None for a suffix range, or None if no range was requested
+
+    Raises:
+        ValueError: if the range is malformed or not satisfiable
+    """
+    if not range_header:
+        return None
+    match = BYTE_RANGE_REGEX.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        raise ValueError(f"unsupported range {range_header}")
+    first_byte = int(match.group(1)) if match.group(1) else None
+    last_byte = int(match.group(2)) if match.group(2) else None
+    if first_byte is None and last_byte == 0:
+        raise ValueError(f"unsatisfiable range {range_header}")
+    if first_byte is not None and last_byte is not None and last_byte < first_byte:
+        raise ValueError(f"unsatisfiable range {range_header}")
+    return first_byte, last_byte
+
+
+async def iter_byte_range(
+    chunks: AsyncIterator[bytes], first_byte: int, last_byte: Optional[int]
+) -> AsyncIterator[bytes]:
+    """yields only the bytes from first_byte to last_byte (inclusive, or to the end if None)"""
+    position = 0
+    async for chunk in chunks:
+        chunk_start = position
+        position += len(chunk)
+        if position <= first_byte:
+            continue
+        if last_byte is not None and chunk_start > last_byte:
+            break
+        end = len(chunk) if last_byte is None else last_byte + 1 - chunk_start
+        yield chunk[max(first_byte - chunk_start, 0) : end]
+        if last_byte is not None and position > last_byte:
+            break
+
+
+async def read_suffix_bytes(
+    chunks: AsyncIterator[bytes], length: int
+) -> Tuple[bytes, int]:
+    """reads through the chunks keeping only the last length bytes
+
+    Returns:
+        Tuple[bytes, int]: the last length bytes and the total number of bytes read
+    """
+    suffix = bytearray()
+    total_length = 0
+    async for chunk in chunks:
+        total_length += len(chunk)
+        suffix += chunk
+        if len(suffix) > length:
+            del suffix[: len(suffix) - length]
+    return bytes(suffix), total_length
+
+
+async def read_tail_lines(
+    chunks: AsyncIterator[bytes], line_count: int, max_bytes: int
+) -> bytes:
+    """reads through the chunks keeping only the last line_count lines, at most max_bytes of them"""
+    tail_lines: Deque[bytes] = deque()
+    tail_size = 0
+    partial_line = b""
+    async for chunk in chunks:
+        lines = (partial_line + chunk).split(b"\n")
+        partial_line = lines.pop()[-max_bytes:]
+        for line in lines:
+            line = line[-max_bytes:] + b"\n"
+            tail_lines.append(line)
+            tail_size += len(line)
+            while len(tail_lines) > line_count or tail_size > max_bytes:
+                tail_size -= len(tail_lines.popleft())
+    if partial_line:
+        tail_lines.append(partial_line)
+        tail_size += len(partial_line)
+        while len(tail_lines) > line_count or tail_size > max_bytes:
+            tail_size -= len(tail_lines.popleft())
+    return b"".join(tail_lines)
@@ -0,0 +1,38 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUDict(OrderedDict):
+    """
+    A dict that holds at most max_size entries. Once a new entry would exceed
+    that, the least recently read or written entry is evicted. Keeps the
+    in-memory caches whose keys come from client requests bounded.
+
+    Attributes:
+        max_size (int): maximum number of entries
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+    def copy(self) -> "LRUDict":
+        lru_dict = LRUDict(self.max_size)
+        lru_dict.update(self)
+        return lru_dict
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from argowrapper.constants import ARGO_WORKFLOW_PHASE_LABEL
+
+# the phases shown for terminated workflows, see parse_common_details, and the argo phase they have:
+ARGO_PHASE_OF_PHASE = {"Canceling": "Running", "Canceled": "Failed"}
+# sort keys of workflow lists and where to find them in the raw list items:
+WORKFLOW_LIST_SORT_FIELDS = {
+    "submittedAt": ("metadata", "creationTimestamp"),
+    "startedAt": ("status", "startedAt"),
+    "finishedAt": ("status", "finishedAt"),
+}
+
+
+class WorkflowListFilter:
+    """
+    The filters and sort order of a workflow list. Whatever argo can filter on is
+    turned into a label selector, the rest is checked here: first on the raw list
+    items, so left out archived workflows never need their details looked up, and
+    then on the parsed workflows for what the list items lack (like the wf_name).
+
+    Attributes:
+        phases (Optional[List[str]]): phases to keep, as shown to the user
+        submitted_after (Optional[str]): keep workflows submitted at or after this RFC 3339 time
+        submitted_before (Optional[str]): keep workflows submitted before this RFC 3339 time
+        wf_name_contains (Optional[str]): keep workflows whose given name contains this, ignoring case
+        sort_by (str): one of WORKFLOW_LIST_SORT_FIELDS
+        descending (bool): sort order
+    """
+
+    def __init__(
+        self,
+        phases: Optional[List[str]] = None,
+        submitted_after: Optional[str] = None,
+        submitted_before: Optional[str] = None,
+        wf_name_contains: Optional[str] = None,
+        sort_by: str = "submittedAt",
+        descending: bool = True,
+    ):
+        if sort_by not in WORKFLOW_LIST_SORT_FIELDS:
+            raise ValueError(
+                f"invalid sort key {sort_by}, must be one of {', '.join(WORKFLOW_LIST_SORT_FIELDS)}"
+            )
+        self.phases = set(phases) if phases else None
+        self.submitted_after = submitted_after
+        self.submitted_before = submitted_before
+        self.wf_name_contains = wf_name_contains.lower() if wf_name_contains else None
+        self.sort_by = sort_by
+        self.descending = descending
+
+    def get_label_selector(self, label_selector: str) -> str:
+        """adds the phase filter to the given label selector. New workflows have no
+        phase label yet, so it can't be used when looking for Pending workflows"""
+        if not self.phases:
+            return label_selector
+        argo_phases = sorted(
+            {ARGO_PHASE_OF_PHASE.get(phase, phase) for phase in self.phases}
+        )
+        if "Pending" in argo_phases:
+            return label_selector
+        return (
+            f"{label_selector},{ARGO_WORKFLOW_PHASE_LABEL} in ({','.join(argo_phases)})"
+        )
+
+    def get_sort_key(self, workflow_item: Dict[str, Any]) -> Tuple[str, str]:
+        """the (sort field, uid) of a raw workflow list item"""
+        section, field = WORKFLOW_LIST_SORT_FIELDS[self.sort_by]
+        return (
+            workflow_item.get(section, {}).get(field) or "",
+            workflow_item["metadata"].get("uid") or "",
+        )
+
+    def matches_list_item(self, workflow_item: Dict[str, Any]) -> bool:
+        # RFC 3339 times in UTC compare correctly as strings:
+        submitted_at = workflow_item["metadata"].get("creationTimestamp") or ""
+        if self.submitted_after and submitted_at < self.submitted_after:
+            return False
+        if self.submitted_before and submitted_at >= self.submitted_before:
+            return False
+        return True
+
+    def matches(self, workflow: Dict[str, Any]) -> bool:
+        if self.phases and workflow.get("phase") not in self.phases:
+            return False
+        if (
+            self.wf_name_contains
+            and self.wf_name_contains not in (workflow.get("wf_name") or "").lower()
+        ):
+            return False
+        return True
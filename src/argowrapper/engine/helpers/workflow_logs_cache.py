@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+import traceback
+from typing import Any, Dict, List, Optional
+
+from argowrapper import logger
+
+
+class WorkflowLogsCache:
+    """
+    A cache on local disk for the interpreted logs of archived Failed/Error
+    workflows. Their logs can't change anymore, so entries never expire, but
+    the least recently used entries are evicted once the cache grows beyond
+    max_bytes.
+
+    Attributes:
+        directory (Optional[str]): directory to store the entries in, caching is disabled if not set
+        max_bytes (int): maximum total size of the entries
+    """
+
+    def __init__(self, directory: Optional[str], max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError:
+                logger.error(traceback.format_exc())
+                logger.error(
+                    f"could not create logs cache directory {self.directory}, caching disabled"
+                )
+                self.directory = None
+
+    def _get_entry_path(self, uid: str) -> str:
+        # the uid comes from the request, so don't use it as a file name as is:
+        return os.path.join(
+            self.directory, hashlib.sha256(uid.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def get(self, uid: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        if not self.directory or not uid:
+            return None
+        entry_path = self._get_entry_path(uid)
+        try:
+            with open(entry_path, encoding="utf-8") as entry_file:
+                workflow_logs = json.load(entry_file)
+            # mark as recently used:
+            os.utime(entry_path)
+            return workflow_logs
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.error(traceback.format_exc())
+            logger.error(f"could not read logs cache entry of workflow {uid}")
+            return None
+
+    def put(self, uid: Optional[str], workflow_logs: List[Dict[str, Any]]) -> None:
+        if not self.directory or not uid:
+            return
+        try:
+            # write to a temporary file first, so readers never see a partial entry:
+            file_descriptor, temp_path = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp"
+            )
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as entry_file:
+                json.dump(workflow_logs, entry_file)
+            os.replace(temp_path, self._get_entry_path(uid))
+            self._evict()
+        except OSError:
+            logger.error(traceback.format_exc())
+            logger.error(f"could not write logs cache entry of workflow {uid}")
+
+    def _evict(self) -> None:
+        """removes the least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total_size = 0
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                if entry.name.endswith(".json"):
+                    entry_stat = entry.stat()
+                    entries.append(
+                        (entry_stat.st_mtime, entry_stat.st_size, entry.path)
+                    )
+                    total_size += entry_stat.st_size
+        if total_size <= self.max_bytes:
+            return
+        entries.sort()
+        for _, entry_size, entry_path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_size -= entry_size
@@ -0,0 +1,46 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class WorkflowNodeIndex:
+    """
+    Indexes the status.nodes of a workflow by node name and by (type, phase)
+    in a single pass, so lookups don't need to scan all nodes again
+
+    Attributes:
+        nodes (Dict): the status.nodes of a workflow, by node id
+        node_ids_by_name (Dict): node id by node name
+        node_ids_by_type_and_phase (Dict): list of node ids by (type, phase)
+    """
+
+    def __init__(self, status_nodes_dict: Optional[Dict]):
+        self.nodes = status_nodes_dict or {}
+        self.node_ids_by_name: Dict[str, str] = {}
+        self.node_ids_by_type_and_phase: Dict[Tuple[str, str], List[str]] = {}
+        for node_id, node in self.nodes.items():
+            self.node_ids_by_name[node.get("name")] = node_id
+            self.node_ids_by_type_and_phase.setdefault(
+                (node.get("type"), node.get("phase")), []
+            ).append(node_id)
+
+    def get_nodes(self, node_type: str, phase: str) -> List[Tuple[str, Dict]]:
+        return [
+            (node_id, self.nodes[node_id])
+            for node_id in self.node_ids_by_type_and_phase.get((node_type, phase), [])
+        ]
+
+    def get_node_by_name(self, name: str) -> Optional[Tuple[str, Dict]]:
+        node_id = self.node_ids_by_name.get(name)
+        if node_id is None:
+            return None
+        return node_id, self.nodes[node_id]
+
+    def get_nodes_by_start_time(
+        self, node_type: str, phase: str, max_nodes: Optional[int] = None
+    ) -> List[Tuple[str, Dict]]:
+        """returns the (first max_nodes) nodes of the given type and phase, in the order they started"""
+        nodes = self.get_nodes(node_type, phase)
+        # startedAt is an ISO 8601 UTC timestamp, so these compare correctly as strings:
+        if max_nodes is None:
+            return sorted(nodes, key=lambda node: node[1]["startedAt"])
+        return heapq.nsmallest(max_nodes, nodes, key=lambda node: node[1]["startedAt"])
@@ -0,0 +1,104 @@
+import asyncio
+import traceback
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from argowrapper import logger
+from argowrapper.constants import WORKFLOW_TERMINAL_PHASES
+from argowrapper.engine.helpers.workflow_list_filter import ARGO_PHASE_OF_PHASE
+
+
+class _Watch:
+    """the shared poll of one workflow and the queues of its subscribers"""
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.status: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class WorkflowStatusWatcher:
+    """
+    Polls the status of watched workflows and pushes every change to the
+    subscribers of that workflow. However many clients watch a workflow, there
+    is only one upstream poll for it, which stops with its last subscriber or
+    once the workflow reaches a terminal phase.
+
+    Attributes:
+        get_workflow_status (Callable): async function returning the status of a workflow by name and uid
+        poll_interval (float): seconds between two polls of a workflow
+    """
+
+    def __init__(
+        self,
+        get_workflow_status: Callable[[str, str], Awaitable[Dict[str, Any]]],
+        poll_interval: float,
+    ):
+        self.get_workflow_status = get_workflow_status
+        self.poll_interval = poll_interval
+        self._watches: Dict[Tuple[str, str], _Watch] = {}
+
+    @staticmethod
+    def _is_final(status: Optional[Dict[str, Any]]) -> bool:
+        # the parsed phase of a terminated workflow is Canceling or Canceled:
+        phase = status.get("phase") if status is not None else None
+        return status is not None and (
+            "error" in status
+            or ARGO_PHASE_OF_PHASE.get(phase, phase) in WORKFLOW_TERMINAL_PHASES
+        )
+
+    @staticmethod
+    def _push(queue: asyncio.Queue, status: Dict[str, Any]) -> None:
+        # subscribers only need the latest status, so replace one they didn't read yet:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(status)
+
+    async def _poll(self, key: Tuple[str, str], watch: _Watch) -> None:
+        workflow_name, uid = key
+        while True:
+            try:
+                status = await self.get_workflow_status(workflow_name, uid)
+            except Exception as exception:
+                logger.error(traceback.format_exc())
+                status = {"error": str(exception)}
+            if status != watch.status:
+                watch.status = status
+                for queue in watch.subscribers:
+                    self._push(queue, status)
+            if self._is_final(status):
+                break
+            await asyncio.sleep(self.poll_interval)
+        if self._watches.get(key) is watch:
+            del self._watches[key]
+
+    async def subscribe(
+        self, workflow_name: str, uid: str, heartbeat_interval: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """yields the current status of the workflow and then every change of it,
+        until the workflow reaches a terminal phase or its status can't be fetched.
+        Yields None if nothing changed for heartbeat_interval seconds"""
+        key = (workflow_name, uid)
+        watch = self._watches.get(key)
+        if watch is None:
+            watch = self._watches[key] = _Watch()
+            watch.task = asyncio.create_task(self._poll(key, watch))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if watch.status is not None:
+            queue.put_nowait(watch.status)
+        watch.subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    status = await asyncio.wait_for(queue.get(), heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield status
+                if self._is_final(status):
+                    return
+        finally:
+            watch.subscribers.discard(queue)
+            if not watch.subscribers and not watch.task.done():
+                watch.task.cancel()
+                if self._watches.get(key) is watch:
+                    del self._watches[key]
@@ -0,0 +1,41 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from argowrapper.json_encoder import FastJSONResponse
+
+
+def compute_etag(body: bytes) -> str:
+    """a strong ETag for the given response body"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """checks the value of an If-None-Match header, which may list several (weak) ETags or be *"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def json_response_with_etag(request: Request, content: Any) -> Response:
+    """
+    Returns the content as a FastJSONResponse with an ETag of its body, or a
+    304 Not Modified response if the client already has this version of it
+    """
+    response = FastJSONResponse(content=content)
+    etag = compute_etag(response.body)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    return response
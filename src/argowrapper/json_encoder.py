@@ -0,0 +1,59 @@
+import json
+from typing import Any, Callable, Dict
+
+from fastapi.responses import JSONResponse
+
+from argowrapper import logger
+from argowrapper.constants import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_json(content: Any) -> bytes:
+    # same output as starlette's JSONResponse:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _dumps_orjson(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+JSON_ENCODERS: Dict[str, Callable[[Any], bytes]] = {"json": _dumps_json}
+if orjson is not None:
+    JSON_ENCODERS["orjson"] = _dumps_orjson
+
+
+def get_json_encoder(name: str) -> Callable[[Any], bytes]:
+    """returns the encoder with the given name, "auto" picks the fastest one installed
+
+    Args:
+        name (str): "auto", "orjson" or "json"
+
+    Returns:
+        Callable[[Any], bytes]: function that serializes plain dicts, lists and scalars to JSON
+    """
+    if name == "auto":
+        name = "orjson" if "orjson" in JSON_ENCODERS else "json"
+    if name not in JSON_ENCODERS:
+        logger.error(f"json encoder {name} is not available, using json instead")
+        name = "json"
+    return JSON_ENCODERS[name]
+
+
+dumps = get_json_encoder(JSON_ENCODER)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSONResponse rendered with the configured json encoder. Returning it from a
+    route also skips FastAPI's jsonable_encoder pass, so the content must already
+    consist of plain dicts, lists and scalars, as the parsed workflow payloads do.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,11 +1,18 @@
+import json
 import traceback
-from functools import wraps
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime, timezone
+from functools import partial, wraps
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from fastapi import APIRouter, Request, Query
-from fastapi.responses import HTMLResponse
+from argo_workflows.exceptions import NotFoundException
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from starlette.status import (
     HTTP_200_OK,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_404_NOT_FOUND,
+    HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_500_INTERNAL_SERVER_ERROR,
@@ -17,71 +24,240 @@ from argowrapper.constants import (
     GEN3_TEAM_PROJECT_METADATA_LABEL,
     GEN3_USER_METADATA_LABEL,
     EXCEED_WORKFLOW_LIMIT_ERROR,
+    LOG_ARTIFACT_CHUNK_SIZE,
+    LOG_TAIL_MAX_BYTES,
+    DEFAULT_WORKFLOWS_PAGE_SIZE,
+    MAX_WORKFLOWS_PAGE_SIZE,
+    MAX_WORKFLOWS_BATCH_SIZE,
+    WORKFLOW_STATUS_HEARTBEAT_INTERVAL,
+    WORKFLOW_STATUS_POLL_INTERVAL,
 )
 
-from argowrapper import logger
-from argowrapper.auth import Auth
-from argowrapper.engine.argo_engine import ArgoEngine
+from argowrapper import json_encoder, logger
+from argowrapper.auth import AsyncAuth
+from argowrapper.engine.async_argo_engine import AsyncArgoEngine
 from argowrapper.auth.utils import get_cohort_ids_for_team_project
 
 import argowrapper.engine.helpers.argo_engine_helper as argo_engine_helper
+from argowrapper.engine.helpers import log_streaming
+from argowrapper.engine.helpers.workflow_list_filter import WorkflowListFilter
+from argowrapper.engine.helpers.workflow_status_watcher import WorkflowStatusWatcher
+from argowrapper.etag import (
+    etag_matches,
+    json_response_with_etag,
+    not_modified_response,
+)
+from argowrapper.json_encoder import FastJSONResponse
 
 router = APIRouter()
-argo_engine = ArgoEngine()
-auth = Auth()
+argo_engine = AsyncArgoEngine()
+auth = AsyncAuth()
+workflow_status_watcher = WorkflowStatusWatcher(
+    partial(argo_engine.get_workflow_details, summary=True),
+    WORKFLOW_STATUS_POLL_INTERVAL,
+)
 
 
 def log_auth_check_type(auth_check_type):
     logger.info(f"Checking authentication and authorization using {auth_check_type}")
 
 
+async def _check_workflow_access(
+    token, workflow_details, team_project_access: Optional[Dict[str, bool]] = None
+) -> Optional[HTMLResponse]:
+    """checks whether the user is authorized to access the workflow with the given
+    owner labels. Returns an error response if not, or None if access is granted.
+    When checking several workflows, pass the same team_project_access dict to
+    check each team project with arborist only once"""
+    # If the workflow has a "team project" label, check if the
+    # user is authorized to this "team project":
+    if (
+        GEN3_TEAM_PROJECT_METADATA_LABEL in workflow_details
+        and workflow_details[GEN3_TEAM_PROJECT_METADATA_LABEL]
+    ):
+        team_project = workflow_details[GEN3_TEAM_PROJECT_METADATA_LABEL]
+        if team_project_access is not None and team_project in team_project_access:
+            authorized = team_project_access[team_project]
+        else:
+            authorized = await auth.authenticate(token=token, team_project=team_project)
+            if team_project_access is not None:
+                team_project_access[team_project] = authorized
+        if not authorized:
+            return HTMLResponse(
+                content="token is missing, not authorized, out of date, or malformed, or team_project access not granted",
+                status_code=HTTP_401_UNAUTHORIZED,
+            )
+    else:
+        # If the "team project"label is not there, check if
+        # the workflow is one of the user's own workflows:
+        workflow_user = workflow_details[GEN3_USER_METADATA_LABEL]
+        username = argo_engine_helper.get_username_from_token(token)
+        current_user = argo_engine_helper.convert_gen3username_to_pod_label(username)
+        if current_user != workflow_user:
+            return HTMLResponse(
+                content="user is not the author of this workflow, and hence cannot access it",
+                status_code=HTTP_401_UNAUTHORIZED,
+            )
+    return None
+
+
+async def _check_workflow_owner_access(
+    token, workflow_name: str, uid: Optional[str]
+) -> Optional[HTMLResponse]:
+    """like _check_workflow_access, but only fetches the owner labels of the
+    workflow. A workflow name and uid that do not belong to the same workflow are
+    rejected, as the endpoints may look the workflow up by either of them"""
+    try:
+        workflow_owner_labels = await argo_engine.get_workflow_owner_labels(
+            workflow_name, uid
+        )
+    except NotFoundException:
+        return HTMLResponse(
+            content=f"workflow {workflow_name} with uid {uid} not found, and hence cannot be accessed",
+            status_code=HTTP_401_UNAUTHORIZED,
+        )
+    return await _check_workflow_access(token, workflow_owner_labels)
+
+
 def check_auth(fn):
     """custom annotation to authenticate user request and check whether the
-    user is authorized to access argo-wrapper and the workflow in question"""
+    user is authorized to access argo-wrapper and the workflow in question.
+    The workflow details fetched for this check are stored in
+    request.state.workflow_details so the endpoint can reuse them"""
 
     @wraps(fn)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         log_auth_check_type("check_auth")
         request = kwargs["request"]
         token = request.headers.get("Authorization")
         # check authentication and basic argo-wrapper authorization:
-        if not auth.authenticate(token=token):
+        if not await auth.authenticate(token=token):
             return HTMLResponse(
                 content="token is missing, not authorized, out of date, or malformed",
                 status_code=HTTP_401_UNAUTHORIZED,
             )
-        # get workflow details. If the workflow has a "team project" label, check if the
-        # user is authorized to this "team project":
-        workflow_name = kwargs["workflow_name"]
-        uid = kwargs.get("uid")
-        workflow_details = argo_engine.get_workflow_details(workflow_name, uid)
-        if (
-            GEN3_TEAM_PROJECT_METADATA_LABEL in workflow_details
-            and workflow_details[GEN3_TEAM_PROJECT_METADATA_LABEL]
-        ):
-            if not auth.authenticate(
-                token=token,
-                team_project=workflow_details[GEN3_TEAM_PROJECT_METADATA_LABEL],
-            ):
-                return HTMLResponse(
-                    content="token is missing, not authorized, out of date, or malformed, or team_project access not granted",
-                    status_code=HTTP_401_UNAUTHORIZED,
-                )
+        # get workflow details to check if the user may access this workflow:
+        if kwargs.get("view") == "summary":
+            workflow_details = await argo_engine.get_workflow_details(
+                kwargs["workflow_name"], kwargs.get("uid"), summary=True
+            )
         else:
-            # If the "team project"label is not there, check if
-            # the workflow is one of the user's own workflows:
-            workflow_user = workflow_details[GEN3_USER_METADATA_LABEL]
-            username = argo_engine_helper.get_username_from_token(token)
-            current_user = argo_engine_helper.convert_gen3username_to_pod_label(
-                username
+            workflow_details = await argo_engine.get_workflow_details(
+                kwargs["workflow_name"], kwargs.get("uid")
             )
-            if current_user != workflow_user:
-                return HTMLResponse(
-                    content="user is not the author of this workflow, and hence cannot access it",
-                    status_code=HTTP_401_UNAUTHORIZED,
-                )
+        error_response = await _check_workflow_access(token, workflow_details)
+        if error_response:
+            return error_response
+        request.state.workflow_details = workflow_details
+
+        return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def check_auth_user(fn):
+    """custom annotation to authenticate user request and check whether the user
+    is authorized to access argo-wrapper, for endpoints that handle several
+    workflows and check the access to each of them themselves"""
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        log_auth_check_type("check_auth_user")
+        request = kwargs["request"]
+        token = request.headers.get("Authorization")
+        if not await auth.authenticate(token=token):
+            return HTMLResponse(
+                content="token is missing, not authorized, out of date, or malformed",
+                status_code=HTTP_401_UNAUTHORIZED,
+            )
+
+        return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _parse_workflow_references(
+    request_body: Dict[str, Any]
+) -> List[Tuple[str, Optional[str]]]:
+    """parses the {"workflows": [{"workflow_name": ..., "uid": ...}, ...]} body of the
+    batch endpoints, raises a ValueError if it is not valid"""
+    workflows = request_body.get("workflows")
+    if not isinstance(workflows, list) or not workflows:
+        raise ValueError("the 'workflows' field must be a non-empty list")
+    if len(workflows) > MAX_WORKFLOWS_BATCH_SIZE:
+        raise ValueError(
+            f"at most {MAX_WORKFLOWS_BATCH_SIZE} workflows can be handled at once"
+        )
+    workflow_references = []
+    for workflow in workflows:
+        if not isinstance(workflow, dict) or not isinstance(
+            workflow.get("workflow_name"), str
+        ):
+            raise ValueError(f"invalid workflow {workflow}, 'workflow_name' missing")
+        workflow_references.append((workflow["workflow_name"], workflow.get("uid")))
+    return workflow_references
+
+
+def check_auth_if_not_modified(fn):
+    """custom annotation for conditional requests (If-None-Match) for the details
+    of a finished workflow. If the client already has the latest version of them,
+    the user is authorized with the indexed owner labels and 304 Not Modified is
+    returned without fetching the details. Otherwise calls the (check_auth
+    annotated) endpoint"""
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        request = kwargs["request"]
+        etag = argo_engine.get_finished_workflow_details_etag(
+            kwargs["workflow_name"],
+            kwargs.get("uid"),
+            summary=kwargs.get("view") == "summary",
+        )
+        if etag is None or not etag_matches(request.headers.get("If-None-Match"), etag):
+            return await fn(*args, **kwargs)
+
+        log_auth_check_type("check_auth_if_not_modified")
+        token = request.headers.get("Authorization")
+        if not await auth.authenticate(token=token):
+            return HTMLResponse(
+                content="token is missing, not authorized, out of date, or malformed",
+                status_code=HTTP_401_UNAUTHORIZED,
+            )
+        error_response = await _check_workflow_owner_access(
+            token, kwargs["workflow_name"], kwargs.get("uid")
+        )
+        if error_response:
+            return error_response
+        return not_modified_response(etag)
+
+    return wrapper
+
+
+def check_auth_workflow_owner(fn):
+    """custom annotation to authenticate user request and check whether the
+    user is authorized to access argo-wrapper and the workflow in question.
+    Only fetches the workflow owner labels, for endpoints that do not need the
+    workflow details themselves"""
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        log_auth_check_type("check_auth_workflow_owner")
+        request = kwargs["request"]
+        token = request.headers.get("Authorization")
+        # check authentication and basic argo-wrapper authorization:
+        if not await auth.authenticate(token=token):
+            return HTMLResponse(
+                content="token is missing, not authorized, out of date, or malformed",
+                status_code=HTTP_401_UNAUTHORIZED,
+            )
+        # get just the workflow labels to check if the user may access this workflow:
+        error_response = await _check_workflow_owner_access(
+            token, kwargs["workflow_name"], kwargs.get("uid")
+        )
+        if error_response:
+            return error_response
 
-        return fn(*args, **kwargs)
+        return await fn(*args, **kwargs)
 
     return wrapper
 
@@ -90,7 +266,7 @@ def check_auth_and_team_project(fn):
     """custom annotation to authenticate user request AND check teamproject authorization"""
 
     @wraps(fn)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         log_auth_check_type("check_auth_and_team_project")
         request = kwargs["request"]
         token = request.headers.get("Authorization")
@@ -104,13 +280,13 @@ def check_auth_and_team_project(fn):
                     TEAM_PROJECT_FIELD_NAME
                 )
             )
-        if not auth.authenticate(token=token, team_project=team_project):
+        if not await auth.authenticate(token=token, team_project=team_project):
             return HTMLResponse(
                 content="token is missing, not authorized, out of date, or malformed, or team_project access not granted",
                 status_code=HTTP_401_UNAUTHORIZED,
             )
 
-        return fn(*args, **kwargs)
+        return await fn(*args, **kwargs)
 
     return wrapper
 
@@ -119,7 +295,7 @@ def check_auth_and_optional_team_projects(fn):
     """custom annotation to authenticate user request AND check teamproject authorizations"""
 
     @wraps(fn)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         log_auth_check_type("check_auth_and_optional_team_projects")
         request = kwargs["request"]
         token = request.headers.get("Authorization")
@@ -127,29 +303,46 @@ def check_auth_and_optional_team_projects(fn):
         if team_projects and len(team_projects) > 0:
             # validate/ensure that user has been granted access to each of the given team_project codes:
             for team_project in team_projects:
-                if not auth.authenticate(token=token, team_project=team_project):
+                if not await auth.authenticate(token=token, team_project=team_project):
                     return HTMLResponse(
                         content="token is missing, not authorized, out of date, or malformed, or team_project access not granted",
                         status_code=HTTP_401_UNAUTHORIZED,
                     )
         else:
             # fall back to just the general user authorization for argo-wrapper:
-            if not auth.authenticate(token=token):
+            if not await auth.authenticate(token=token):
                 return HTMLResponse(
                     content="token is missing, not authorized, out of date, or malformed",
                     status_code=HTTP_401_UNAUTHORIZED,
                 )
 
-        return fn(*args, **kwargs)
+        return await fn(*args, **kwargs)
 
     return wrapper
 
 
+def _get_request_cohort_ids(request_body: Dict[str, Any]) -> List[Any]:
+    """the cohort ids used by the outcome, variables and source population of a
+    workflow submission request body"""
+    cohort_ids = []
+    if "cohort_ids" in request_body["outcome"]:
+        cohort_ids.extend(request_body["outcome"]["cohort_ids"])
+
+    variables = request_body["variables"]
+    for v in variables:
+        if "cohort_ids" in v:
+            cohort_ids.extend(v["cohort_ids"])
+
+    if "source_population_cohort" in request_body:
+        cohort_ids.append(request_body["source_population_cohort"])
+    return cohort_ids
+
+
 def check_team_projects_and_cohorts(fn):
     """custom annotation to make sure cohort in request belong to user's team project"""
 
     @wraps(fn)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
 
         token = kwargs["request"].headers.get("Authorization")
         request_body = kwargs["request_body"]
@@ -157,24 +350,13 @@ def check_team_projects_and_cohorts(fn):
         source_id = request_body["source_id"]
 
         # Construct set with all cohort ids requested
-        cohort_ids = []
-        if "cohort_ids" in request_body["outcome"]:
-            cohort_ids.extend(request_body["outcome"]["cohort_ids"])
-
-        variables = request_body["variables"]
-        for v in variables:
-            if "cohort_ids" in v:
-                cohort_ids.extend(v["cohort_ids"])
-
-        if "source_population_cohort" in request_body:
-            cohort_ids.append(request_body["source_population_cohort"])
-
+        cohort_ids = _get_request_cohort_ids(request_body)
         cohort_id_set = set(cohort_ids)
 
         if team_project and source_id and len(team_project) > 0 and len(cohort_ids) > 0:
             # Get team project cohort ids
-            team_cohort_id_set = get_cohort_ids_for_team_project(
-                token, source_id, team_project
+            team_cohort_id_set = await get_cohort_ids_for_team_project(
+                token, source_id, team_project, argo_engine.http_client
             )
 
             logger.debug("cohort ids are " + " ".join(str(c) for c in cohort_ids))
@@ -187,7 +369,7 @@ def check_team_projects_and_cohorts(fn):
                 logger.debug(
                     "cohort ids submitted all belong to the same team project. Continue.."
                 )
-                return fn(*args, **kwargs)
+                return await fn(*args, **kwargs)
             else:
                 logger.error(
                     "Cohort ids submitted do NOT all belong to the same team project."
@@ -208,7 +390,7 @@ def check_team_projects_and_cohorts(fn):
 
 
 @router.get("/test")
-def test():
+async def test():
     """route to test that the argo-workflow is correctly running"""
     return {"message": "test"}
 
@@ -217,13 +399,13 @@ def test():
 @router.post("/submit", status_code=HTTP_200_OK)
 @check_auth_and_team_project
 @check_team_projects_and_cohorts
-def submit_workflow(
+async def submit_workflow(
     request_body: Dict[Any, Any],
     request: Request,  # pylint: disable=unused-argument
 ) -> Union[str, Any]:
     """route to submit workflow"""
     try:
-        return argo_engine.workflow_submission(
+        return await argo_engine.workflow_submission(
             request_body, request.headers.get("Authorization")
         )
     except Exception as exception:
@@ -240,18 +422,194 @@ def submit_workflow(
             )
 
 
+def _validate_submission_request_bodies(request_bodies: List[Dict[str, Any]]) -> None:
+    """checks that each of the request bodies of a batch submission has the fields
+    /submit requires, raises a ValueError if not"""
+    if not request_bodies:
+        raise ValueError("at least one workflow must be submitted")
+    if len(request_bodies) > MAX_WORKFLOWS_BATCH_SIZE:
+        raise ValueError(
+            f"at most {MAX_WORKFLOWS_BATCH_SIZE} workflows can be handled at once"
+        )
+    for index, request_body in enumerate(request_bodies):
+        if not request_body.get(TEAM_PROJECT_FIELD_NAME):
+            raise ValueError(
+                f"workflow {index}: the '{TEAM_PROJECT_FIELD_NAME}' field is required"
+            )
+        if (
+            not request_body.get("source_id")
+            or not isinstance(request_body.get("outcome"), dict)
+            or not isinstance(request_body.get("variables"), list)
+            or not all(isinstance(v, dict) for v in request_body["variables"])
+            or not _get_request_cohort_ids(request_body)
+        ):
+            raise ValueError(f"workflow {index}: missing required parameters")
+
+
+# submit several argo workflows
+@router.post("/submit/batch", status_code=HTTP_200_OK)
+@check_auth_user
+async def submit_workflows(
+    request_body: List[Dict[str, Any]],
+    request: Request,
+) -> Union[List[Dict], Any]:
+    """submits the workflows of the list of /submit request bodies, e.g. for a sweep
+    over phenotypes or covariate sets. Returns a list with, for each of them in the
+    same order, either its "wf_name" or an "error". Nothing is submitted if one of
+    the request bodies is invalid"""
+
+    try:
+        _validate_submission_request_bodies(request_body)
+    except ValueError as exception:
+        return HTMLResponse(content=str(exception), status_code=HTTP_400_BAD_REQUEST)
+
+    try:
+        token = request.headers.get("Authorization")
+        results: List[Dict[str, str]] = [{} for _ in request_body]
+
+        # check each team project and the cohorts of each source once:
+        team_project_access = {}
+        for team_project in {body[TEAM_PROJECT_FIELD_NAME] for body in request_body}:
+            team_project_access[team_project] = await auth.authenticate(
+                token=token, team_project=team_project
+            )
+        team_cohort_keys = list(
+            {
+                (body["source_id"], body[TEAM_PROJECT_FIELD_NAME])
+                for body in request_body
+                if team_project_access[body[TEAM_PROJECT_FIELD_NAME]]
+            }
+        )
+        team_cohort_id_sets = dict(
+            zip(
+                team_cohort_keys,
+                await argo_engine_helper.gather_with_concurrency_limit(
+                    argo_engine.MAX_CONCURRENT_ARGO_REQUESTS,
+                    *[
+                        get_cohort_ids_for_team_project(
+                            token, source_id, team_project, argo_engine.http_client
+                        )
+                        for source_id, team_project in team_cohort_keys
+                    ],
+                ),
+            )
+        )
+        for index, body in enumerate(request_body):
+            team_project = body[TEAM_PROJECT_FIELD_NAME]
+            if not team_project_access[team_project]:
+                results[index][
+                    "error"
+                ] = "token is missing, not authorized, out of date, or malformed, or team_project access not granted"
+            elif not set(_get_request_cohort_ids(body)).issubset(
+                team_cohort_id_sets[(body["source_id"], team_project)]
+            ):
+                results[index][
+                    "error"
+                ] = "Cohort ids submitted do NOT all belong to the same team project."
+
+        submission_indexes = [
+            index for index, result in enumerate(results) if "error" not in result
+        ]
+        if submission_indexes:
+            submission_results = await argo_engine.workflow_batch_submission(
+                [request_body[index] for index in submission_indexes], token
+            )
+            for index, submission_result in zip(submission_indexes, submission_results):
+                if not isinstance(submission_result, Exception):
+                    results[index]["wf_name"] = submission_result
+                elif str(submission_result) == EXCEED_WORKFLOW_LIMIT_ERROR:
+                    results[index][
+                        "error"
+                    ] = "You have reached the monthly workflow cap."
+                else:
+                    logger.error(str(submission_result))
+                    results[index][
+                        "error"
+                    ] = "Could not submit workflow, error occurred"
+        return FastJSONResponse(content=results)
+
+    except Exception as exception:
+        logger.error(str(exception))
+        return HTMLResponse(
+            content="Unexpected Error Occurred",
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 # get status
 @router.get("/status/{workflow_name}", status_code=HTTP_200_OK)
+@check_auth_if_not_modified
 @check_auth
-def get_workflow_details(
+async def get_workflow_details(
     workflow_name: str,
     uid: str,
     request: Request,  # pylint: disable=unused-argument
+    view: str = Query(default="full", pattern="^(full|summary)$"),
 ) -> Union[Dict[str, Any], str, Any]:
-    """returns details of a workflow"""
+    """returns details of a workflow, or with view=summary only its status,
+    progress and timestamps, leaving out its arguments and outputs"""
+
+    try:
+        # already fetched by check_auth:
+        response = json_response_with_etag(request, request.state.workflow_details)
+        argo_engine.remember_workflow_details_etag(
+            uid, response.headers["ETag"], view == "summary"
+        )
+        return response
+
+    except Exception as exception:
+        logger.error(str(exception))
+        return HTMLResponse(
+            content="Unexpected Error Occurred",
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+# get status of several workflows
+@router.post("/status/batch", status_code=HTTP_200_OK)
+@check_auth_and_optional_team_projects
+async def get_workflows_details(
+    request_body: Dict[str, Any],
+    request: Request,
+    team_projects: Optional[List[str]] = Query(default=None),
+) -> Union[List[Dict], Any]:
+    """returns the details of the workflows in the {"workflows": [{"workflow_name": ...,
+    "uid": ...}, ...]} request body, as a list with, for each of them in the same order,
+    its "workflow_name" and "uid" and either its "details" or an "error".
+    The running workflows of the user and of the given team projects are fetched at
+    once, so pass the team projects of the requested workflows when known"""
+
+    try:
+        workflow_references = _parse_workflow_references(request_body)
+    except ValueError as exception:
+        return HTMLResponse(content=str(exception), status_code=HTTP_400_BAD_REQUEST)
 
     try:
-        return argo_engine.get_workflow_details(workflow_name, uid)
+        token = request.headers.get("Authorization")
+        workflows_details = await argo_engine.get_workflows_details(
+            workflow_references, token, team_projects
+        )
+        # the decorator already checked the access to the given team projects:
+        team_project_access: Dict[str, bool] = {
+            team_project: True for team_project in team_projects or []
+        }
+        results = []
+        for (workflow_name, uid), workflow_details in zip(
+            workflow_references, workflows_details
+        ):
+            result = {"workflow_name": workflow_name, "uid": uid}
+            if isinstance(workflow_details, Exception):
+                result["error"] = str(workflow_details)
+            else:
+                error_response = await _check_workflow_access(
+                    token, workflow_details, team_project_access
+                )
+                if error_response:
+                    result["error"] = error_response.body.decode("utf-8")
+                else:
+                    result["details"] = workflow_details
+            results.append(result)
+        return FastJSONResponse(content=results)
 
     except Exception as exception:
         logger.error(str(exception))
@@ -261,22 +619,56 @@ def get_workflow_details(
         )
 
 
+async def _workflow_status_events(workflow_name: str, uid: str):
+    async for status in workflow_status_watcher.subscribe(
+        workflow_name, uid, WORKFLOW_STATUS_HEARTBEAT_INTERVAL
+    ):
+        if status is None:
+            # keep idle connections from being closed by proxies:
+            yield ": keep-alive\n\n"
+        elif "error" in status:
+            yield f"event: error\ndata: {json.dumps(status)}\n\n"
+        else:
+            yield f"event: status\ndata: {json.dumps(status)}\n\n"
+
+
+# stream status changes
+@router.get("/status/{workflow_name}/events", status_code=HTTP_200_OK)
+@check_auth_workflow_owner
+async def get_workflow_status_events(
+    workflow_name: str,
+    uid: str,
+    request: Request,  # pylint: disable=unused-argument
+) -> StreamingResponse:
+    """streams the summary of a workflow (see the summary view of /status) as
+    server-sent events: a "status" event right away and on every change, until the
+    workflow reaches a terminal phase. All clients watching the same workflow
+    share one upstream poll"""
+
+    return StreamingResponse(
+        _workflow_status_events(workflow_name, uid),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # retry workflow
 @router.post("/retry/{workflow_name}", status_code=HTTP_200_OK)
 @check_auth
-def retry_workflow(
+async def retry_workflow(
     workflow_name: str,
     uid: str,
     request: Request,  # pylint: disable=unused-argument
 ) -> Union[str, Any]:
     """retries a currently failed workflow"""
-    workflow_details = argo_engine.get_workflow_details(workflow_name, uid)
+    # already fetched by check_auth:
+    workflow_details = request.state.workflow_details
     try:
         new_parameters = {}
         for param in workflow_details.get("arguments").get("parameters"):
             new_parameters[param.get("name")] = param.get("value")
 
-        result = argo_engine.workflow_submission(
+        result = await argo_engine.workflow_submission(
             new_parameters, request.headers.get("Authorization")
         )
         return result + " retried successfully"
@@ -289,17 +681,77 @@ def retry_workflow(
         )
 
 
+# cancel several workflows, registered before /cancel/{workflow_name} so "batch"
+# isn't taken for a workflow name
+@router.post("/cancel/batch", status_code=HTTP_200_OK)
+@check_auth_user
+async def cancel_workflows(
+    request_body: Dict[str, Any],
+    request: Request,
+) -> Union[List[Dict], Any]:
+    """cancels the running workflows in the {"workflows": [{"workflow_name": ...,
+    "uid": ...}, ...]} request body the user may access. Returns a list with, for
+    each of them in the same order, its "workflow_name" and "uid" and either a
+    "result" or an "error" """
+
+    try:
+        workflow_references = _parse_workflow_references(request_body)
+    except ValueError as exception:
+        return HTMLResponse(content=str(exception), status_code=HTTP_400_BAD_REQUEST)
+
+    try:
+        token = request.headers.get("Authorization")
+        workflows_owner_labels = await argo_engine.get_workflows_owner_labels(
+            workflow_references
+        )
+        team_project_access: Dict[str, bool] = {}
+        results = []
+        workflows_to_cancel = []
+        for (workflow_name, uid), workflow_owner_labels in zip(
+            workflow_references, workflows_owner_labels
+        ):
+            result = {"workflow_name": workflow_name, "uid": uid}
+            if isinstance(workflow_owner_labels, Exception):
+                result["error"] = str(workflow_owner_labels)
+            else:
+                error_response = await _check_workflow_access(
+                    token, workflow_owner_labels, team_project_access
+                )
+                if error_response:
+                    result["error"] = error_response.body.decode("utf-8")
+                else:
+                    workflows_to_cancel.append(result)
+            results.append(result)
+
+        cancel_results = await argo_engine.cancel_workflows(
+            [result["workflow_name"] for result in workflows_to_cancel]
+        )
+        for result, cancel_result in zip(workflows_to_cancel, cancel_results):
+            if isinstance(cancel_result, Exception):
+                result["error"] = str(cancel_result)
+            else:
+                result["result"] = cancel_result
+        return FastJSONResponse(content=results)
+
+    except Exception as exception:
+        logger.error(str(exception))
+        return HTMLResponse(
+            content="Unexpected Error Occurred",
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 # cancel workflow
 @router.post("/cancel/{workflow_name}", status_code=HTTP_200_OK)
-@check_auth
-def cancel_workflow(
+@check_auth_workflow_owner
+async def cancel_workflow(
     workflow_name: str,
     request: Request,  # pylint: disable=unused-argument
 ) -> Union[str, Any]:
     """cancels a currently running workflow"""
 
     try:
-        return argo_engine.cancel_workflow(workflow_name)
+        return await argo_engine.cancel_workflow(workflow_name)
 
     except Exception as exception:
         logger.error(str(exception))
@@ -309,27 +761,114 @@ def cancel_workflow(
         )
 
 
+def _format_list_filter_time(time: Optional[datetime]) -> Optional[str]:
+    """formats the time like argo's timestamps, taking times without a timezone as UTC"""
+    if time is None:
+        return None
+    if time.tzinfo is not None:
+        time = time.astimezone(timezone.utc)
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def _stream_workflows(
+    workflows: AsyncIterator[Dict], ndjson: bool
+) -> AsyncIterator[bytes]:
+    """serializes the workflows one at a time, as newline delimited JSON or as the
+    items of one JSON array"""
+    if ndjson:
+        async for workflow in workflows:
+            yield json_encoder.dumps(workflow) + b"\n"
+        return
+    separator = b"["
+    async for workflow in workflows:
+        yield separator + json_encoder.dumps(workflow)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
 # get workflows
 @router.get("/workflows", status_code=HTTP_200_OK)
 @check_auth_and_optional_team_projects
-def get_workflows(
+async def get_workflows(
     request: Request,  # pylint: disable=unused-argument
     team_projects: Optional[List[str]] = Query(default=None),
-) -> Union[List[Dict], Any]:
-    """returns the list of workflows the user has ran"""
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_WORKFLOWS_PAGE_SIZE),
+    continue_token: Optional[str] = Query(default=None, alias="continue"),
+    phases: Optional[List[str]] = Query(default=None),
+    submitted_after: Optional[datetime] = None,
+    submitted_before: Optional[datetime] = None,
+    wf_name: Optional[str] = None,
+    sort_by: str = "submittedAt",
+    sort_order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    stream: Optional[str] = Query(default=None, pattern="^(json|ndjson)$"),
+) -> Union[List[Dict], Dict[str, Any], Any]:
+    """returns the list of workflows the user has ran. If limit or continue is given,
+    returns just one page of them as {"items": [...], "continue": token}. Pass the
+    token as continue to get the next page, it is null on the last page.
+    The workflows can be filtered by phases, submission time and (part of) their
+    wf_name, and sorted by submittedAt (the default), startedAt or finishedAt.
+    With stream=json or stream=ndjson, the (unpaginated) list is streamed as a JSON
+    array or as newline delimited JSON while the workflows are being parsed"""
 
     try:
+        workflow_list_filter = WorkflowListFilter(
+            phases=phases,
+            submitted_after=_format_list_filter_time(submitted_after),
+            submitted_before=_format_list_filter_time(submitted_before),
+            wf_name_contains=wf_name,
+            sort_by=sort_by,
+            descending=sort_order == "desc",
+        )
+        paginated = limit is not None or continue_token is not None
+        if stream is not None:
+            if paginated:
+                return HTMLResponse(
+                    content="stream can't be combined with limit or continue",
+                    status_code=HTTP_400_BAD_REQUEST,
+                )
+            workflows = await argo_engine.get_workflows_stream(
+                team_projects,
+                request.headers.get("Authorization"),
+                workflow_list_filter=workflow_list_filter,
+            )
+            return StreamingResponse(
+                _stream_workflows(workflows, ndjson=stream == "ndjson"),
+                media_type=(
+                    "application/x-ndjson" if stream == "ndjson" else "application/json"
+                ),
+            )
+        if (
+            paginated
+            or any((phases, submitted_after, submitted_before, wf_name))
+            or (sort_by, sort_order) != ("submittedAt", "desc")
+        ):
+            workflows_page = await argo_engine.get_workflows_page(
+                team_projects,
+                request.headers.get("Authorization"),
+                (limit or DEFAULT_WORKFLOWS_PAGE_SIZE) if paginated else None,
+                continue_token,
+                workflow_list_filter=workflow_list_filter,
+            )
+            return json_response_with_etag(
+                request, workflows_page if paginated else workflows_page["items"]
+            )
         if team_projects and len(team_projects) > 0:
-            return argo_engine.get_workflows_for_team_projects_and_user(
+            workflows = await argo_engine.get_workflows_for_team_projects_and_user(
                 team_projects=team_projects,
                 auth_header=request.headers.get("Authorization"),
             )
         else:
             # no team_projects, so fall back to querying the workflows that belong just to the user (no team project):
-            return argo_engine.get_workflows_for_user(
+            workflows = await argo_engine.get_workflows_for_user(
                 request.headers.get("Authorization")
             )
+        return json_response_with_etag(request, workflows)
 
+    except ValueError as exception:
+        return HTMLResponse(
+            content=str(exception),
+            status_code=HTTP_400_BAD_REQUEST,
+        )
     except Exception as exception:
         logger.error(str(exception))
         return HTMLResponse(
@@ -339,16 +878,22 @@ def get_workflows(
 
 
 @router.get("/logs/{workflow_name}", status_code=HTTP_200_OK)
-@check_auth
-def get_workflow_logs(
+@check_auth_workflow_owner
+async def get_workflow_logs(
     workflow_name: str,
     uid: str,
     request: Request,  # pylint: disable=unused-argument
+    all_failed_nodes: bool = False,
+    max_failed_nodes: int = Query(default=1, ge=1),
 ) -> Union[List[Dict], Any]:
-    """returns the list of workflows the user has ran"""
+    """returns the errors of the first failed node of a workflow, or of the first
+    max_failed_nodes failed nodes, or of all failed nodes if all_failed_nodes is set"""
 
     try:
-        return argo_engine.get_workflow_logs(workflow_name, uid)
+        workflow_logs = await argo_engine.get_workflow_logs(
+            workflow_name, uid, None if all_failed_nodes else max_failed_nodes
+        )
+        return FastJSONResponse(content=workflow_logs)
 
     except Exception as exception:
         logger.error(str(exception))
@@ -358,8 +903,118 @@ def get_workflow_logs(
         )
 
 
+async def _get_node_log_response(
+    log_response, byte_range, tail_lines: Optional[int]
+) -> Response:
+    """builds the response for the opened main-logs stream of a node. Only the last
+    tail_lines lines or a suffix byte range are buffered (up to LOG_TAIL_MAX_BYTES),
+    everything else is streamed through"""
+    chunks = log_response.aiter_bytes(LOG_ARTIFACT_CHUNK_SIZE)
+    headers = {"Accept-Ranges": "bytes"}
+    if tail_lines or (byte_range and byte_range[0] is None):
+        try:
+            if tail_lines:
+                return Response(
+                    content=await log_streaming.read_tail_lines(
+                        chunks, tail_lines, LOG_TAIL_MAX_BYTES
+                    ),
+                    media_type="text/plain",
+                    headers=headers,
+                )
+            suffix, total_length = await log_streaming.read_suffix_bytes(
+                chunks, min(byte_range[1], LOG_TAIL_MAX_BYTES)
+            )
+        finally:
+            await log_response.aclose()
+        if not total_length:
+            return Response(
+                status_code=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": "bytes */0"},
+            )
+        headers["Content-Range"] = (
+            f"bytes {total_length - len(suffix)}-{total_length - 1}/{total_length}"
+        )
+        return Response(
+            content=suffix,
+            status_code=HTTP_206_PARTIAL_CONTENT,
+            media_type="text/plain",
+            headers=headers,
+        )
+
+    close_log_response = BackgroundTask(log_response.aclose)
+    # the length of the log is only known if argo sends it uncompressed:
+    total_length = None
+    if "Content-Encoding" not in log_response.headers:
+        total_length = log_response.headers.get("Content-Length")
+    if byte_range and (total_length is not None or byte_range[1] is not None):
+        first_byte, last_byte = byte_range
+        if total_length is not None:
+            total_length = int(total_length)
+            if first_byte >= total_length:
+                await log_response.aclose()
+                return Response(
+                    status_code=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{total_length}"},
+                )
+            if last_byte is None or last_byte >= total_length:
+                last_byte = total_length - 1
+        headers["Content-Range"] = (
+            f"bytes {first_byte}-{last_byte}/{total_length or '*'}"
+        )
+        return StreamingResponse(
+            log_streaming.iter_byte_range(chunks, first_byte, last_byte),
+            status_code=HTTP_206_PARTIAL_CONTENT,
+            media_type="text/plain",
+            headers=headers,
+            background=close_log_response,
+        )
+
+    # no range requested, or an open ended range of a log of unknown length,
+    # in which case the range is ignored and the whole log is returned:
+    return StreamingResponse(
+        chunks, media_type="text/plain", headers=headers, background=close_log_response
+    )
+
+
+@router.get("/logs/{workflow_name}/{node_id}", status_code=HTTP_200_OK)
+@check_auth_workflow_owner
+async def get_workflow_node_log(
+    workflow_name: str,  # pylint: disable=unused-argument
+    node_id: str,
+    uid: str,
+    request: Request,
+    tail_lines: Optional[int] = Query(default=None, ge=1),
+) -> Response:
+    """streams the main log of a node of a workflow as plain text. Returns just the
+    last tail_lines lines if set, or else the byte range in the Range header, if any"""
+
+    try:
+        byte_range = log_streaming.parse_byte_range(request.headers.get("Range"))
+    except ValueError as exception:
+        return HTMLResponse(
+            content=str(exception),
+            status_code=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+
+    try:
+        log_response = await argo_engine.open_workflow_node_log(uid, node_id)
+        return await _get_node_log_response(log_response, byte_range, tail_lines)
+
+    except NotFoundException:
+        return HTMLResponse(
+            content=f"no log found for node {node_id}",
+            status_code=HTTP_404_NOT_FOUND,
+        )
+    except Exception as exception:
+        logger.error(str(exception))
+        return HTMLResponse(
+            content="Unexpected Error Occurred",
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @router.get("/workflows/user-monthly", status_code=HTTP_200_OK)
-def get_user_monthly_workflow(
+async def get_user_monthly_workflow(
     request: Request,
 ) -> Dict[str, Any]:
     """
@@ -371,13 +1026,15 @@ def get_user_monthly_workflow(
         (
             billing_id,
             workflow_limit,
-        ) = argo_engine.check_user_info_for_billing_id_and_workflow_limit(
+        ) = await argo_engine.check_user_info_for_billing_id_and_workflow_limit(
             request.headers.get("Authorization")
         )
 
         # if user has billing_id (non-VA user), check if they already reached the monthly cap
-        workflow_run, workflow_limit = argo_engine.check_user_monthly_workflow_cap(
-            request.headers.get("Authorization"), billing_id, workflow_limit
+        workflow_run, workflow_limit = (
+            await argo_engine.check_user_monthly_workflow_cap(
+                request.headers.get("Authorization"), billing_id, workflow_limit
+            )
         )
 
         result = {"workflow_run": workflow_run, "workflow_limit": workflow_limit}
@@ -4,9 +4,14 @@ import argowrapper.engine.helpers.argo_engine_helper as argo_engine_helper
 from argowrapper import logger
 from argowrapper.constants import (
     BACKUP_PVC_NAME,
+    GWAS_ERROR_RULES_FILE,
     POD_COMPLETION_STRATEGY,
     WORKFLOW_ENTRYPOINT,
 )
+from argowrapper.workflows.argo_workflows.gwas_error_rules import (
+    ErrorRuleMatcher,
+    load_gwas_error_rules,
+)
 from argowrapper.workflows.workflow_base import WorkflowBase
 from argowrapper.constants import (
     TEAM_PROJECT_FIELD_NAME,
@@ -25,6 +30,9 @@ def create_gds_files() -> str:
     return f'[{", ".join(gds_files)}]'
 
 
+GWAS_ERROR_RULE_MATCHER = ErrorRuleMatcher(load_gwas_error_rules(GWAS_ERROR_RULES_FILE))
+
+
 class GWAS(WorkflowBase):
     """A class to represent the gwas workflow
 
@@ -197,24 +205,6 @@ class GWAS(WorkflowBase):
     @staticmethod
     def interpret_gwas_workflow_error(step_name: str, step_log: str) -> str:
         """A static method to interpret the error message in the main-log file
-        of Failed Retry node
+        of Failed Retry node, using the rules in GWAS_ERROR_RULE_MATCHER
         """
-        if (
-            step_name in ["run-null-model", "run-single-assoc"]
-            and "system is exactly singular" in step_log
-        ):
-            show_error = "The error occurred due to small cohort size or unbalanced cohort sizes. Please ensure that the cohorts selected for your analysis are sufficiently large and balanced."
-        elif (
-            step_name in ["run-null-model", "run-single-assoc"]
-            and "system is computationally singular" in step_log
-        ):
-            show_error = "The error occurred due to unbalanced cohort sizes. Please ensure that the sizes of the cohorts are as balanced as possible."
-        elif step_name == "generate-attrition-csv" and "ReadTimeout" in step_log:
-            show_error = "A timeout occurred while fetching the attrition table information. Please retry running your workflow."
-        elif step_name == "create-indexd-record" and "HTTPError" in step_log:
-            show_error = "An HTTP error occurred while creating an index record. Please retry running your workflow."
-        elif step_name == "run-single-assoc" and "where TRUE/FALSE needed" in step_log:
-            show_error = "The error was caused by extreme outliers in the outcome or the covariates. Please try using different outcome/covariates variables."
-        else:
-            show_error = ""
-        return show_error
+        return GWAS_ERROR_RULE_MATCHER.interpret(step_name, step_log)
@@ -0,0 +1,95 @@
+import json
+import re
+from typing import Dict, List, Optional, Pattern
+
+from argowrapper import logger
+
+# Each rule maps a failure signature found in the log of one of the given steps
+# to a message for the user. When several rules match, the first one wins.
+DEFAULT_GWAS_ERROR_RULES = [
+    {
+        "step_names": ["run-null-model", "run-single-assoc"],
+        "log_contains": "system is exactly singular",
+        "message": "The error occurred due to small cohort size or unbalanced cohort sizes. Please ensure that the cohorts selected for your analysis are sufficiently large and balanced.",
+    },
+    {
+        "step_names": ["run-null-model", "run-single-assoc"],
+        "log_contains": "system is computationally singular",
+        "message": "The error occurred due to unbalanced cohort sizes. Please ensure that the sizes of the cohorts are as balanced as possible.",
+    },
+    {
+        "step_names": ["generate-attrition-csv"],
+        "log_contains": "ReadTimeout",
+        "message": "A timeout occurred while fetching the attrition table information. Please retry running your workflow.",
+    },
+    {
+        "step_names": ["create-indexd-record"],
+        "log_contains": "HTTPError",
+        "message": "An HTTP error occurred while creating an index record. Please retry running your workflow.",
+    },
+    {
+        "step_names": ["run-single-assoc"],
+        "log_contains": "where TRUE/FALSE needed",
+        "message": "The error was caused by extreme outliers in the outcome or the covariates. Please try using different outcome/covariates variables.",
+    },
+]
+
+
+def load_gwas_error_rules(rules_file: Optional[str]) -> List[Dict]:
+    """loads the error rules from the given json file, or returns the default rules if no file is given"""
+    if not rules_file:
+        return DEFAULT_GWAS_ERROR_RULES
+    with open(rules_file, encoding="utf-8") as file_stream:
+        rules = json.load(file_stream)
+    for rule in rules:
+        if not {"step_names", "log_contains", "message"}.issubset(rule):
+            raise Exception(f"invalid gwas error rule {rule} in {rules_file}")
+    logger.info(f"loaded {len(rules)} gwas error rules from {rules_file}")
+    return rules
+
+
+class ErrorRuleMatcher:
+    """
+    Matches step logs against a table of error rules. The rules that apply to a
+    step are compiled into one regex, so a log is scanned once no matter how
+    many rules there are.
+
+    Attributes:
+        rules (List[Dict]): the error rules, see DEFAULT_GWAS_ERROR_RULES
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self._patterns_by_step_name: Dict[str, Optional[Pattern]] = {}
+
+    def _get_pattern(self, step_name: str) -> Optional[Pattern]:
+        if step_name not in self._patterns_by_step_name:
+            # one named group per rule, the group name holds the rule's index.
+            # The lookaheads match without consuming the log, so a rule whose
+            # signature overlaps the match of another rule is still found:
+            alternatives = [
+                f"(?=(?P<rule_{index}>{re.escape(rule['log_contains'])}))"
+                for index, rule in enumerate(self.rules)
+                if step_name in rule["step_names"]
+            ]
+            self._patterns_by_step_name[step_name] = (
+                re.compile("|".join(alternatives)) if alternatives else None
+            )
+        return self._patterns_by_step_name[step_name]
+
+    def interpret(self, step_name: str, step_log: str) -> str:
+        """returns the message of the first rule that matches the step log, or "" if none does"""
+        pattern = self._get_pattern(step_name)
+        if pattern is None:
+            return ""
+        first_rule_index = None
+        for match in pattern.finditer(step_log):
+            rule_index = int(match.lastgroup.split("_")[1])
+            if first_rule_index is None or rule_index < first_rule_index:
+                first_rule_index = rule_index
+                if pattern.groupindex[match.lastgroup] == 1:
+                    # no rule for this step can take precedence over this one
+                    break
+        if first_rule_index is None:
+            return ""
+        return self.rules[first_rule_index]["message"]
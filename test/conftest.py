@@ -0,0 +1,27 @@
+import httpx
+import pytest
+
+from argowrapper.engine.async_argo_engine import AsyncArgoEngine
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs_cache(tmp_path, monkeypatch):
+    """every test gets its own, empty logs cache directory"""
+    monkeypatch.setattr(
+        "argowrapper.engine.argo_engine.LOGS_CACHE_DIR", str(tmp_path / "logs-cache")
+    )
+
+
+@pytest.fixture
+def get_engine():
+    """returns a function that creates an engine whose http client is served by the
+    given request handler"""
+
+    def _get_engine(handler):
+        engine = AsyncArgoEngine()
+        engine.http_client = httpx.AsyncClient(
+            base_url="http://argo", transport=httpx.MockTransport(handler)
+        )
+        return engine
+
+    return _get_engine
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from argowrapper.admission_control import (
+    AdmissionControlMiddleware,
+    parse_route_concurrency_limits,
+)
+
+
+def test_parse_route_concurrency_limits():
+    assert parse_route_concurrency_limits(
+        "submit:4:16, /logs/{workflow_name}:8:32"
+    ) == {
+        "submit": (4, 16),
+        "logs/{workflow_name}": (8, 32),
+    }
+    assert parse_route_concurrency_limits("") == {}
+
+
+def start_application(release: asyncio.Event):
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        route_limits={"submit": (1, 1), "logs/{workflow_name}": (1, 0)},
+    )
+
+    @app.post("/submit")
+    async def submit():
+        await release.wait()
+        return "submitted"
+
+    @app.get("/status/{workflow_name}")
+    async def status(workflow_name: str):
+        return workflow_name
+
+    @app.get("/logs/{workflow_name}")
+    async def logs(workflow_name: str):
+        await release.wait()
+        return workflow_name
+
+    @app.get("/logs/{workflow_name}/{node_id}")
+    async def node_log(workflow_name: str, node_id: str):
+        return node_id
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_admission_control_rejects_when_queue_is_full():
+    release = asyncio.Event()
+    app = start_application(release)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # one running, one waiting:
+        running = asyncio.create_task(client.post("/submit"))
+        waiting = asyncio.create_task(client.post("/submit"))
+        await asyncio.sleep(0.01)
+
+        rejected = await client.post("/submit")
+        assert rejected.status_code == 503
+        assert rejected.headers["Retry-After"] == "1"
+
+        # endpoints without a limit are not affected:
+        status = await client.get("/status/wf_name")
+        assert status.status_code == 200
+
+        release.set()
+        assert (await running).status_code == 200
+        assert (await waiting).status_code == 200
+
+        # capacity is released again afterwards:
+        assert (await client.post("/submit")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admission_control_limits_by_route():
+    release = asyncio.Event()
+    app = start_application(release)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/logs/wf_name"))
+        await asyncio.sleep(0.01)
+        assert (await client.get("/logs/other_wf_name")).status_code == 503
+
+        # the node log streams under /logs have their own route, without a limit:
+        node_log = await client.get("/logs/wf_name/node_id")
+        assert node_log.status_code == 200
+
+        release.set()
+        assert (await running).status_code == 200
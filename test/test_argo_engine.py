@@ -1,12 +1,15 @@
+import json
 import unittest.mock as mock
 
+import httpx
 import pytest
 import asyncio
 from argowrapper import logger
 
 from argo_workflows.exceptions import NotFoundException
 from argowrapper.constants import *
-from argowrapper.engine.argo_engine import *
+from argowrapper.engine.async_argo_engine import *
+from argowrapper.engine.helpers.workflow_list_filter import WorkflowListFilter
 import argowrapper.engine.helpers.argo_engine_helper as argo_engine_helper
 
 from test.constants import EXAMPLE_AUTH_HEADER
@@ -15,11 +18,6 @@ from unittest.mock import patch
 from freezegun import freeze_time
 
 
-class WorkFlow:
-    def __init__(self, items):
-        self.items = items
-
-
 variables = [
     {"variable_type": "concept", "concept_id": "2000000324"},
     {"variable_type": "concept", "concept_id": "2000000123"},
@@ -41,173 +39,258 @@ parameters = {
 
 tag_data = {}
 
+TEAM_PROJECT_LABEL = argo_engine_helper.convert_gen3teamproject_to_pod_label(
+    "dummy-team-project"
+)
+
+
+def _workflow_dict(name, uid, phase="Succeeded", nodes=None):
+    return {
+        "metadata": {
+            "name": name,
+            "uid": uid,
+            "creationTimestamp": "2023-03-22T16:48:51Z",
+            "annotations": {"workflow_name": f"given name of {name}"},
+            "labels": {
+                GEN3_USER_METADATA_LABEL: "user-test",
+                GEN3_TEAM_PROJECT_METADATA_LABEL: TEAM_PROJECT_LABEL,
+            },
+        },
+        "spec": {"arguments": {"parameters": []}},
+        "status": {
+            "phase": phase,
+            "startedAt": "2023-03-22T16:48:51Z",
+            "finishedAt": None,
+            "progress": "1/1",
+            "nodes": nodes or {},
+        },
+    }
 
-def mocked_requests_get(*args, **kwargs):
-    class MockResponse:
-        def __init__(self, json_data, status_code):
-            self.json_data = json_data
-            self.status_code = status_code
 
-        def json(self):
-            return self.json_data
+class MockArgoServer:
+    """
+    Serves the argo (and fence) requests of an engine, recording the submitted
+    workflows and the label selectors of list calls
+    """
 
-        def raise_for_status(self):
-            if self.status_code != 200:
-                raise Exception()
+    def __init__(
+        self,
+        workflow_items=None,
+        archived_workflow_items=None,
+        responses=None,
+    ):
+        self.workflow_items = workflow_items
+        self.archived_workflow_items = archived_workflow_items
+        # (method, path) => status code, for the calls that should fail:
+        self.responses = responses or {}
+        self.requests = []
+        self.submitted_workflows = []
+        self.label_selectors = {}
+
+    def __call__(self, request):
+        path = request.url.path
+        self.requests.append((request.method, path))
+        if (request.method, path) in self.responses:
+            return httpx.Response(self.responses[(request.method, path)])
+        if str(request.url) == AsyncArgoEngine.FENCE_USER_INFO_URL:
+            if tag_data["user_tags"] != 500:
+                return httpx.Response(200, json=tag_data["user_tags"])
+            return httpx.Response(500, json={})
+        if request.method == "POST":
+            self.submitted_workflows.append(json.loads(request.content)["workflow"])
+            return httpx.Response(
+                200,
+                json={"metadata": {"uid": f"uid_{len(self.submitted_workflows)}"}},
+            )
+        if request.method == "GET" and path in (
+            f"/api/v1/workflows/{ARGO_NAMESPACE}",
+            "/api/v1/archived-workflows",
+        ):
+            self.label_selectors[path] = request.url.params["listOptions.labelSelector"]
+            if path == "/api/v1/archived-workflows":
+                return httpx.Response(200, json={"items": self.archived_workflow_items})
+            return httpx.Response(200, json={"items": self.workflow_items})
+        return httpx.Response(200, json={})
 
-    if kwargs["url"] == "http://fence-service/user":
-        if tag_data["user_tags"] != 500:
-            return MockResponse(tag_data["user_tags"], 200)
-        else:
-            return MockResponse({}, 500)
 
-    return None
+@pytest.fixture
+def mock_submission_delay():
+    """skips the delay between the submissions of a user"""
+    with mock.patch.object(AsyncArgoEngine, "SUBMISSION_REGISTRATION_SECONDS", 0):
+        yield
 
 
-def test_argo_engine_submit_succeeded():
+@pytest.mark.asyncio
+async def test_argo_engine_submit_succeeded(mock_submission_delay, get_engine):
     """returns workflow name if workflow submission suceeds"""
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(return_value=None)
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_id_and_limit, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
         mock_config_dict.return_value = config
         mock_id_and_limit.return_value = None, None
         mock_check_workflow_cap.return_value = 1, 50
 
-        result = engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        result = await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
         assert "gwas" in result
+        assert argo_server.requests == [("POST", f"/api/v1/workflows/{ARGO_NAMESPACE}")]
+        # the owner labels of the new workflow are indexed right away:
+        assert engine.workflow_owner_labels_cache[(result, "uid_1")] == {
+            GEN3_USER_METADATA_LABEL: "test user",
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummy-team-project",
+        }
 
 
-def test_argo_engine_submit_with_billing_id():
+@pytest.mark.asyncio
+async def test_argo_engine_submit_with_billing_id(mock_submission_delay, get_engine):
     """returns workflow name if workflow submission suceeds"""
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(return_value=None)
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_id_and_limit, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
         mock_config_dict.return_value = config
         mock_id_and_limit.return_value = "1234", None
         mock_check_workflow_cap.return_value = 1, 50
 
-        result = engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
-        workflow_yaml = engine.api_instance.create_workflow.call_args[1][
-            "body"
-        ]._data_store
+        result = await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        workflow_yaml = argo_server.submitted_workflows[0]
         assert (
-            workflow_yaml["workflow"]["metadata"]["labels"]["billing_id"]
-            == workflow_yaml["workflow"]["spec"]["podMetadata"]["labels"]["billing_id"]
+            workflow_yaml["metadata"]["labels"]["billing_id"]
+            == workflow_yaml["spec"]["podMetadata"]["labels"]["billing_id"]
             == "1234"
         )
-        assert (
-            workflow_yaml["workflow"]["spec"]["podMetadata"]["labels"]["gen3username"]
-            == ""
-        )
+        assert workflow_yaml["spec"]["podMetadata"]["labels"]["gen3username"] == ""
 
 
-def test_argo_engine_submit_failed():
+@pytest.mark.asyncio
+async def test_argo_engine_submit_failed(mock_submission_delay, get_engine):
     """returns empty string is workflow submission fails"""
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(
-        side_effect=Exception("bad input")
+    engine = get_engine(
+        MockArgoServer(responses={("POST", f"/api/v1/workflows/{ARGO_NAMESPACE}"): 400})
     )
 
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
-    ) as mock_config_dict, pytest.raises(Exception):
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
+    ) as mock_config_dict, mock.patch(
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+    ) as mock_id_and_limit, mock.patch(
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
+    ) as mock_check_workflow_cap, pytest.raises(
+        Exception
+    ):
         mock_config_dict.return_value = config
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        mock_id_and_limit.return_value = None, None
+        mock_check_workflow_cap.return_value = 1, 50
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
 
 
-def test_argo_engine_cancel_succeeded():
+@pytest.mark.asyncio
+async def test_argo_engine_cancel_succeeded(get_engine):
     """returns True if workflow cancelation suceeds"""
-    engine = ArgoEngine()
-    engine.api_instance.terminate_workflow = mock.MagicMock(return_value=None)
-    result = engine.cancel_workflow("wf_name")
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
+    result = await engine.cancel_workflow("wf_name")
     assert result == "wf_name canceled sucessfully"
+    assert argo_server.requests == [
+        ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/terminate")
+    ]
 
 
-def test_argo_engine_cancel_failed():
+@pytest.mark.asyncio
+async def test_argo_engine_cancel_failed(get_engine):
     """returns False if workflow cancelation fails"""
-    engine = ArgoEngine()
-    engine.api_instance.delete_workflow = mock.MagicMock(
-        side_effect=Exception("workflow does not exist")
+    engine = get_engine(
+        MockArgoServer(
+            responses={
+                ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/terminate"): 404
+            }
+        )
     )
     with pytest.raises(Exception):
-        engine.cancel_workflow("wf_name")
+        await engine.cancel_workflow("wf_name")
 
 
-def test_argo_engine_retry_succeeded_non_archived_workflow():
+@pytest.mark.asyncio
+async def test_argo_engine_retry_succeeded_non_archived_workflow(get_engine):
     """returns True if workflow retry suceeds"""
-    engine = ArgoEngine()
-    engine.archive_api_instance.retry_archived_workflow = mock.MagicMock(
-        side_effect=NotFoundException("workflow does not exist")
+    argo_server = MockArgoServer(
+        responses={("PUT", "/api/v1/archived-workflows/uid/retry"): 404}
     )
-    engine.api_instance.retry_workflow = mock.MagicMock(return_value=None)
-    result = engine.retry_workflow("wf_name", "uid")
+    engine = get_engine(argo_server)
+    result = await engine.retry_workflow("wf_name", "uid")
     assert result == "wf_name retried sucessfully"
+    assert argo_server.requests == [
+        ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/retry")
+    ]
 
 
-def test_argo_engine_retry_succeeded_archived_workflow():
+@pytest.mark.asyncio
+async def test_argo_engine_retry_succeeded_archived_workflow(get_engine):
     """checks if expected exception is raised when retry fails"""
-    engine = ArgoEngine()
-    engine.api_instance.retry_workflow = mock.MagicMock(
-        side_effect=NotFoundException("workflow does not exist")
-    )
-    engine.archive_api_instance.retry_archived_workflow = mock.MagicMock(
-        return_value=None
+    engine = get_engine(
+        MockArgoServer(
+            responses={
+                ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/retry"): 404
+            }
+        )
     )
-    result = engine.retry_workflow("wf_name", "uid")
+    result = await engine.retry_workflow("wf_name", "uid")
     assert result == "archived wf_name retried sucessfully"
 
 
-def test_argo_engine_retry_failed_scenario1(caplog):
+@pytest.mark.asyncio
+async def test_argo_engine_retry_failed_scenario1(caplog, get_engine):
     """checks if expected exception is raised when archived retry fails"""
-    engine = ArgoEngine()
-    engine.api_instance.retry_workflow = mock.MagicMock(
-        side_effect=NotFoundException("workflow does not exist")
-    )
-    engine.archive_api_instance.retry_archived_workflow = mock.MagicMock(
-        side_effect=Exception("other exception")
+    engine = get_engine(
+        MockArgoServer(
+            responses={
+                ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/retry"): 404,
+                ("PUT", "/api/v1/archived-workflows/uid/retry"): 500,
+            }
+        )
     )
-    # we expect "other exception" in this case:
+    # we expect the error of the archived endpoint in this case:
     with pytest.raises(Exception) as exception:
-        engine.retry_workflow("wf_name", "uid")
-    assert "other exception" in str(exception)
+        await engine.retry_workflow("wf_name", "uid")
+    assert "/api/v1/archived-workflows/uid/retry" in str(exception)
 
 
-def test_argo_engine_retry_failed_scenario2(caplog):
+@pytest.mark.asyncio
+async def test_argo_engine_retry_failed_scenario2(caplog, get_engine):
     """checks if expected exception is raised when regular retry fails"""
-    engine = ArgoEngine()
-    engine.archive_api_instance.retry_archived_workflow = mock.MagicMock(
-        side_effect=NotFoundException("workflow not found")
-    )
-    engine.api_instance.retry_workflow = mock.MagicMock(
-        side_effect=Exception("workflow does not exist")
+    argo_server = MockArgoServer(
+        responses={
+            ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/retry"): 500,
+        }
     )
-    # because the archived endpoint throws NotFoundException, and
-    # this is handled in retry_workflow, we expect the second Exception:
+    engine = get_engine(argo_server)
+    # only a NotFoundException of the regular endpoint is handled in retry_workflow,
+    # by falling back to the archived endpoint, so we expect the first error:
     with pytest.raises(Exception) as exception:
-        engine.retry_workflow("wf_name", "uid")
-    assert "workflow does not exist" in str(exception)
+        await engine.retry_workflow("wf_name", "uid")
+    assert f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/retry" in str(exception)
+    assert len(argo_server.requests) == 1
 
 
-def test_argo_engine_get_status_archived_workflow_succeeded():
-    engine = ArgoEngine()
+@pytest.mark.asyncio
+async def test_argo_engine_get_status_archived_workflow_succeeded():
+    engine = AsyncArgoEngine()
     mock_return_archived_wf = {
         "metadata": {
             "name": "archived_wf",
@@ -223,18 +306,21 @@ def test_argo_engine_get_status_archived_workflow_succeeded():
             "outputs": {},
         },
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         return_value=mock_return_archived_wf
     )
-    archived_wf_details = engine.get_workflow_details("archived_wf", "archived_uid")
+    archived_wf_details = await engine.get_workflow_details(
+        "archived_wf", "archived_uid"
+    )
     assert archived_wf_details["wf_name"] == "custom_name"
     assert archived_wf_details["progress"] == "7/7"
     assert archived_wf_details["outputs"] == {}
 
 
-def test_argo_engine_get_workflow_details_succeeded():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_succeeded():
     """Test active workflow status when uid is not found in archive workflow endpoint"""
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     mock_return_wf = {
         "metadata": {
             "name": "hello-world-mwnw5",
@@ -255,11 +341,11 @@ def test_argo_engine_get_workflow_details_succeeded():
             "outputs": {},
         },
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         side_effect=NotFoundException
     )
-    engine._get_workflow_details_dict = mock.MagicMock(return_value=mock_return_wf)
-    wf_details = engine.get_workflow_details("test_wf", "wf_uid")
+    engine._get_workflow_details_dict = mock.AsyncMock(return_value=mock_return_wf)
+    wf_details = await engine.get_workflow_details("test_wf", "wf_uid")
     assert wf_details["wf_name"] == "custome_wf_name"
     assert wf_details["phase"] == "Running"
     assert wf_details["progress"] == "0/1"
@@ -267,11 +353,12 @@ def test_argo_engine_get_workflow_details_succeeded():
     assert wf_details[GEN3_TEAM_PROJECT_METADATA_LABEL] == "dummyteam"
 
 
-def test_argo_engine_get_workflow_details_succeeded_no_team_project():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_succeeded_no_team_project():
     """Test active workflow status when uid is not found in archive workflow endpoint
     and include a test for backwards compatibility regarding the optional
     GEN3_TEAM_PROJECT_METADATA_LABEL"""
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     mock_return_wf = {
         "metadata": {
             "name": "hello-world-mwnw5",
@@ -287,11 +374,11 @@ def test_argo_engine_get_workflow_details_succeeded_no_team_project():
             "outputs": {},
         },
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         side_effect=NotFoundException
     )
-    engine._get_workflow_details_dict = mock.MagicMock(return_value=mock_return_wf)
-    wf_details = engine.get_workflow_details("test_wf", "wf_uid")
+    engine._get_workflow_details_dict = mock.AsyncMock(return_value=mock_return_wf)
+    wf_details = await engine.get_workflow_details("test_wf", "wf_uid")
     assert wf_details["wf_name"] == "custome_wf_name"
     assert wf_details["phase"] == "Running"
     assert wf_details["progress"] == "0/1"
@@ -299,19 +386,230 @@ def test_argo_engine_get_workflow_details_succeeded_no_team_project():
     assert wf_details[GEN3_TEAM_PROJECT_METADATA_LABEL] is None
 
 
-def test_argo_engine_get_status_failed():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_remembers_active_workflow():
+    """Test that a running workflow is looked up directly at the workflow endpoint
+    on subsequent calls, until it reaches a terminal phase"""
+    engine = AsyncArgoEngine()
+    mock_return_wf = {
+        "metadata": {
+            "name": "test_wf",
+            "uid": "wf_uid",
+            "annotations": {"workflow_name": "custome_wf_name"},
+            "labels": {GEN3_USER_METADATA_LABEL: "dummyuser"},
+        },
+        "spec": {"arguments": {}},
+        "status": {"phase": "Running", "progress": "0/1"},
+    }
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        side_effect=NotFoundException
+    )
+    engine._get_workflow_details_dict = mock.AsyncMock(return_value=mock_return_wf)
+    await engine.get_workflow_details("test_wf", "wf_uid")
+    assert engine._get_archived_workflow_details_dict.call_count == 1
+    assert engine.workflow_location_cache["wf_uid"] == "active_workflow"
+
+    # second poll skips the archived workflow endpoint:
+    mock_return_wf["status"]["phase"] = "Succeeded"
+    wf_details = await engine.get_workflow_details("test_wf", "wf_uid")
+    assert wf_details["phase"] == "Succeeded"
+    assert engine._get_archived_workflow_details_dict.call_count == 1
+    assert engine._get_workflow_details_dict.call_count == 2
+    # and once terminal, it is looked up as archived again:
+    assert engine.workflow_location_cache["wf_uid"] == "archived_workflow"
+    await engine.get_workflow_details("test_wf", "wf_uid")
+    assert engine._get_archived_workflow_details_dict.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_indexes_only_confirmed_pairs():
+    """Test that an active workflow looked up by name is not remembered under a
+    uid that is not its own"""
+    engine = AsyncArgoEngine()
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        side_effect=NotFoundException
+    )
+    engine._get_workflow_details_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "test_wf",
+                "uid": "wf_uid",
+                "labels": {GEN3_USER_METADATA_LABEL: "user-dummyuser"},
+            },
+            "spec": {},
+            "status": {"phase": "Running"},
+        }
+    )
+    await engine.get_workflow_details("test_wf", "other_uid")
+    assert "other_uid" not in engine.workflow_location_cache
+    assert list(engine.workflow_owner_labels_cache) == [("test_wf", "wf_uid")]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_active_workflow_gone_from_cluster():
+    """Test fallback to the archived workflow endpoint when a workflow remembered as active is gone"""
+    engine = AsyncArgoEngine()
+    engine.workflow_location_cache["wf_uid"] = "active_workflow"
+    engine._get_workflow_details_dict = mock.AsyncMock(side_effect=NotFoundException)
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {"name": "test_wf", "annotations": {"workflow_name": "name"}},
+            "spec": {"arguments": {}},
+            "status": {"phase": "Succeeded"},
+        }
+    )
+    wf_details = await engine.get_workflow_details("test_wf", "wf_uid")
+    assert wf_details["phase"] == "Succeeded"
+    assert engine.workflow_location_cache["wf_uid"] == "archived_workflow"
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_status_failed():
     """returns empty string if workflow get status fails at archived workflow endpoint"""
-    engine = ArgoEngine()
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine = AsyncArgoEngine()
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         side_effect=Exception("workflow does not exist")
     )
     with pytest.raises(Exception):
-        engine.get_workflow_details("test_wf")
+        await engine.get_workflow_details("test_wf")
 
 
-def test_argo_engine_get_workflows_for_user_and_team_projects_suceeded():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_owner_labels_active_workflow():
+    """Test that only the labels of an active workflow are fetched"""
+    engine = AsyncArgoEngine()
+    engine._get_workflow_labels_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "test_wf",
+                "uid": "wf_uid",
+                "labels": {
+                    GEN3_USER_METADATA_LABEL: "user-dummyuser",
+                    GEN3_TEAM_PROJECT_METADATA_LABEL: argo_engine_helper.convert_gen3teamproject_to_pod_label(
+                        "dummyteam"
+                    ),
+                },
+            }
+        }
+    )
+    engine._get_archived_workflow_details_dict = mock.AsyncMock()
+    owner_labels = await engine.get_workflow_owner_labels("test_wf", "wf_uid")
+    assert owner_labels == {
+        GEN3_USER_METADATA_LABEL: "dummyuser",
+        GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam",
+    }
+    engine._get_archived_workflow_details_dict.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_owner_labels_archived_workflow():
+    """Test fallback to the archived workflow endpoint when the workflow is no longer on the cluster"""
+    engine = AsyncArgoEngine()
+    engine._get_workflow_labels_dict = mock.AsyncMock(side_effect=NotFoundException)
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "test_wf",
+                "uid": "wf_uid",
+                "labels": {GEN3_USER_METADATA_LABEL: "user-dummyuser"},
+            },
+            "spec": {},
+            "status": {"phase": "Succeeded"},
+        }
+    )
+    owner_labels = await engine.get_workflow_owner_labels("test_wf", "wf_uid")
+    assert owner_labels == {
+        GEN3_USER_METADATA_LABEL: "dummyuser",
+        GEN3_TEAM_PROJECT_METADATA_LABEL: None,
+    }
+    engine._get_archived_workflow_details_dict.assert_called_once_with("wf_uid")
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_owner_labels_mismatched_uid():
+    """Test that the name of one workflow and the uid of another one are rejected"""
+    engine = AsyncArgoEngine()
+    engine._get_workflow_labels_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "own_wf",
+                "uid": "own_uid",
+                "labels": {GEN3_USER_METADATA_LABEL: "user-dummyuser"},
+            }
+        }
+    )
+    with pytest.raises(NotFoundException):
+        await engine.get_workflow_owner_labels("own_wf", "other_uid")
+
+    # same for a workflow name that is not on the cluster (anymore), combined
+    # with the uid of an archived workflow of another name:
+    engine._get_workflow_labels_dict = mock.AsyncMock(side_effect=NotFoundException)
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "other_wf",
+                "uid": "other_uid",
+                "labels": {GEN3_USER_METADATA_LABEL: "user-otheruser"},
+            }
+        }
+    )
+    with pytest.raises(NotFoundException):
+        await engine.get_workflow_owner_labels("own_wf", "other_uid")
+    assert engine.workflow_owner_labels_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_owner_labels_from_index(get_engine):
+    """Test that owner labels already known from a previous lookup are not fetched again"""
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
+    engine._get_workflow_labels_dict = mock.AsyncMock(
+        return_value={
+            "metadata": {
+                "name": "test_wf",
+                "uid": "wf_uid",
+                "labels": {GEN3_USER_METADATA_LABEL: "user-a"},
+            }
+        }
+    )
+    first_owner_labels = await engine.get_workflow_owner_labels("test_wf", "wf_uid")
+    second_owner_labels = await engine.get_workflow_owner_labels("test_wf", "wf_uid")
+    assert first_owner_labels == second_owner_labels
+    engine._get_workflow_labels_dict.assert_called_once_with("test_wf")
+
+    # workflows seen in list calls are indexed as well:
+    argo_server.workflow_items = [
+        {
+            "metadata": {
+                "name": "listed_wf",
+                "uid": "listed_uid",
+                "labels": {
+                    GEN3_USER_METADATA_LABEL: "user-b",
+                    GEN3_TEAM_PROJECT_METADATA_LABEL: argo_engine_helper.convert_gen3teamproject_to_pod_label(
+                        "dummyteam"
+                    ),
+                },
+            },
+            "spec": {},
+            "status": {"phase": "Running"},
+        }
+    ]
+    argo_server.archived_workflow_items = []
+    await engine.get_workflows_for_team_project("dummyteam")
+    assert await engine.get_workflow_owner_labels("listed_wf", "listed_uid") == {
+        GEN3_USER_METADATA_LABEL: "b",
+        GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam",
+    }
+    engine._get_workflow_labels_dict.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_user_and_team_projects_suceeded(
+    get_engine,
+):
     """returns list of workflow names if get workflows for user suceeds"""
-    engine = ArgoEngine()
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     argo_workflows_mock_raw_response = [
         {
             "metadata": {
@@ -412,25 +710,21 @@ def test_argo_engine_get_workflows_for_user_and_team_projects_suceeded():
         "spec": {},
         "status": {},
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         return_value=mock_return_archived_wf
     )
 
     # replace call to Argo with hard-coded return value mock. Note that this means that
     # the filtering is not tested here. TODO - a system test is needed or a more ellaborate mock to test this part.
-    engine.api_instance.list_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_workflows_mock_raw_response)
-    )
-    engine.archive_api_instance.list_archived_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_archived_workflows_mock_raw_response)
-    )
+    argo_server.workflow_items = argo_workflows_mock_raw_response
+    argo_server.archived_workflow_items = argo_archived_workflows_mock_raw_response
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.get_username_from_token"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.get_username_from_token"
     ), mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
     ):
-        uniq_workflow_list = engine.get_workflows_for_user("test_jwt_token")
+        uniq_workflow_list = await engine.get_workflows_for_user("test_jwt_token")
         assert len(uniq_workflow_list) == 1
         # assert on values as mapped in argo_engine_helper.parse_details():
         assert "Canceled" == uniq_workflow_list[0]["phase"]
@@ -442,40 +736,30 @@ def test_argo_engine_get_workflows_for_user_and_team_projects_suceeded():
         )
         assert (
             GEN3_USER_METADATA_LABEL
-            in engine.api_instance.list_workflows.call_args[1][
-                "list_options_label_selector"
-            ]
+            in argo_server.label_selectors[f"/api/v1/workflows/{ARGO_NAMESPACE}"]
         )
         assert (
             GEN3_USER_METADATA_LABEL
-            in engine.archive_api_instance.list_archived_workflows.call_args[1][
-                "list_options_label_selector"
-            ]
+            in argo_server.label_selectors["/api/v1/archived-workflows"]
         )
 
         # leave out the one that has no team project, to simulate the argo query:
-        engine.api_instance.list_workflows = mock.MagicMock(
-            return_value=WorkFlow(argo_workflows_mock_raw_response[1:])
-        )
+        argo_server.workflow_items = argo_workflows_mock_raw_response[1:]
         # test also the get_workflows_for_team_project:
-        uniq_workflow_list = engine.get_workflows_for_team_project("dummyteam")
+        uniq_workflow_list = await engine.get_workflows_for_team_project("dummyteam")
         assert len(uniq_workflow_list) == 2
         assert (
-            engine.api_instance.list_workflows.call_args[1][
-                "list_options_label_selector"
-            ]
+            argo_server.label_selectors[f"/api/v1/workflows/{ARGO_NAMESPACE}"]
             == f"{GEN3_TEAM_PROJECT_METADATA_LABEL}={argo_engine_helper.convert_gen3teamproject_to_pod_label('dummyteam')}"
         )
         assert (
-            engine.archive_api_instance.list_archived_workflows.call_args[1][
-                "list_options_label_selector"
-            ]
+            argo_server.label_selectors["/api/v1/archived-workflows"]
             == f"{GEN3_TEAM_PROJECT_METADATA_LABEL}={argo_engine_helper.convert_gen3teamproject_to_pod_label('dummyteam')}"
         )
         # get_workflows_for_team_projects should return the same items as get_workflows_for_team_project if queried with just the one team:
         # (actually we need a smarter mock method to make the team project name count in this test...TODO - write better mock methods that simulate the
         # underlying filtering by Argo and returning different results for different team project queries)
-        uniq_workflow_list = engine.get_workflows_for_team_projects(["dummyteam"])
+        uniq_workflow_list = await engine.get_workflows_for_team_projects(["dummyteam"])
         assert len(uniq_workflow_list) == 2
         assert "custom_name_active2" == uniq_workflow_list[0]["wf_name"]
         assert "custom_name_archived" == uniq_workflow_list[1]["wf_name"]
@@ -483,22 +767,26 @@ def test_argo_engine_get_workflows_for_user_and_team_projects_suceeded():
         assert "dummyuser" == uniq_workflow_list[1][GEN3_USER_METADATA_LABEL]
 
 
-def test_argo_engine_get_workflows_for_user_failed():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_user_failed(get_engine):
     """returns error message if get workflows for user fails"""
-    engine = ArgoEngine()
-    engine.api_instance.list_workflows = mock.MagicMock(
-        side_effect=Exception("user does not exist")
-    )
-    engine.archive_api_instance.list_archived_workflows = mock.MagicMock(
-        side_effect=Exception("user does not exist")
+    engine = get_engine(
+        MockArgoServer(
+            responses={
+                ("GET", f"/api/v1/workflows/{ARGO_NAMESPACE}"): 500,
+                ("GET", "/api/v1/archived-workflows"): 500,
+            }
+        )
     )
     with pytest.raises(Exception):
-        engine.get_workflows_for_user("test")
+        await engine.get_workflows_for_user("test")
 
 
-def test_argo_engine_get_workflows_for_user_empty():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_user_empty(get_engine):
     """Worklfow list of active workflow is empty"""
-    engine = ArgoEngine()
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     argo_workflows_mock_raw_response = None
     argo_archived_workflows_mock_raw_response = [
         {
@@ -530,12 +818,8 @@ def test_argo_engine_get_workflows_for_user_empty():
             },
         },
     ]
-    engine.api_instance.list_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_workflows_mock_raw_response)
-    )
-    engine.archive_api_instance.list_archived_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_archived_workflows_mock_raw_response)
-    )
+    argo_server.workflow_items = argo_workflows_mock_raw_response
+    argo_server.archived_workflow_items = argo_archived_workflows_mock_raw_response
     # for archived workflows, an extra "get details" call goes out
     # to complement missing parts that are not in the list call above,
     # so we need to mock an extra response:
@@ -547,16 +831,16 @@ def test_argo_engine_get_workflows_for_user_empty():
         "spec": {},
         "status": {},
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         return_value=mock_return_archived_wf
     )
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.get_username_from_token"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.get_username_from_token"
     ), mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
     ):
-        uniq_workflow_list = engine.get_workflows_for_user("test_jwt_token")
+        uniq_workflow_list = await engine.get_workflows_for_user("test_jwt_token")
         assert len(uniq_workflow_list) == 2
         assert "Succeeded" == uniq_workflow_list[0]["phase"]
         assert "workflow_three" == uniq_workflow_list[1]["name"]
@@ -565,29 +849,28 @@ def test_argo_engine_get_workflows_for_user_empty():
         assert "custom_name_archived" == uniq_workflow_list[1]["wf_name"]
 
 
-def test_argo_engine_get_workflows_for_user_empty_both():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_user_empty_both(get_engine):
     """Both workfow list of active workflow and archived workflow are empty"""
-    engine = ArgoEngine()
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     argo_workflows_mock_raw_response = None
     argo_archived_workflows_mock_raw_response = None
-    engine.api_instance.list_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_workflows_mock_raw_response)
-    )
-    engine.archive_api_instance.list_archived_workflows = mock.MagicMock(
-        return_value=WorkFlow(argo_archived_workflows_mock_raw_response)
-    )
+    argo_server.workflow_items = argo_workflows_mock_raw_response
+    argo_server.archived_workflow_items = argo_archived_workflows_mock_raw_response
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.get_username_from_token"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.get_username_from_token"
     ), mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper.convert_gen3username_to_pod_label"
     ):
-        uniq_workflow_list = engine.get_workflows_for_user("test_jwt_token")
+        uniq_workflow_list = await engine.get_workflows_for_user("test_jwt_token")
         assert len(uniq_workflow_list) == 0
 
 
-def test_argo_engine_get_workflows_for_team_projects_and_user():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_team_projects_and_user():
     """Test is user and 'team project' workflows are combined as a single output"""
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     user_workflows_mock_response = [
         {
             "uid": "uid_2",
@@ -605,13 +888,13 @@ def test_argo_engine_get_workflows_for_team_projects_and_user():
             "uid": "uid_4",
         },
     ]
-    engine.get_workflows_for_team_projects = mock.MagicMock(
+    engine.get_workflows_for_team_projects = mock.AsyncMock(
         return_value=team_project_workflows_mock_response
     )
-    engine.get_workflows_for_user = mock.MagicMock(
+    engine.get_workflows_for_user = mock.AsyncMock(
         return_value=user_workflows_mock_response
     )
-    uniq_workflow_list = engine.get_workflows_for_team_projects_and_user(
+    uniq_workflow_list = await engine.get_workflows_for_team_projects_and_user(
         ["team1"], "test_user_jwt_token"
     )
     # Note that arguments above are not used. The only thing this test is testing is
@@ -620,26 +903,25 @@ def test_argo_engine_get_workflows_for_team_projects_and_user():
     assert len(uniq_workflow_list) == 3
 
 
-def test_argo_engine_submit_yaml_succeeded():
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock()
+@pytest.mark.asyncio
+async def test_argo_engine_submit_yaml_succeeded(mock_submission_delay, get_engine):
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_id_and_limit, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
         mock_config_dict.return_value = config
         mock_id_and_limit.return_value = None, None
         mock_check_workflow_cap.return_value = 1, 50
 
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
-        args = engine.api_instance.create_workflow.call_args_list
-        for parameter in args[0][1]["body"]["workflow"]["spec"]["arguments"][
-            "parameters"
-        ]:
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        workflow_yaml = argo_server.submitted_workflows[0]
+        for parameter in workflow_yaml["spec"]["arguments"]["parameters"]:
             if (param_name := parameter["name"]) in parameters and param_name not in (
                 "variables"
             ):
@@ -652,9 +934,9 @@ def test_argo_engine_submit_yaml_succeeded():
                         assert str(key) in result
 
 
-def test_argo_engine_new_submit_succeeded():
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock()
+@pytest.mark.asyncio
+async def test_argo_engine_new_submit_succeeded(mock_submission_delay, get_engine):
+    engine = get_engine(MockArgoServer())
     request_body = {
         "n_pcs": 3,
         "variables": variables,
@@ -670,24 +952,24 @@ def test_argo_engine_new_submit_succeeded():
 
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_id_and_limit, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
         mock_config_dict.return_value = config
         mock_id_and_limit.return_value = None, None
         mock_check_workflow_cap.return_value = 1, 50
 
-        res = engine.workflow_submission(request_body, EXAMPLE_AUTH_HEADER)
+        res = await engine.workflow_submission(request_body, EXAMPLE_AUTH_HEADER)
         assert len(res) > 0
 
 
-def test_argo_engine_new_submit_failed():
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(
-        side_effect=Exception("workflow misformatted")
+@pytest.mark.asyncio
+async def test_argo_engine_new_submit_failed(mock_submission_delay, get_engine):
+    engine = get_engine(
+        MockArgoServer(responses={("POST", f"/api/v1/workflows/{ARGO_NAMESPACE}"): 400})
     )
     request_body = {
         "n_pcs": 3,
@@ -704,23 +986,39 @@ def test_argo_engine_new_submit_failed():
 
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
-    ) as mock_config_dict, pytest.raises(Exception):
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
+    ) as mock_config_dict, mock.patch(
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+    ) as mock_id_and_limit, mock.patch(
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
+    ) as mock_check_workflow_cap, pytest.raises(
+        Exception
+    ):
         mock_config_dict.return_value = config
-        res = engine.workflow_submission(request_body, EXAMPLE_AUTH_HEADER)
+        mock_id_and_limit.return_value = None, None
+        mock_check_workflow_cap.return_value = 1, 50
+        res = await engine.workflow_submission(request_body, EXAMPLE_AUTH_HEADER)
 
 
-def test_argo_engine_get_archived_workflow_log_succeeded():
+@pytest.mark.asyncio
+async def test_argo_engine_get_archived_workflow_log_succeeded():
     """
     Fetch workflow error logs at archived workflow endpoint
     """
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     mock_return_archived_wf = {
         "metadata": {"name": "archived_wf"},
         "spec": {"arguments": "test_args"},
         "status": {
             "phase": "Failed",
             "nodes": {
+                "step_one_retry": {
+                    "name": "step_one_name",
+                    "type": "Retry",
+                    "displayName": "generate-attrition-csv",
+                    "phase": "Failed",
+                    "startedAt": "2023-03-22T16:48:51Z",
+                },
                 "step_one_name": {
                     "name": "step_one_name(0)",
                     "type": "Pod",
@@ -728,18 +1026,24 @@ def test_argo_engine_get_archived_workflow_log_succeeded():
                     "templateName": "step_one_template",
                     "message": "ReadTimeout",
                     "phase": "Failed",
-                }
+                },
             },
         },
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         return_value=mock_return_archived_wf
     )
-    engine._get_workflow_node_artifact = mock.MagicMock(
+    engine._get_workflow_node_log_excerpt = mock.AsyncMock(
         return_value="Problem with mutate()"
     )
-    engine._find_first_failed_node = mock.MagicMock(return_value="step_one_name")
-    archived_workflow_errors = engine.get_workflow_logs("archived_wf", "archived_uid")
+    archived_workflow_errors = await engine.get_workflow_logs(
+        "archived_wf", "archived_uid"
+    )
+    # the node tree is fetched only once:
+    engine._get_archived_workflow_details_dict.assert_called_once_with("archived_uid")
+    engine._get_workflow_node_log_excerpt.assert_called_once_with(
+        uid="archived_uid", node_id="step_one_name"
+    )
     assert len(archived_workflow_errors) == 1
     assert archived_workflow_errors[0]["node_type"] == "Pod"
     assert archived_workflow_errors[0]["step_template"] == "step_one_template"
@@ -749,15 +1053,23 @@ def test_argo_engine_get_archived_workflow_log_succeeded():
     )
 
 
-def test_argo_engine_get_workflow_log_succeeded():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_log_succeeded():
     """
     Fetch workflow error logs at workflow endpoint, but failed to fetch at archived workflow endpoint
     """
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     mock_return_wf = {
         "status": {
             "phase": "Failed",
             "nodes": {
+                "step_one_retry": {
+                    "name": "step_one_name",
+                    "type": "Retry",
+                    "displayName": "generate-attrition-csv",
+                    "phase": "Failed",
+                    "startedAt": "2023-03-22T16:48:51Z",
+                },
                 "step_one_name": {
                     "name": "step_one_name(0)",
                     "type": "Pod",
@@ -765,20 +1077,20 @@ def test_argo_engine_get_workflow_log_succeeded():
                     "templateName": "step_one_template",
                     "message": "ReadTimeout",
                     "phase": "Failed",
-                }
+                },
             },
         }
     }
-    engine._get_archived_workflow_details_dict = mock.MagicMock(
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
         side_effect=NotFoundException("Not found")
     )
-    engine._get_workflow_phase = mock.MagicMock(return_value="Failed")
-    engine._get_workflow_node_artifact = mock.MagicMock(
+    engine._get_workflow_node_log_excerpt = mock.AsyncMock(
         return_value="requests.exceptions.ReadTimeout\nHTTPConnectionPool"
     )
-    engine._find_first_failed_node = mock.MagicMock(return_value="step_one_name")
-    engine._get_workflow_log_dict = mock.MagicMock(return_value=mock_return_wf)
-    workflow_errors = engine.get_workflow_logs("active_wf", "wf_uid")
+    engine._get_workflow_log_dict = mock.AsyncMock(return_value=mock_return_wf)
+    workflow_errors = await engine.get_workflow_logs("active_wf", "wf_uid")
+    # phase and nodes are fetched in one request:
+    engine._get_workflow_log_dict.assert_called_once_with("active_wf")
     assert len(workflow_errors) == 1
     assert workflow_errors[0]["name"] == "step_one_name(0)"
     assert (
@@ -787,21 +1099,37 @@ def test_argo_engine_get_workflow_log_succeeded():
     )
 
 
-def test_get_archived_workflow_wf_name_and_team_project():
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_log_remembered_active_workflow():
+    """
+    Fetch workflow logs of a workflow known to be active without querying the archived workflow endpoint
+    """
+    engine = AsyncArgoEngine()
+    engine.workflow_location_cache["wf_uid"] = "active_workflow"
+    engine._get_archived_workflow_details_dict = mock.AsyncMock()
+    engine._get_workflow_log_dict = mock.AsyncMock(
+        return_value={"status": {"phase": "Running"}}
+    )
+    assert await engine.get_workflow_logs("active_wf", "wf_uid") == []
+    engine._get_archived_workflow_details_dict.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_archived_workflow_wf_name_and_team_project():
     """check if this helper method returns the expected values and returns results from cache if called a second time for the same workflow"""
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     mock_return_wf = {
         "wf_name": "dummy_wf_name",
         GEN3_TEAM_PROJECT_METADATA_LABEL: "dummy_team_project_label",
         GEN3_USER_METADATA_LABEL: "dummy_user",
     }
 
-    engine.get_workflow_details = mock.MagicMock(return_value=mock_return_wf)
+    engine.get_workflow_details = mock.AsyncMock(return_value=mock_return_wf)
     (
         given_name,
         team_project,
         gen3username,
-    ) = engine._get_archived_workflow_wf_name_and_team_project("dummy_uid")
+    ) = await engine._get_archived_workflow_wf_name_and_team_project("dummy_uid")
     assert given_name == "dummy_wf_name"
     assert team_project == "dummy_team_project_label"
     assert gen3username == "dummy_user"
@@ -809,21 +1137,22 @@ def test_get_archived_workflow_wf_name_and_team_project():
     # test the internal caching that happens at _get_archived_workflow_wf_name_and_team_project,
     # by setting the get_workflow_details to return None and show that it was not called,
     # as the result is still the previous one:
-    engine.get_workflow_details = mock.MagicMock(return_value=None)
+    engine.get_workflow_details = mock.AsyncMock(return_value=None)
     (
         given_name,
         team_project,
         gen3username,
-    ) = engine._get_archived_workflow_wf_name_and_team_project("dummy_uid")
+    ) = await engine._get_archived_workflow_wf_name_and_team_project("dummy_uid")
     assert given_name == "dummy_wf_name"
     assert team_project == "dummy_team_project_label"
     assert gen3username == "dummy_user"
 
 
+@pytest.mark.asyncio
 @freeze_time("Nov 16th, 2023")
-def test_get_user_workflows_for_current_month(monkeypatch):
+async def test_get_user_workflows_for_current_month(monkeypatch):
 
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
     workflows_mock_response = [
         {
             "uid": "uid_1",
@@ -864,26 +1193,27 @@ def test_get_user_workflows_for_current_month(monkeypatch):
             "submittedAt": "2023-11-02T00:00:00Z",
         },
     ]
-    engine.get_workflows_for_label_selector = mock.MagicMock(
+    engine.get_workflows_for_label_selector = mock.AsyncMock(
         return_value=workflows_mock_response
     )
 
-    user_monthly_workflow = engine.get_user_workflows_for_current_month(
+    user_monthly_workflow = await engine.get_user_workflows_for_current_month(
         EXAMPLE_AUTH_HEADER
     )
 
     assert user_monthly_workflow == expected_workflow_reponse
 
 
-def test_check_user_monthly_workflow_cap():
+@pytest.mark.asyncio
+async def test_check_user_monthly_workflow_cap():
     headers = {
         "Content-Type": "application/json",
         "Authorization": EXAMPLE_AUTH_HEADER,
     }
-    engine = ArgoEngine()
+    engine = AsyncArgoEngine()
 
     with patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.get_user_workflows_for_current_month"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.get_user_workflows_for_current_month"
     ) as mock_get_workflow:
         mock_get_workflow.return_value = [
             {"wf_name": "workflow1"},
@@ -892,14 +1222,18 @@ def test_check_user_monthly_workflow_cap():
 
         # Test Under Default Limit
         assert (
-            engine.check_user_monthly_workflow_cap(headers["Authorization"], None, None)
+            await engine.check_user_monthly_workflow_cap(
+                headers["Authorization"], None, None
+            )
             == 2,
             GEN3_NON_VA_WORKFLOW_MONTHLY_CAP,
         )
 
         # Test Custom Limit
         assert (
-            engine.check_user_monthly_workflow_cap(headers["Authorization"], None, 2)
+            await engine.check_user_monthly_workflow_cap(
+                headers["Authorization"], None, 2
+            )
             == 2,
             2,
         )
@@ -911,7 +1245,7 @@ def test_check_user_monthly_workflow_cap():
         mock_get_workflow.return_value = workflows
 
         assert (
-            engine.check_user_monthly_workflow_cap(
+            await engine.check_user_monthly_workflow_cap(
                 headers["Authorization"], "1234", None
             )
             == GEN3_NON_VA_WORKFLOW_MONTHLY_CAP + 1,
@@ -924,30 +1258,30 @@ def test_check_user_monthly_workflow_cap():
             workflows.append({"wf_name": "workflow" + str(index)})
         mock_get_workflow.return_value = workflows
         assert (
-            engine.check_user_monthly_workflow_cap(headers["Authorization"], None, None)
+            await engine.check_user_monthly_workflow_cap(
+                headers["Authorization"], None, None
+            )
             == GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP + 1,
             GEN3_DEFAULT_WORKFLOW_MONTHLY_CAP,
         )
 
 
-def test_submit_workflow_with_user_billing_id():
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(return_value=None)
+@pytest.mark.asyncio
+async def test_submit_workflow_with_user_billing_id(mock_submission_delay, get_engine):
+    engine = get_engine(MockArgoServer())
 
-    with patch("requests.get") as mock_requests, mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+    with mock.patch(
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
-        mock_requests.side_effect = mocked_requests_get
-
         config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
         mock_config_dict.return_value = config
         mock_check_workflow_cap.return_value = 2, 50
 
-        # Sets User tags via mocked_requests_get
+        # Sets User tags served by the MockArgoServer as fence user info
         tag_data["user_tags"] = {"tags": {}}
-        result = engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        result = await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
 
         # Billing ID is Null
         assert mock_check_workflow_cap.call_args.args[1] == None
@@ -955,66 +1289,817 @@ def test_submit_workflow_with_user_billing_id():
         assert mock_check_workflow_cap.call_args.args[2] == None
 
         tag_data["user_tags"] = {"tags": {"othertag1": "tag1"}}
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
         assert mock_check_workflow_cap.call_args.args[1] == None
         assert mock_check_workflow_cap.call_args.args[2] == None
 
         tag_data["user_tags"] = {"tags": {"othertag1": "tag1", "billing_id": "1234"}}
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
         assert mock_check_workflow_cap.call_args.args[1] == "1234"
         assert mock_check_workflow_cap.call_args.args[2] == None
 
         tag_data["user_tags"] = {
             "tags": {"othertag1": "tag1", "billing_id": "1234", "workflow_limit": 34}
         }
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
         assert mock_check_workflow_cap.call_args.args[1] == "1234"
         assert mock_check_workflow_cap.call_args.args[2] == 34
 
         tag_data["user_tags"] = {"tags": {"othertag1": "tag1", "workflow_limit": 34}}
-        engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+        await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
         assert mock_check_workflow_cap.call_args.args[1] == None
         assert mock_check_workflow_cap.call_args.args[2] == 34
 
         tag_data["user_tags"] = 500
         with pytest.raises(Exception):
-            engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
+            await engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER)
 
 
 @pytest.mark.asyncio
-async def test_argo_engine_simultaneous_submissions_workflow_cap():
+async def test_argo_engine_simultaneous_submissions_workflow_cap(
+    mock_submission_delay, get_engine
+):
     """
     Test scenario where 2 submissions are submitted simultaneously when
     only one workflow count remain in the cap
     The first one should submit successfully but the second one should fail
     """
-    engine = ArgoEngine()
-    engine.api_instance.create_workflow = mock.MagicMock(return_value=None)
+    argo_server = MockArgoServer()
+    engine = get_engine(argo_server)
     config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
 
     with mock.patch(
-        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+        "argowrapper.engine.async_argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_id_and_limit, mock.patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_monthly_workflow_cap"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_monthly_workflow_cap"
     ) as mock_check_workflow_cap:
         mock_config_dict.return_value = config
         mock_id_and_limit.return_value = None, None
-        mock_check_workflow_cap.return_value = 49, 50
-        loop = asyncio.get_event_loop()
+        # Simulate Argo registering the first submission before the second one
+        # checks the cap, which the per user lock guarantees:
+        mock_check_workflow_cap.side_effect = [(49, 50), (50, 50)]
         # Kick Off both submissions
-        workflow1 = loop.run_in_executor(
-            None, engine.workflow_submission, parameters, EXAMPLE_AUTH_HEADER
-        )
-        workflow2 = loop.run_in_executor(
-            None, engine.workflow_submission, parameters, EXAMPLE_AUTH_HEADER
+        result1, result2 = await asyncio.gather(
+            engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER),
+            engine.workflow_submission(parameters, EXAMPLE_AUTH_HEADER),
+            return_exceptions=True,
         )
-        # Simulate Argo engine taking a couple seconds to register the call and then update the return value
-        time.sleep(2)
-        mock_check_workflow_cap.return_value = 50, 50
         # Check the result for both calls
-        result1 = await workflow1
         assert "gwas" in result1
-        with pytest.raises(Exception):
-            result2 = await workflow2
+        assert str(result2) == EXCEED_WORKFLOW_LIMIT_ERROR
+        assert len(argo_server.submitted_workflows) == 1
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_node_log_excerpt(get_engine):
+    """the main-logs artifact is streamed instead of read as a whole"""
+    requests = []
+
+    async def stream_log():
+        for chunk in [b"loading data\n  Error in mutate", b"()\n  Execution halted\n"]:
+            yield chunk
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, content=stream_log())
+
+    engine = get_engine(handler)
+    assert (
+        await engine._get_workflow_node_log_excerpt("wf_uid", "node_id")
+        == "Error in mutate()\nExecution halted\n"
+    )
+    assert requests == ["/artifacts-by-uid/wf_uid/node_id/main-logs"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_archived_workflow_log_cached():
+    """logs of archived failed workflows are served from the logs cache"""
+    engine = AsyncArgoEngine()
+    engine._get_archived_workflow_details_dict = mock.AsyncMock(
+        return_value={"status": {"phase": "Failed", "nodes": {}}}
+    )
+    engine._get_log_errors = mock.AsyncMock(return_value=[{"name": "step(0)"}])
+    assert await engine.get_workflow_logs("archived_wf", "archived_uid") == [
+        {"name": "step(0)"}
+    ]
+    assert await engine.get_workflow_logs("archived_wf", "archived_uid") == [
+        {"name": "step(0)"}
+    ]
+    engine._get_archived_workflow_details_dict.assert_called_once()
+    engine._get_log_errors.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_archived(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, json=_workflow_dict("wf_name", "wf_uid"))
+
+    engine = get_engine(handler)
+    result = await engine.get_workflow_details("wf_name", "wf_uid")
+
+    assert requests == ["/api/v1/archived-workflows/wf_uid"]
+    assert result["name"] == "wf_name"
+    assert result["wf_name"] == "given name of wf_name"
+    assert result[GEN3_TEAM_PROJECT_METADATA_LABEL] == "dummy-team-project"
+    assert engine.workflow_location_cache["wf_uid"] == "archived_workflow"
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_quotes_workflow_references(get_engine):
+    raw_paths = []
+
+    def handler(request):
+        raw_paths.append(request.url.raw_path)
+        return httpx.Response(404)
+
+    engine = get_engine(handler)
+    with pytest.raises(Exception):
+        await engine.get_workflow_details("wf_name", "../workflows/argo/other_wf")
+    # the uid stays one segment of the archived workflow url:
+    assert (
+        raw_paths[0] == b"/api/v1/archived-workflows/..%2Fworkflows%2Fargo%2Fother_wf"
+    )
+    assert raw_paths[1].startswith(
+        f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name?".encode()
+    )
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_falls_back_to_active(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.startswith("/api/v1/archived-workflows"):
+            return httpx.Response(404, json={"message": "not found"})
+        assert request.url.params["fields"] == engine.WORKFLOW_DETAILS_FIELDS
+        return httpx.Response(
+            200, json=_workflow_dict("wf_name", "wf_uid", phase="Running")
+        )
+
+    engine = get_engine(handler)
+    result = await engine.get_workflow_details("wf_name", "wf_uid")
+
+    assert result["phase"] == "Running"
+    assert engine.workflow_location_cache["wf_uid"] == "active_workflow"
+
+    # known to be running now, so the archived endpoint is skipped:
+    requests.clear()
+    await engine.get_workflow_details("wf_name", "wf_uid")
+    assert requests == [f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_summary(get_engine):
+    def handler(request):
+        if request.url.path.startswith("/api/v1/archived-workflows"):
+            return httpx.Response(200, json=_workflow_dict("wf_name", "wf_uid"))
+        assert request.url.params["fields"] == engine.WORKFLOW_SUMMARY_FIELDS
+        return httpx.Response(
+            200, json=_workflow_dict("wf_name", "wf_uid", phase="Running")
+        )
+
+    engine = get_engine(handler)
+    engine.workflow_location_cache["wf_uid"] = "active_workflow"
+    result = await engine.get_workflow_details("wf_name", "wf_uid", summary=True)
+    assert result["phase"] == "Running"
+    assert result["progress"] == "1/1"
+    assert result[GEN3_TEAM_PROJECT_METADATA_LABEL] == "dummy-team-project"
+    assert "arguments" not in result
+
+    # archived workflows are trimmed after the fact:
+    engine.workflow_location_cache["wf_uid"] = "archived_workflow"
+    result = await engine.get_workflow_details("wf_name", "wf_uid", summary=True)
+    assert result["phase"] == "Succeeded"
+    assert "arguments" not in result
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_details_not_found(get_engine):
+    engine = get_engine(lambda request: httpx.Response(500))
+
+    with pytest.raises(Exception) as exception:
+        await engine.get_workflow_details("wf_name", "wf_uid")
+    assert "could not get status of wf_name" in str(exception.value)
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_owner_labels(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        assert (
+            request.url.params["fields"] == "metadata.name,metadata.uid,metadata.labels"
+        )
+        return httpx.Response(
+            200, json={"metadata": _workflow_dict("wf_name", "wf_uid")["metadata"]}
+        )
+
+    engine = get_engine(handler)
+    expected = {
+        GEN3_USER_METADATA_LABEL: "test",
+        GEN3_TEAM_PROJECT_METADATA_LABEL: "dummy-team-project",
+    }
+    assert await engine.get_workflow_owner_labels("wf_name", "wf_uid") == expected
+    # served from the ownership index the second time:
+    assert await engine.get_workflow_owner_labels("wf_name", "wf_uid") == expected
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_for_label_selector(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}":
+            return httpx.Response(
+                200,
+                json={"items": [_workflow_dict("wf_active", "uid_1", phase="Running")]},
+            )
+        if request.url.path == "/api/v1/archived-workflows":
+            # archived list items don't have annotations or labels:
+            return httpx.Response(
+                200,
+                json={
+                    "items": [
+                        {
+                            "metadata": {"name": name, "uid": uid},
+                            "status": {"phase": "Succeeded"},
+                        }
+                        for name, uid in (("wf_a", "uid_2"), ("wf_b", "uid_3"))
+                    ]
+                },
+            )
+        uid = request.url.path.split("/")[-1]
+        return httpx.Response(200, json=_workflow_dict(f"wf_{uid}", uid))
+
+    engine = get_engine(handler)
+    result = await engine.get_workflows_for_label_selector("dummy_label")
+
+    assert [workflow["uid"] for workflow in result] == ["uid_1", "uid_2", "uid_3"]
+    assert result[2]["wf_name"] == "given name of wf_uid_3"
+    assert result[2][GEN3_TEAM_PROJECT_METADATA_LABEL] == "dummy-team-project"
+    assert sorted(requests[2:]) == [
+        "/api/v1/archived-workflows/uid_2",
+        "/api/v1/archived-workflows/uid_3",
+    ]
+
+    # archived workflow details are cached:
+    requests.clear()
+    await engine.get_workflows_for_label_selector("dummy_label")
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_logs(get_engine):
+    nodes = {
+        "node_1": {
+            "name": "wf_name.run-null-model",
+            "displayName": "run-null-model",
+            "type": "Retry",
+            "phase": "Failed",
+            "startedAt": "2023-03-22T16:48:51Z",
+        },
+        "node_2": {
+            "name": "wf_name.run-null-model(0)",
+            "displayName": "run-null-model(0)",
+            "templateName": "run-null-model",
+            "type": "Pod",
+            "phase": "Failed",
+            "message": "Error (exit code 1)",
+        },
+    }
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.startswith("/artifacts-by-uid"):
+            return httpx.Response(200, content=b"some output\nError: it failed\n")
+        return httpx.Response(
+            200, json=_workflow_dict("wf_name", "wf_uid", phase="Failed", nodes=nodes)
+        )
+
+    engine = get_engine(handler)
+    result = await engine.get_workflow_logs("wf_name", "wf_uid")
+
+    assert len(result) == 1
+    assert result[0]["name"] == "wf_name.run-null-model(0)"
+    assert result[0]["step_name"] == "run-null-model"
+    assert requests == [
+        "/api/v1/archived-workflows/wf_uid",
+        "/artifacts-by-uid/wf_uid/node_2/main-logs",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_archived_workflow_owner_check_and_logs(get_engine):
+    nodes = {
+        "node_1": {
+            "name": "wf_name.run-null-model",
+            "displayName": "run-null-model",
+            "type": "Retry",
+            "phase": "Failed",
+            "startedAt": "2023-03-22T16:48:51Z",
+        },
+        "node_2": {
+            "name": "wf_name.run-null-model(0)",
+            "displayName": "run-null-model(0)",
+            "templateName": "run-null-model",
+            "type": "Pod",
+            "phase": "Failed",
+        },
+    }
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.startswith("/artifacts-by-uid"):
+            return httpx.Response(200, content=b"Error: it failed\n")
+        if request.url.path == "/api/v1/archived-workflows/wf_uid":
+            return httpx.Response(
+                200,
+                json=_workflow_dict("wf_name", "wf_uid", phase="Failed", nodes=nodes),
+            )
+        return httpx.Response(404)
+
+    engine = get_engine(handler)
+    await engine.get_workflow_owner_labels("wf_name", "wf_uid")
+    await engine.get_workflow_logs("wf_name", "wf_uid")
+    # the archived workflow is fetched once for both:
+    assert requests == [
+        f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name",
+        "/api/v1/archived-workflows/wf_uid",
+        "/artifacts-by-uid/wf_uid/node_2/main-logs",
+    ]
+
+    # known to be archived, so the workflow endpoint is skipped:
+    requests.clear()
+    engine.workflow_owner_labels_cache.clear()
+    engine.archived_workflow_cache.clear()
+    await engine.get_workflow_owner_labels("wf_name", "wf_uid")
+    assert requests == ["/api/v1/archived-workflows/wf_uid"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_cancel_workflow(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        return httpx.Response(200, json={})
+
+    engine = get_engine(handler)
+    result = await engine.cancel_workflow("wf_name")
+
+    assert result == "wf_name canceled sucessfully"
+    assert requests == [
+        ("PUT", f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name/terminate")
+    ]
+
+    engine = get_engine(lambda request: httpx.Response(404))
+    with pytest.raises(Exception):
+        await engine.cancel_workflow("wf_name")
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_cancel_workflows(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.endswith("/wf_missing/terminate"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={})
+
+    engine = get_engine(handler)
+    results = await engine.cancel_workflows(["wf_1", "wf_missing", "wf_2"])
+
+    assert results[0] == "wf_1 canceled sucessfully"
+    assert isinstance(results[1], Exception)
+    assert results[2] == "wf_2 canceled sucessfully"
+    assert len(requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_owner_labels(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}":
+            assert (
+                request.url.params["listOptions.labelSelector"]
+                == f"{ARGO_WORKFLOW_COMPLETED_LABEL}!=true"
+            )
+            workflow = _workflow_dict("wf_running", "uid_1", "Running")
+            return httpx.Response(
+                200, json={"items": [{"metadata": workflow["metadata"]}]}
+            )
+        if request.url.path == "/api/v1/archived-workflows/uid_2":
+            return httpx.Response(200, json=_workflow_dict("wf_archived", "uid_2"))
+        return httpx.Response(404)
+
+    engine = get_engine(handler)
+    results = await engine.get_workflows_owner_labels(
+        [("wf_running", "uid_1"), ("wf_archived", "uid_2"), ("wf_missing", "uid_3")]
+    )
+    assert results[0][GEN3_TEAM_PROJECT_METADATA_LABEL] == "dummy-team-project"
+    assert results[1][GEN3_USER_METADATA_LABEL] == "test"
+    assert isinstance(results[2], Exception)
+    # the running workflow was not fetched on its own:
+    assert f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_running" not in requests
+    assert ("wf_running", "uid_1") in engine.workflow_owner_labels_cache
+
+    # all indexed now, so nothing is listed:
+    requests.clear()
+    await engine.get_workflows_owner_labels(
+        [("wf_running", "uid_1"), ("wf_archived", "uid_2")]
+    )
+    assert requests == []
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_retry_archived_workflow(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.startswith("/api/v1/workflows"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={})
+
+    engine = get_engine(handler)
+    result = await engine.retry_workflow("wf_name", "wf_uid")
+
+    assert result == "archived wf_name retried sucessfully"
+    assert requests[-1] == "/api/v1/archived-workflows/wf_uid/retry"
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflow_logs_of_all_failed_nodes(get_engine):
+    nodes = {}
+    for segment, started_at in ((1, "10:00"), (2, "09:00"), (3, "11:00")):
+        nodes[f"retry_{segment}"] = {
+            "name": f"wf_name.run-single-assoc-{segment}",
+            "type": "Retry",
+            "phase": "Failed",
+            "startedAt": f"2023-03-22T{started_at}:00Z",
+        }
+        nodes[f"pod_{segment}"] = {
+            "name": f"wf_name.run-single-assoc-{segment}(0)",
+            "displayName": "run-single-assoc(0)",
+            "type": "Pod",
+            "phase": "Failed",
+        }
+    running_fetches = 0
+    max_running_fetches = 0
+
+    async def handler(request):
+        nonlocal running_fetches, max_running_fetches
+        if request.url.path.startswith("/artifacts-by-uid"):
+            running_fetches += 1
+            max_running_fetches = max(max_running_fetches, running_fetches)
+            await asyncio.sleep(0.01)
+            running_fetches -= 1
+            return httpx.Response(200, content=b"Error: it failed\n")
+        return httpx.Response(
+            200, json=_workflow_dict("wf_name", "wf_uid", phase="Failed", nodes=nodes)
+        )
+
+    engine = get_engine(handler)
+    result = await engine.get_workflow_logs("wf_name", "wf_uid", None)
+    assert [error["name"] for error in result] == [
+        "wf_name.run-single-assoc-2(0)",
+        "wf_name.run-single-assoc-1(0)",
+        "wf_name.run-single-assoc-3(0)",
+    ]
+    # the artifacts are fetched concurrently:
+    assert max_running_fetches == 3
+
+    result = await engine.get_workflow_logs("wf_name", "wf_uid", 2)
+    assert len(result) == 2
+    # the default still only reports the first failed node:
+    result = await engine.get_workflow_logs("wf_name", "wf_uid")
+    assert [error["name"] for error in result] == ["wf_name.run-single-assoc-2(0)"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_active_workflow_logs_in_one_request(get_engine):
+    requests = []
+
+    def handler(request):
+        requests.append((request.url.path, request.url.params.get("fields")))
+        if request.url.path.startswith("/api/v1/archived-workflows"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"status": {"phase": "Running"}})
+
+    engine = get_engine(handler)
+    assert await engine.get_workflow_logs("wf_name", "wf_uid") == []
+    assert requests[1:] == [
+        (f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_name", "status.phase,status.nodes")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_page(get_engine):
+    def _list_item(uid, day, team_project=True):
+        workflow = _workflow_dict(f"wf_{uid}", uid, phase="Running")
+        workflow["metadata"]["creationTimestamp"] = f"2023-03-{day}T16:48:51Z"
+        if not team_project:
+            del workflow["metadata"]["labels"][GEN3_TEAM_PROJECT_METADATA_LABEL]
+        return workflow
+
+    def _archived_list_item(uid, day):
+        return {
+            "metadata": {
+                "name": f"wf_{uid}",
+                "uid": uid,
+                "creationTimestamp": f"2023-03-{day}T16:48:51Z",
+            },
+            "status": {"phase": "Succeeded"},
+        }
+
+    team_project_selector = f"{GEN3_TEAM_PROJECT_METADATA_LABEL}={TEAM_PROJECT_LABEL}"
+    # the user's workflow uid_b belongs to a team project, so it is left out:
+    lists = {
+        ("active", "user"): [_list_item("uid_a", "25", team_project=False)],
+        ("archived", "user"): [_archived_list_item("uid_b", "23")],
+        ("active", "team"): [_list_item("uid_c", "24")],
+        ("archived", "team"): [
+            _archived_list_item("uid_d", "22"),
+            _archived_list_item("uid_c", "24"),
+        ],
+    }
+    detail_requests = []
+
+    def handler(request):
+        if request.url.path in (
+            f"/api/v1/workflows/{ARGO_NAMESPACE}",
+            "/api/v1/archived-workflows",
+        ):
+            list_type = "archived" if "archived" in request.url.path else "active"
+            selector_type = (
+                "team"
+                if request.url.params["listOptions.labelSelector"]
+                == team_project_selector
+                else "user"
+            )
+            return httpx.Response(200, json={"items": lists[list_type, selector_type]})
+        uid = request.url.path.split("/")[-1]
+        detail_requests.append(uid)
+        return httpx.Response(200, json=_workflow_dict(f"wf_{uid}", uid))
+
+    engine = get_engine(handler)
+    first_page = await engine.get_workflows_page(
+        ["dummy-team-project"], EXAMPLE_AUTH_HEADER, limit=2
+    )
+    assert [workflow["uid"] for workflow in first_page["items"]] == ["uid_a", "uid_c"]
+    assert first_page["items"][1]["phase"] == "Running"
+    # archived workflows after the page are not looked up:
+    assert detail_requests == []
+
+    second_page = await engine.get_workflows_page(
+        ["dummy-team-project"],
+        EXAMPLE_AUTH_HEADER,
+        limit=2,
+        continue_token=first_page["continue"],
+    )
+    assert [workflow["uid"] for workflow in second_page["items"]] == ["uid_d"]
+    assert second_page["items"][0]["wf_name"] == "given name of wf_uid_d"
+    assert second_page["continue"] is None
+
+    # a workflow submitted in the meantime doesn't shift the next pages:
+    lists["active", "team"].append(_list_item("uid_e", "26"))
+    second_page_again = await engine.get_workflows_page(
+        ["dummy-team-project"],
+        EXAMPLE_AUTH_HEADER,
+        limit=2,
+        continue_token=first_page["continue"],
+    )
+    assert second_page_again["items"] == second_page["items"]
+
+    with pytest.raises(ValueError):
+        await engine.get_workflows_page(
+            [], EXAMPLE_AUTH_HEADER, limit=2, continue_token="not a token"
+        )
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_page_filtered(get_engine):
+    list_requests = []
+
+    def _archived_list_item(uid, day):
+        return {
+            "metadata": {
+                "name": f"wf_{uid}",
+                "uid": uid,
+                "creationTimestamp": f"2023-03-{day}T16:48:51Z",
+            },
+            "status": {"phase": "Failed"},
+        }
+
+    def handler(request):
+        if request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}":
+            list_requests.append(request.url.params["listOptions.labelSelector"])
+            return httpx.Response(200, json={"items": []})
+        if request.url.path == "/api/v1/archived-workflows":
+            return httpx.Response(
+                200,
+                json={
+                    "items": [
+                        _archived_list_item("uid_a", "20"),
+                        _archived_list_item("uid_b", "22"),
+                        _archived_list_item("uid_c", "24"),
+                    ]
+                },
+            )
+        uid = request.url.path.split("/")[-1]
+        workflow = _workflow_dict(f"wf_{uid}", uid, phase="Failed")
+        del workflow["metadata"]["labels"][GEN3_TEAM_PROJECT_METADATA_LABEL]
+        workflow["metadata"]["annotations"]["workflow_name"] = f"run {uid}"
+        detail_requests.append(uid)
+        return httpx.Response(200, json=workflow)
+
+    detail_requests = []
+    engine = get_engine(handler)
+    page = await engine.get_workflows_page(
+        [],
+        EXAMPLE_AUTH_HEADER,
+        limit=None,
+        workflow_list_filter=WorkflowListFilter(
+            phases=["Failed"],
+            submitted_after="2023-03-21T00:00:00Z",
+            wf_name_contains="UID_B",
+            descending=False,
+        ),
+    )
+    assert [workflow["uid"] for workflow in page["items"]] == ["uid_b"]
+    assert page["continue"] is None
+    assert list_requests[0].endswith(f",{ARGO_WORKFLOW_PHASE_LABEL} in (Failed)")
+    # workflows submitted too early are not looked up:
+    assert sorted(detail_requests) == ["uid_b", "uid_c"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_stream(get_engine):
+    detail_requests = []
+
+    def handler(request):
+        if request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}":
+            return httpx.Response(200, json={"items": []})
+        if request.url.path == "/api/v1/archived-workflows":
+            return httpx.Response(
+                200,
+                json={
+                    "items": [
+                        {
+                            "metadata": {
+                                "name": f"wf_{index}",
+                                "uid": f"uid_{index:03}",
+                                "creationTimestamp": "2023-03-22T16:48:51Z",
+                            },
+                            "status": {"phase": "Succeeded"},
+                        }
+                        for index in range(120)
+                    ]
+                },
+            )
+        uid = request.url.path.split("/")[-1]
+        detail_requests.append(uid)
+        workflow = _workflow_dict(f"wf_{uid}", uid)
+        del workflow["metadata"]["labels"][GEN3_TEAM_PROJECT_METADATA_LABEL]
+        return httpx.Response(200, json=workflow)
+
+    engine = get_engine(handler)
+    workflows = await engine.get_workflows_stream([], EXAMPLE_AUTH_HEADER)
+    # nothing is looked up before the first workflow is asked for:
+    assert detail_requests == []
+    first_workflow = await workflows.__anext__()
+    assert first_workflow["uid"] == "uid_119"
+    assert len(detail_requests) == WORKFLOWS_STREAM_BATCH_SIZE
+    remaining_workflows = [workflow async for workflow in workflows]
+    assert len(remaining_workflows) == 119
+    assert len(detail_requests) == 120
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_get_workflows_details(get_engine):
+    requests = []
+    label_selectors = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}":
+            label_selector = request.url.params["listOptions.labelSelector"]
+            label_selectors.append(label_selector)
+            assert "items.metadata.uid" in request.url.params["fields"]
+            assert "items.status.nodes" not in request.url.params["fields"]
+            if GEN3_USER_METADATA_LABEL in label_selector:
+                return httpx.Response(200, json={"items": []})
+            return httpx.Response(
+                200,
+                json={"items": [_workflow_dict("wf_running", "uid_1", "Running")]},
+            )
+        if request.url.path == "/api/v1/archived-workflows/uid_2":
+            return httpx.Response(
+                200, json=_workflow_dict("wf_archived", "uid_2", "Failed")
+            )
+        return httpx.Response(404)
+
+    engine = get_engine(handler)
+    results = await engine.get_workflows_details(
+        [("wf_running", "uid_1"), ("wf_archived", "uid_2"), ("wf_missing", "uid_3")],
+        EXAMPLE_AUTH_HEADER,
+        ["dummy-team-project", "other-team-project"],
+    )
+    assert results[0]["name"] == "wf_running"
+    assert results[0]["phase"] == "Running"
+    assert results[1]["name"] == "wf_archived"
+    assert isinstance(results[2], Exception)
+    # the running workflow was not fetched on its own:
+    assert f"/api/v1/workflows/{ARGO_NAMESPACE}/wf_running" not in requests
+    # only the running workflows of the user and of the team projects are listed:
+    other_team_project_label = argo_engine_helper.convert_gen3teamproject_to_pod_label(
+        "other-team-project"
+    )
+    assert sorted(label_selectors) == sorted(
+        [
+            f"{ARGO_WORKFLOW_COMPLETED_LABEL}!=true,{engine._get_user_label_selector(EXAMPLE_AUTH_HEADER)}",
+            f"{ARGO_WORKFLOW_COMPLETED_LABEL}!=true,{GEN3_TEAM_PROJECT_METADATA_LABEL} in ({TEAM_PROJECT_LABEL},{other_team_project_label})",
+        ]
+    )
+
+    # without team projects, only the user's running workflows are listed:
+    label_selectors.clear()
+    await engine.get_workflows_details([("wf_running", "uid_1")], EXAMPLE_AUTH_HEADER)
+    assert len(label_selectors) == 1
+    assert GEN3_USER_METADATA_LABEL in label_selectors[0]
+
+    # finished workflows don't need the list of running workflows:
+    requests.clear()
+    engine.archived_workflow_cache.clear()
+    results = await engine.get_workflows_details(
+        [("wf_archived", "uid_2")], EXAMPLE_AUTH_HEADER
+    )
+    assert results[0]["phase"] == "Failed"
+    assert requests == ["/api/v1/archived-workflows/uid_2"]
+
+
+@pytest.mark.asyncio
+async def test_argo_engine_workflow_batch_submission(get_engine):
+    submitted_workflows = []
+
+    def handler(request):
+        assert request.method == "POST"
+        workflow = json.loads(request.content)["workflow"]
+        submitted_workflows.append(workflow)
+        if len(submitted_workflows) == 2:
+            return httpx.Response(500)
+        return httpx.Response(
+            200, json={"metadata": {"uid": f"uid_{len(submitted_workflows)}"}}
+        )
+
+    request_body = {
+        "n_pcs": 3,
+        "template_version": "test",
+        "variables": [{"variable_type": "custom_dichotomous", "cohort_ids": [1, 3]}],
+        "outcome": 1,
+        TEAM_PROJECT_FIELD_NAME: "dummy-team-project",
+    }
+    engine = get_engine(handler)
+    config = {"environment": "default", "scaling_groups": {"default": "group_1"}}
+    with mock.patch(
+        "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
+    ) as mock_config_dict, mock.patch.object(
+        engine, "check_user_info_for_billing_id_and_workflow_limit"
+    ) as mock_id_and_limit, mock.patch.object(
+        engine, "check_user_monthly_workflow_cap"
+    ) as mock_check_workflow_cap, mock.patch.object(
+        engine, "_release_user_lock_later"
+    ) as mock_release_user_lock_later:
+        mock_config_dict.return_value = config
+        mock_id_and_limit.return_value = None, None
+        mock_check_workflow_cap.return_value = 7, 10
+
+        results = await engine.workflow_batch_submission(
+            [request_body] * 4, EXAMPLE_AUTH_HEADER
+        )
+
+        # the billing info and monthly cap are checked, and the lock taken, once:
+        mock_id_and_limit.assert_called_once()
+        mock_check_workflow_cap.assert_called_once()
+        mock_release_user_lock_later.assert_called_once()
+        # only 3 workflows are left this month:
+        assert len(submitted_workflows) == 3
+        assert "gwas" in results[0]
+        assert isinstance(results[1], Exception)
+        assert "gwas" in results[2]
+        assert str(results[3]) == EXCEED_WORKFLOW_LIMIT_ERROR
+        assert (results[0], "uid_1") in engine.workflow_owner_labels_cache
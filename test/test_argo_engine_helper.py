@@ -1,3 +1,4 @@
+import asyncio
 import importlib.resources as pkg_resources
 import re
 import unittest.mock as mock
@@ -5,6 +6,7 @@ from collections import namedtuple
 
 import pytest
 import yaml
+from argo_workflows.exceptions import NotFoundException
 
 import argowrapper.engine.helpers.argo_engine_helper as argo_engine_helper
 from argowrapper import argo_workflows_templates
@@ -52,6 +54,17 @@ def test_convert_gen3teamproject_to_pod_label_and_back():
     assert team_project == converted_team_project
 
 
+def test_quote_path_segment():
+    assert argo_engine_helper.quote_path_segment("wf_uid") == "wf_uid"
+    assert (
+        argo_engine_helper.quote_path_segment("../workflows/argo/wf?x=1")
+        == "..%2Fworkflows%2Fargo%2Fwf%3Fx%3D1"
+    )
+    for dot_segment in (".", ".."):
+        with pytest.raises(NotFoundException):
+            argo_engine_helper.quote_path_segment(dot_segment)
+
+
 WorkflowStatusData = namedtuple("WorkflowStatusData", "parsed_phase shutdown phase")
 phase_shutdown_data = [
     WorkflowStatusData("Canceling", "Terminate", "Running"),
@@ -191,6 +204,34 @@ def test_parse_details():
     assert parsed_item.get("outputs") == {"out1": "one"}
 
 
+def test_parse_summary():
+    workflow_item = {
+        "metadata": {
+            "name": "test_wf",
+            "annotations": {"workflow_name": "custom_name"},
+            "creationTimestamp": "test_starttime",
+            "labels": {GEN3_USER_METADATA_LABEL: "dummyuser"},
+        },
+        "spec": {"arguments": "test_args"},
+        "status": {
+            "phase": "Succeeded",
+            "progress": "5/5",
+            "startedAt": "test_starttime",
+            "finishedAt": "test_finishtime",
+            "outputs": {"out1": "one"},
+        },
+    }
+
+    parsed_item = argo_engine_helper.parse_summary(workflow_item, "archived_workflow")
+    assert parsed_item.get("phase") == "Succeeded"
+    assert parsed_item.get("wf_name") == "custom_name"
+    assert parsed_item.get("progress") == "5/5"
+    assert parsed_item.get("finishedAt") == "test_finishtime"
+    assert parsed_item.get(GEN3_USER_METADATA_LABEL) == "dummyuser"
+    assert "arguments" not in parsed_item
+    assert "outputs" not in parsed_item
+
+
 def test_parse_list_item():
     workflow_item = {
         "metadata": {
@@ -384,3 +425,31 @@ def test__convert_request_body_to_parameter_dict():
     assert len(expected_result.items()) == len(result.items())
     for key, value in expected_result.items():
         assert value == result[key]
+
+
+@pytest.mark.asyncio
+async def test_gather_with_concurrency_limit():
+    running = []
+    max_running = []
+
+    async def task(value):
+        running.append(value)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(value)
+        return value
+
+    result = await argo_engine_helper.gather_with_concurrency_limit(
+        2, *[task(value) for value in range(5)]
+    )
+    assert result == [0, 1, 2, 3, 4]
+    assert max(max_running) == 2
+
+
+def test_continue_token():
+    sort_key = ("2023-03-22T16:48:51Z", "uid_1")
+    token = argo_engine_helper.encode_continue_token(sort_key)
+    assert argo_engine_helper.decode_continue_token(token) == sort_key
+    for invalid_token in ("not a token", "W10=", "eyJhIjogMX0="):
+        with pytest.raises(ValueError):
+            argo_engine_helper.decode_continue_token(invalid_token)
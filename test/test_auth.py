@@ -2,14 +2,18 @@ from re import A
 import pytest
 import unittest.mock as mock
 from unittest.mock import patch
-from argowrapper.constants import ARGO_ACCESS_SERVICE
+from argowrapper.constants import (
+    ARGO_ACCESS_SERVICE,
+    TEAM_PROJECT_ACCESS_METHOD,
+    TEAM_PROJECT_ACCESS_SERVICE,
+)
 
-from argowrapper.auth import Auth
+from argowrapper.auth import AsyncAuth
 from gen3authz.client.arborist.errors import ArboristError
 
 
 def test_parse_token_suceed():
-    auth = Auth()
+    auth = AsyncAuth()
 
     token = "Bearer something.something.something"
     jwt = auth._parse_jwt(token)
@@ -25,7 +29,7 @@ def test_parse_token_suceed():
 
 
 def test_parse_token_failed():
-    auth = Auth()
+    auth = AsyncAuth()
 
     token = "basomasdfpomasopdfma"
     jwt = auth._parse_jwt(token)
@@ -36,57 +40,63 @@ def test_parse_token_failed():
     assert jwt == ""
 
 
-def test_authenticate_suceed():
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(return_value=True)
+@pytest.mark.asyncio
+async def test_authenticate_suceed():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(return_value=True)
     token = "Bearer test.test.test"
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == True
 
 
-def test_authenticate_failed():
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(return_value=False)
+@pytest.mark.asyncio
+async def test_authenticate_failed():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(return_value=False)
     token = "Bearer fail"
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == False
 
 
-def test_authenticate_failed2():
-    auth = Auth()
+@pytest.mark.asyncio
+async def test_authenticate_failed2():
+    auth = AsyncAuth()
     token = None
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == False
 
 
-def test_authenticate_failed3():
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(
+@pytest.mark.asyncio
+async def test_authenticate_failed3():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(
         side_effect=ArboristError("Arborist Error", "error code")
     )
     token = "Bearer test.test.test"
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == False
 
 
-def test_authenticate_failed4():
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(
+@pytest.mark.asyncio
+async def test_authenticate_failed4():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(
         side_effect=Exception("Arborist Error")
     )
     authorized = None
     token = "Bearer test.test.test"
     with pytest.raises(Exception) as exception:
-        authorized = auth.authenticate(token)
+        authorized = await auth.authenticate(token)
 
     assert authorized is None
 
 
-def test_should_fail_if_only_one_of_authorizations_fails1():
+@pytest.mark.asyncio
+async def test_should_fail_if_only_one_of_authorizations_fails1():
     def mock_auth_request(jwt, service, method, resources):
         """dummy implementation that fails only for argo auth"""
         if service == ARGO_ACCESS_SERVICE:
@@ -94,18 +104,19 @@ def test_should_fail_if_only_one_of_authorizations_fails1():
         else:
             return True
 
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(side_effect=mock_auth_request)
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(side_effect=mock_auth_request)
     token = "Bearer test.test.test"
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == False
 
-    authorized = auth.authenticate(token, team_project="test")
+    authorized = await auth.authenticate(token, team_project="test")
     assert authorized == False
 
 
-def test_should_fail_if_only_one_of_authorizations_fails2():
+@pytest.mark.asyncio
+async def test_should_fail_if_only_one_of_authorizations_fails2():
     def mock_auth_request(jwt, service, method, resources):
         """dummy implementation that succeeds always for argo auth"""
         if service == ARGO_ACCESS_SERVICE:
@@ -113,12 +124,46 @@ def test_should_fail_if_only_one_of_authorizations_fails2():
         else:
             return False
 
-    auth = Auth()
-    auth.arborist_client.auth_request = mock.MagicMock(side_effect=mock_auth_request)
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(side_effect=mock_auth_request)
     token = "Bearer test.test.test"
 
-    authorized = auth.authenticate(token)
+    authorized = await auth.authenticate(token)
     assert authorized == True
 
-    authorized = auth.authenticate(token, team_project="test")
+    authorized = await auth.authenticate(token, team_project="test")
+    assert authorized == False
+
+
+@pytest.mark.asyncio
+async def test_async_authenticate_suceed():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(return_value=True)
+    token = "Bearer test.test.test"
+
+    authorized = await auth.authenticate(token)
+    assert authorized == True
+
+    authorized = await auth.authenticate(token, team_project="test")
+    assert authorized == True
+    auth.arborist_client.auth_request.assert_called_with(
+        "test.test.test",
+        TEAM_PROJECT_ACCESS_SERVICE,
+        TEAM_PROJECT_ACCESS_METHOD,
+        resources="test",
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_authenticate_failed():
+    auth = AsyncAuth()
+    auth.arborist_client.auth_request = mock.AsyncMock(
+        side_effect=ArboristError("Arborist Error", "error code")
+    )
+    token = "Bearer test.test.test"
+
+    authorized = await auth.authenticate(token)
+    assert authorized == False
+
+    authorized = await auth.authenticate(None)
     assert authorized == False
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from argowrapper.compression import (
+    CompressionMiddleware,
+    get_accepted_encodings,
+    parse_compression_encodings,
+)
+
+LARGE_BODY = "workflow " * 1000
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE_BODY, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("workflow")
+
+    @app.get("/stream")
+    async def stream():
+        async def _chunks():
+            for _ in range(3):
+                yield LARGE_BODY
+
+        return StreamingResponse(_chunks(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter([LARGE_BODY]), media_type="text/event-stream")
+
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=["gzip"],
+        minimum_size=1024,
+        gzip_level=5,
+        brotli_level=4,
+    )
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_parse_compression_encodings():
+    assert parse_compression_encodings("") == []
+    assert parse_compression_encodings(" gzip ") == ["gzip"]
+    with pytest.raises(Exception):
+        parse_compression_encodings("deflate")
+
+
+def test_get_accepted_encodings():
+    assert get_accepted_encodings("gzip, deflate;q=0.5, br;q=0") == ["gzip", "deflate"]
+    assert get_accepted_encodings("") == [""]
+
+
+def test_compression_middleware_compresses_large_responses(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert int(response.headers["Content-Length"]) < len(LARGE_BODY) / 10
+    assert response.text == LARGE_BODY
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.text == LARGE_BODY * 3
+
+
+def test_compression_middleware_leaves_other_responses_as_is(client):
+    for path, accept_encoding in (
+        ("/small", "gzip"),
+        ("/large", "identity"),
+        ("/large", "gzip;q=0"),
+        ("/events", "gzip"),
+    ):
+        response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+        assert "Content-Encoding" not in response.headers
+        assert response.status_code == 200
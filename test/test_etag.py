@@ -0,0 +1,16 @@
+from argowrapper.etag import compute_etag, etag_matches
+
+
+def test_compute_etag():
+    assert compute_etag(b'{"a":1}') == compute_etag(b'{"a":1}')
+    assert compute_etag(b'{"a":1}') != compute_etag(b'{"a":2}')
+    assert compute_etag(b"").startswith('"') and compute_etag(b"").endswith('"')
+
+
+def test_etag_matches():
+    etag = compute_etag(b"[]")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
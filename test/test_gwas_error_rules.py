@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from argowrapper.workflows.argo_workflows.gwas import GWAS
+from argowrapper.workflows.argo_workflows.gwas_error_rules import (
+    DEFAULT_GWAS_ERROR_RULES,
+    ErrorRuleMatcher,
+    load_gwas_error_rules,
+)
+
+
+@pytest.mark.parametrize(
+    "step_name,step_log,expected_error_start",
+    [
+        (
+            "run-null-model",
+            "Error: system is exactly singular",
+            "The error occurred due to small",
+        ),
+        (
+            "run-single-assoc",
+            "system is computationally singular",
+            "The error occurred due to unbalanced",
+        ),
+        ("create-indexd-record", "requests.HTTPError: 500", "An HTTP error occurred"),
+        (
+            "run-single-assoc",
+            "missing value where TRUE/FALSE needed",
+            "The error was caused by extreme outliers",
+        ),
+        # rule doesn't apply to this step:
+        ("run-null-model", "where TRUE/FALSE needed", ""),
+        ("unknown-step", "ReadTimeout", ""),
+        ("generate-attrition-csv", "no known error", ""),
+    ],
+)
+def test_interpret_gwas_workflow_error_rules(step_name, step_log, expected_error_start):
+    error = GWAS.interpret_gwas_workflow_error(step_name, step_log)
+    assert error.startswith(expected_error_start)
+    assert bool(error) == bool(expected_error_start)
+
+
+def test_error_rule_matcher_first_rule_wins():
+    """the order of the rules decides, not the position of the match in the log"""
+    log = "system is computationally singular\n...\nsystem is exactly singular"
+    assert (
+        ErrorRuleMatcher(DEFAULT_GWAS_ERROR_RULES).interpret("run-null-model", log)
+        == DEFAULT_GWAS_ERROR_RULES[0]["message"]
+    )
+
+
+def test_error_rule_matcher_overlapping_matches():
+    rules = [
+        {"step_names": ["step"], "log_contains": "Error 500", "message": "first"},
+        {"step_names": ["step"], "log_contains": "HTTPError", "message": "second"},
+    ]
+    assert ErrorRuleMatcher(rules).interpret("step", "HTTPError 500") == "first"
+
+
+def test_load_gwas_error_rules(tmp_path):
+    assert load_gwas_error_rules("") == DEFAULT_GWAS_ERROR_RULES
+
+    rules_file = tmp_path / "rules.json"
+    rules = [{"step_names": ["run-null-model"], "log_contains": "(x+", "message": "m"}]
+    rules_file.write_text(json.dumps(rules))
+    assert load_gwas_error_rules(str(rules_file)) == rules
+    # patterns are matched literally:
+    assert ErrorRuleMatcher(rules).interpret("run-null-model", "a (x+ b") == "m"
+
+    rules_file.write_text(json.dumps([{"step_names": []}]))
+    with pytest.raises(Exception):
+        load_gwas_error_rules(str(rules_file))
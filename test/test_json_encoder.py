@@ -0,0 +1,39 @@
+from argowrapper import json_encoder
+from argowrapper.json_encoder import FastJSONResponse, get_json_encoder
+
+WORKFLOW_DETAILS = {
+    "name": "gwas-workflow-1234567890",
+    "phase": "Succeeded",
+    "wf_name": "my run ✓",
+    "arguments": {
+        "parameters": [{"name": "variables", "value": '[{"concept_id": 2000006886}]'}]
+    },
+    "progress": "25/25",
+    "outputs": {},
+    "finishedAt": None,
+}
+
+
+def test_json_encoders_give_the_same_output():
+    expected = (
+        '{"name":"gwas-workflow-1234567890","phase":"Succeeded","wf_name":"my run ✓",'
+        '"arguments":{"parameters":[{"name":"variables","value":"[{\\"concept_id\\": 2000006886}]"}]},'
+        '"progress":"25/25","outputs":{},"finishedAt":null}'
+    ).encode("utf-8")
+    for dumps in json_encoder.JSON_ENCODERS.values():
+        assert dumps(WORKFLOW_DETAILS) == expected
+        assert dumps([]) == b"[]"
+
+
+def test_get_json_encoder():
+    assert get_json_encoder("json") is json_encoder.JSON_ENCODERS["json"]
+    assert get_json_encoder("unknown") is json_encoder.JSON_ENCODERS["json"]
+    assert get_json_encoder("auto") is json_encoder.JSON_ENCODERS.get(
+        "orjson", json_encoder.JSON_ENCODERS["json"]
+    )
+
+
+def test_fast_json_response():
+    response = FastJSONResponse(content=WORKFLOW_DETAILS)
+    assert response.body == json_encoder.dumps(WORKFLOW_DETAILS)
+    assert response.headers["Content-Type"] == "application/json"
@@ -0,0 +1,41 @@
+from argowrapper.engine.helpers.log_error_scanner import LogErrorScanner
+
+
+def _chunks(log: bytes, chunk_size: int):
+    return [log[i : i + chunk_size] for i in range(0, len(log), chunk_size)]
+
+
+def test_log_error_scanner_keeps_log_from_first_error_line():
+    log = "loading data\n  Error in solve.default(): system is exactly singular  \n  Calls: fitNullModel\nExecution halted\n"
+    for chunk_size in (1, 3, 1000):
+        excerpt = LogErrorScanner().feed_all(_chunks(log.encode(), chunk_size))
+        assert (
+            excerpt
+            == "Error in solve.default(): system is exactly singular\nCalls: fitNullModel\nExecution halted\n"
+        )
+
+
+def test_log_error_scanner_without_error_line():
+    log = "requests.exceptions.ReadTimeout\nHTTPConnectionPool"
+    assert LogErrorScanner().feed_all([log.encode()]) == log
+
+    # only the end of the log is kept:
+    excerpt = LogErrorScanner(max_bytes=20).feed_all(_chunks(log.encode(), 4))
+    assert excerpt == "HTTPConnectionPool"
+
+
+def test_log_error_scanner_is_bounded():
+    log = b"Error: it failed\n" + b"x" * 100 + b"\n" + b"last line\n"
+    excerpt = LogErrorScanner(max_bytes=40).feed_all(_chunks(log, 7))
+    assert len(excerpt) <= 40
+    assert excerpt.startswith("Error: it failed\n")
+    assert excerpt.endswith("last line\n")
+
+    # a very long line without line breaks:
+    excerpt = LogErrorScanner(max_bytes=40).feed_all(_chunks(b"y" * 1000, 7))
+    assert len(excerpt) <= 40
+
+
+def test_log_error_scanner_decodes_multibyte_characters_split_across_chunks():
+    log = "Error: café ✓\n".encode()
+    assert LogErrorScanner().feed_all(_chunks(log, 1)) == "Error: café ✓\n"
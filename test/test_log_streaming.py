@@ -0,0 +1,78 @@
+import pytest
+
+from argowrapper.engine.helpers import log_streaming
+
+
+async def _achunks(log: bytes, chunk_size: int):
+    for i in range(0, len(log), chunk_size):
+        yield log[i : i + chunk_size]
+
+
+async def _read_all(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_parse_byte_range():
+    assert log_streaming.parse_byte_range(None) is None
+    assert log_streaming.parse_byte_range("bytes=0-99") == (0, 99)
+    assert log_streaming.parse_byte_range("bytes=100-") == (100, None)
+    assert log_streaming.parse_byte_range("bytes=-100") == (None, 100)
+    for range_header in (
+        "bytes=-",
+        "bytes=5-2",
+        "bytes=-0",
+        "bytes=0-1,4-5",
+        "lines=1-2",
+    ):
+        with pytest.raises(ValueError):
+            log_streaming.parse_byte_range(range_header)
+
+
+@pytest.mark.asyncio
+async def test_iter_byte_range():
+    log = bytes(range(100))
+    for chunk_size in (1, 7, 1000):
+        assert await _read_all(
+            log_streaming.iter_byte_range(_achunks(log, chunk_size), 10, 19)
+        ) == bytes(range(10, 20))
+        assert await _read_all(
+            log_streaming.iter_byte_range(_achunks(log, chunk_size), 95, None)
+        ) == bytes(range(95, 100))
+        assert (
+            await _read_all(
+                log_streaming.iter_byte_range(_achunks(log, chunk_size), 0, 1000)
+            )
+            == log
+        )
+
+
+@pytest.mark.asyncio
+async def test_read_suffix_bytes():
+    log = b"line 1\nline 2\nline 3\n"
+    for chunk_size in (1, 4, 1000):
+        assert await log_streaming.read_suffix_bytes(_achunks(log, chunk_size), 7) == (
+            b"line 3\n",
+            len(log),
+        )
+        assert await log_streaming.read_suffix_bytes(
+            _achunks(log, chunk_size), 1000
+        ) == (log, len(log))
+
+
+@pytest.mark.asyncio
+async def test_read_tail_lines():
+    log = b"line 1\nline 2\nline 3\nlast line"
+    for chunk_size in (1, 4, 1000):
+        assert (
+            await log_streaming.read_tail_lines(_achunks(log, chunk_size), 2, 1000)
+            == b"line 3\nlast line"
+        )
+        assert (
+            await log_streaming.read_tail_lines(_achunks(log, chunk_size), 10, 1000)
+            == log
+        )
+        # the tail is bounded by max_bytes as well:
+        assert (
+            await log_streaming.read_tail_lines(_achunks(log, chunk_size), 10, 15)
+            == b"last line"
+        )
@@ -0,0 +1,35 @@
+from argowrapper.engine.helpers.lru_dict import LRUDict
+
+
+def test_lru_dict_evicts_least_recently_used_entry():
+    cache = LRUDict(max_size=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    # reading "a" makes "b" the least recently used entry:
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    cache["d"] = 4
+    assert list(cache) == ["a", "d"]
+
+
+def test_lru_dict_overwrite_does_not_evict():
+    cache = LRUDict(max_size=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3
+    assert cache == {"a": 3, "b": 2}
+    assert list(cache) == ["b", "a"]
+
+
+def test_lru_dict_copy():
+    cache = LRUDict(max_size=2)
+    cache["a"] = 1
+    copy = cache.copy()
+    assert isinstance(copy, LRUDict)
+    assert copy == {"a": 1}
+    assert copy.max_size == 2
@@ -1,5 +1,6 @@
 import json
 from typing import Any, Generator
+import httpx
 from unittest.mock import patch
 from unittest import mock
 
@@ -8,6 +9,8 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from argowrapper.constants import *
 from test.constants import EXAMPLE_AUTH_HEADER
+from argowrapper.engine.helpers.workflow_status_watcher import WorkflowStatusWatcher
+import argowrapper.routes.routes
 from argowrapper.routes.routes import (
     router,
 )
@@ -113,7 +116,7 @@ def test_submit_workflow(client):
     ) as mock_log, patch(
         "argowrapper.routes.routes.argo_engine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_check_billing_id, patch(
-        "requests.get"
+        "argowrapper.routes.routes.argo_engine.http_client.get"
     ) as mock_requests, patch(
         "argowrapper.routes.routes.argo_engine.check_user_monthly_workflow_cap"
     ) as mock_check_monthly_cap:
@@ -139,6 +142,81 @@ def test_submit_workflow(client):
         mock_log.assert_called_with("check_auth_and_team_project")
 
 
+def test_submit_workflows_batch(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.workflow_batch_submission"
+    ) as mock_engine, patch(
+        "argowrapper.routes.routes.argo_engine.http_client.get"
+    ) as mock_requests:
+
+        async def mock_authenticate(token, team_project=None):
+            return team_project != "other-team-project"
+
+        mock_auth.side_effect = mock_authenticate
+        mock_requests.side_effect = mocked_requests_get
+        mock_engine.return_value = [
+            "gwas-workflow-1",
+            Exception(EXCEED_WORKFLOW_LIMIT_ERROR),
+        ]
+        request_body = {
+            **data,
+            "variables": variables,
+            "outcome": {"variable_type": "custom_dichotomous", "cohort_ids": [2]},
+        }
+        request_bodies = [
+            request_body,
+            {**request_body, TEAM_PROJECT_FIELD_NAME: "other-team-project"},
+            {**request_body, "source_population_cohort": 400},
+            {**request_body, "n_pcs": 4},
+        ]
+        response = client.post(
+            "/submit/batch",
+            json=request_bodies,
+            headers={"Authorization": EXAMPLE_AUTH_HEADER},
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"wf_name": "gwas-workflow-1"},
+            {
+                "error": "token is missing, not authorized, out of date, or malformed, or team_project access not granted"
+            },
+            {
+                "error": "Cohort ids submitted do NOT all belong to the same team project."
+            },
+            {"error": "You have reached the monthly workflow cap."},
+        ]
+        mock_engine.assert_called_once_with(
+            [request_bodies[0], request_bodies[3]], EXAMPLE_AUTH_HEADER
+        )
+        # the cohorts of the one accessible (source_id, team_project) are fetched once:
+        assert mock_requests.call_count == 1
+        # the user and each of the 2 team projects are checked once:
+        assert mock_auth.call_count == 3
+
+        for invalid_request_bodies in (
+            [],
+            [request_body, {**request_body, TEAM_PROJECT_FIELD_NAME: ""}],
+            [request_body, {**request_body, "source_id": None}],
+            [
+                {
+                    "variables": [],
+                    "outcome": {},
+                    "source_id": 4,
+                    TEAM_PROJECT_FIELD_NAME: "t",
+                }
+            ],
+            [request_body] * (MAX_WORKFLOWS_BATCH_SIZE + 1),
+        ):
+            mock_engine.reset_mock()
+            response = client.post(
+                "/submit/batch",
+                json=invalid_request_bodies,
+                headers={"Authorization": EXAMPLE_AUTH_HEADER},
+            )
+            assert response.status_code == 400
+            mock_engine.assert_not_called()
+
+
 def test_submit_workflow_missing_team_project(client):
 
     data = {
@@ -208,6 +286,263 @@ def test_get_workflow_details_valid_team_project(client):
         assert response.content.decode("utf-8") == "{" + expected_reponse + "}"
         mock_auth.assert_called_with(token="bearer 1234", team_project="dummyteam")
         mock_log.assert_called_with("check_auth")
+        # the details fetched by check_auth are reused by the endpoint:
+        mock_engine.assert_called_once_with("workflow_123", "workflow_uid")
+
+
+def test_get_workflow_details_summary(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_details"
+    ) as mock_engine:
+        mock_auth.return_value = True
+        mock_engine.return_value = {
+            GEN3_USER_METADATA_LABEL: "dummyuser",
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam",
+            "phase": "Running",
+        }
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get(
+            "/status/workflow_123?uid=workflow_uid&view=summary", headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["phase"] == "Running"
+        mock_engine.assert_called_once_with(
+            "workflow_123", "workflow_uid", summary=True
+        )
+
+        response = client.get(
+            "/status/workflow_123?uid=workflow_uid&view=other", headers=headers
+        )
+        assert response.status_code == 422
+
+
+def test_get_workflow_details_conditional(client):
+    workflow_details = {
+        GEN3_USER_METADATA_LABEL: "dummyuser",
+        GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam",
+        "phase": "Succeeded",
+    }
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_details"
+    ) as mock_engine, patch.dict(
+        "argowrapper.routes.routes.argo_engine.workflow_location_cache",
+        {"workflow_uid": "archived_workflow"},
+    ), patch.dict(
+        "argowrapper.routes.routes.argo_engine.workflow_owner_labels_cache",
+        clear=True,
+    ), patch.dict(
+        "argowrapper.routes.routes.argo_engine.workflow_details_etag_cache",
+        clear=True,
+    ), patch(
+        "argowrapper.routes.routes.log_auth_check_type"
+    ) as mock_log:
+        mock_auth.return_value = True
+        mock_engine.return_value = workflow_details
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get("/status/workflow_123?uid=workflow_uid", headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        # the owner labels aren't indexed yet (the engine is mocked), so the details are fetched:
+        response = client.get(
+            "/status/workflow_123?uid=workflow_uid",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert mock_engine.call_count == 2
+
+        # once they are, a finished workflow is not fetched at all:
+        argowrapper.routes.routes.argo_engine.workflow_owner_labels_cache[
+            ("workflow_123", "workflow_uid")
+        ] = {
+            GEN3_USER_METADATA_LABEL: "dummyuser",
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam",
+        }
+        response = client.get(
+            "/status/workflow_123?uid=workflow_uid",
+            headers={**headers, "If-None-Match": f'"other", W/{etag}'},
+        )
+        assert response.status_code == 304
+        assert mock_engine.call_count == 2
+        mock_log.assert_called_with("check_auth_if_not_modified")
+        mock_auth.assert_called_with(token="bearer 1234", team_project="dummyteam")
+
+        # access is still checked:
+        mock_auth.return_value = False
+        response = client.get(
+            "/status/workflow_123?uid=workflow_uid",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 401
+
+
+def test_get_user_workflows_conditional(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_for_user"
+    ) as mock_get_workflows_for_user:
+        mock_auth.return_value = True
+        mock_get_workflows_for_user.return_value = [{"uid": "uid_1"}]
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get("/workflows", headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        response = client.get("/workflows", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        mock_get_workflows_for_user.return_value = [{"uid": "uid_1"}, {"uid": "uid_2"}]
+        response = client.get("/workflows", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+def test_cancel_workflows_batch(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_owner_labels"
+    ) as mock_owner_labels, patch(
+        "argowrapper.routes.routes.argo_engine.cancel_workflows"
+    ) as mock_cancel:
+
+        async def mock_authenticate(token, team_project=None):
+            return team_project != "otherteam"
+
+        mock_auth.side_effect = mock_authenticate
+        mock_owner_labels.return_value = [
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam"},
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "otherteam"},
+            Exception("could not get labels of wf_3, workflow does not exist"),
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam"},
+        ]
+        mock_cancel.return_value = [
+            "wf_1 canceled sucessfully",
+            Exception("could not cancel wf_4 because workflow not found"),
+        ]
+        response = client.post(
+            "/cancel/batch",
+            json={
+                "workflows": [
+                    {"workflow_name": f"wf_{index}", "uid": f"uid_{index}"}
+                    for index in range(1, 5)
+                ]
+            },
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert results[0]["result"] == "wf_1 canceled sucessfully"
+        assert "team_project access not granted" in results[1]["error"]
+        assert results[2]["error"].endswith("workflow does not exist")
+        assert results[3]["error"].endswith("workflow not found")
+        assert "result" not in results[3]
+        # only the workflows the user may access are canceled:
+        mock_cancel.assert_called_once_with(["wf_1", "wf_4"])
+        assert mock_auth.call_count == 3
+
+        response = client.post(
+            "/cancel/batch",
+            json={"workflows": []},
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 400
+
+
+def test_get_workflows_details_batch(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_details"
+    ) as mock_engine, patch(
+        "argowrapper.routes.routes.log_auth_check_type"
+    ) as mock_log:
+
+        async def mock_authenticate(token, team_project=None):
+            return team_project != "otherteam"
+
+        mock_auth.side_effect = mock_authenticate
+        mock_engine.return_value = [
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam", "phase": "Running"},
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam", "phase": "Failed"},
+            {GEN3_TEAM_PROJECT_METADATA_LABEL: "otherteam", "phase": "Running"},
+            Exception("could not get status of wf_4, workflow does not exist"),
+        ]
+        request_body = {
+            "workflows": [
+                {"workflow_name": f"wf_{index}", "uid": f"uid_{index}"}
+                for index in range(1, 5)
+            ]
+        }
+        response = client.post(
+            "/status/batch",
+            json=request_body,
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert [result["workflow_name"] for result in results] == [
+            "wf_1",
+            "wf_2",
+            "wf_3",
+            "wf_4",
+        ]
+        assert results[0]["details"]["phase"] == "Running"
+        assert results[1]["details"]["phase"] == "Failed"
+        assert "details" not in results[2]
+        assert "team_project access not granted" in results[2]["error"]
+        assert results[3]["error"].endswith("workflow does not exist")
+        mock_engine.assert_called_once_with(
+            [
+                ("wf_1", "uid_1"),
+                ("wf_2", "uid_2"),
+                ("wf_3", "uid_3"),
+                ("wf_4", "uid_4"),
+            ],
+            "bearer 1234",
+            None,
+        )
+        mock_log.assert_called_with("check_auth_and_optional_team_projects")
+        # the user is authenticated once, and each team project is checked once:
+        assert mock_auth.call_count == 3
+
+        # the given team projects are checked once, by the decorator:
+        mock_auth.reset_mock()
+        mock_engine.reset_mock()
+        response = client.post(
+            "/status/batch?team_projects=dummyteam",
+            json=request_body,
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 200
+        assert mock_engine.call_args.args[2] == ["dummyteam"]
+        assert mock_auth.call_count == 2
+
+        response = client.post(
+            "/status/batch?team_projects=otherteam",
+            json=request_body,
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 401
+
+        for invalid_request_body in (
+            {},
+            {"workflows": []},
+            {"workflows": [{"uid": "uid_1"}]},
+            {"workflows": [{"workflow_name": "wf"}] * (MAX_WORKFLOWS_BATCH_SIZE + 1)},
+        ):
+            response = client.post(
+                "/status/batch",
+                json=invalid_request_body,
+                headers={"Authorization": "bearer 1234"},
+            )
+            assert response.status_code == 400
+
+        mock_auth.side_effect = None
+        mock_auth.return_value = False
+        response = client.post(
+            "/status/batch",
+            json=request_body,
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 401
 
 
 def test_get_workflow_details_valid_user(client):
@@ -284,7 +619,7 @@ def test_get_workflow_details_for_unauthorized_user_scenario2(client):
 
 
 def test_get_workflow_details_for_unauthorized_user_scenario3(client):
-    def mock_authenticate(token, team_project=None):
+    async def mock_authenticate(token, team_project=None):
         """dummy implementation that fails if team_project is set"""
         if team_project:
             return False
@@ -322,7 +657,7 @@ def test_cancel_workflow(client):
     with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
         "argowrapper.routes.routes.argo_engine.cancel_workflow"
     ) as mock_engine, patch(
-        "argowrapper.routes.routes.argo_engine.get_workflow_details"
+        "argowrapper.routes.routes.argo_engine.get_workflow_owner_labels"
     ) as mock_workflow_details, patch(
         "argowrapper.routes.routes.log_auth_check_type"
     ) as mock_log:
@@ -341,7 +676,7 @@ def test_cancel_workflow(client):
         assert response.status_code == 200
         assert response.content.decode("utf-8") == '"workflow_123 canceled sucessfully"'
         mock_auth.assert_called_with(token="bearer 1234", team_project="dummyteam")
-        mock_log.assert_called_with("check_auth")
+        mock_log.assert_called_with("check_auth_workflow_owner")
 
 
 def test_retry_workflow(client):
@@ -354,7 +689,7 @@ def test_retry_workflow(client):
     ) as mock_engine, patch(
         "argowrapper.routes.routes.argo_engine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_check_billing_id, patch(
-        "requests.get"
+        "argowrapper.routes.routes.argo_engine.http_client.get"
     ) as mock_requests, patch(
         "argowrapper.routes.routes.argo_engine.check_user_monthly_workflow_cap"
     ) as mock_check_monthly_cap:
@@ -390,6 +725,7 @@ def test_retry_workflow(client):
             "template_version": "test_template",
             "workflow_name": "test_workflow_123",
         }
+        mock_workflow_details.assert_called_once_with("workflow_123", "wf_uid")
 
 
 def test_get_user_workflows(client):
@@ -454,7 +790,7 @@ def test_get_user_workflows_error_scenario2(client):
 
 
 def test_get_user_workflows_with_team_projects(client):
-    def mock_get_workflows_for_team_projects(team_projects):
+    async def mock_get_workflows_for_team_projects(team_projects):
         # dummy implementation...but allows us to check if the team_projects were
         # successfully parsed from the request parameters:
         return team_projects
@@ -479,11 +815,134 @@ def test_get_user_workflows_with_team_projects(client):
         mock_auth.assert_called_with(token="bearer 1234", team_project="team2")
 
 
+def test_get_user_workflows_page(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_page"
+    ) as mock_get_workflows_page:
+        mock_auth.return_value = True
+        mock_get_workflows_page.return_value = {
+            "items": [{"uid": "uid_1"}],
+            "continue": "token_2",
+        }
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get(
+            "/workflows?team_projects=team1&limit=10&continue=token_1", headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json() == {"items": [{"uid": "uid_1"}], "continue": "token_2"}
+        assert mock_get_workflows_page.call_args.args == (
+            ["team1"],
+            "bearer 1234",
+            10,
+            "token_1",
+        )
+        workflow_list_filter = mock_get_workflows_page.call_args.kwargs[
+            "workflow_list_filter"
+        ]
+        assert workflow_list_filter.phases is None
+        assert workflow_list_filter.sort_by == "submittedAt"
+        assert workflow_list_filter.descending
+
+        client.get("/workflows?continue=token_1", headers=headers)
+        assert mock_get_workflows_page.call_args.args == (
+            None,
+            "bearer 1234",
+            DEFAULT_WORKFLOWS_PAGE_SIZE,
+            "token_1",
+        )
+
+        mock_get_workflows_page.side_effect = ValueError("invalid continue token")
+        response = client.get("/workflows?limit=10&continue=invalid", headers=headers)
+        assert response.status_code == 400
+
+        response = client.get("/workflows?limit=0", headers=headers)
+        assert response.status_code == 422
+
+
+def test_get_user_workflows_filtered(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_page"
+    ) as mock_get_workflows_page:
+        mock_auth.return_value = True
+        mock_get_workflows_page.return_value = {
+            "items": [{"uid": "uid_1"}],
+            "continue": None,
+        }
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get(
+            "/workflows?phases=Failed&phases=Canceled&submitted_after=2023-03-01T00:00:00%2B02:00"
+            "&submitted_before=2023-04-01&wf_name=Test&sort_by=startedAt&sort_order=asc",
+            headers=headers,
+        )
+        # without pagination, the list is returned as is:
+        assert response.status_code == 200
+        assert response.json() == [{"uid": "uid_1"}]
+        assert mock_get_workflows_page.call_args.args == (
+            None,
+            "bearer 1234",
+            None,
+            None,
+        )
+        workflow_list_filter = mock_get_workflows_page.call_args.kwargs[
+            "workflow_list_filter"
+        ]
+        assert workflow_list_filter.phases == {"Failed", "Canceled"}
+        assert workflow_list_filter.submitted_after == "2023-02-28T22:00:00Z"
+        assert workflow_list_filter.submitted_before == "2023-04-01T00:00:00Z"
+        assert workflow_list_filter.wf_name_contains == "test"
+        assert workflow_list_filter.sort_by == "startedAt"
+        assert not workflow_list_filter.descending
+
+        response = client.get("/workflows?sort_by=wf_name", headers=headers)
+        assert response.status_code == 400
+        response = client.get("/workflows?sort_order=up", headers=headers)
+        assert response.status_code == 422
+
+
+def test_get_user_workflows_streamed(client):
+    workflows = [{"uid": "uid_1", "wf_name": "a"}, {"uid": "uid_2", "wf_name": "b"}]
+
+    async def mock_get_workflows_stream(
+        team_projects, auth_header, workflow_list_filter
+    ):
+        async def _iter_workflows():
+            for workflow in workflows:
+                yield workflow
+
+        return _iter_workflows()
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflows_stream",
+        mock_get_workflows_stream,
+    ):
+        mock_auth.return_value = True
+        headers = {"Authorization": "bearer 1234"}
+        response = client.get("/workflows?stream=json", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/json"
+        assert (
+            response.text
+            == '[{"uid":"uid_1","wf_name":"a"},{"uid":"uid_2","wf_name":"b"}]'
+        )
+
+        response = client.get("/workflows?stream=ndjson", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == workflows
+
+        workflows.clear()
+        response = client.get("/workflows?stream=json", headers=headers)
+        assert response.json() == []
+
+        response = client.get("/workflows?stream=json&limit=10", headers=headers)
+        assert response.status_code == 400
+
+
 def test_get_workflow_logs(client):
     with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
         "argowrapper.routes.routes.argo_engine.get_workflow_logs"
     ) as mock_engine, patch(
-        "argowrapper.routes.routes.argo_engine.get_workflow_details"
+        "argowrapper.routes.routes.argo_engine.get_workflow_owner_labels"
     ) as mock_workflow_details, patch(
         "argowrapper.routes.routes.log_auth_check_type"
     ) as mock_log:
@@ -510,7 +969,237 @@ def test_get_workflow_logs(client):
             response.content.decode("utf-8")
             == '[{"name":"wf_name","step_template":"wf_template","error_message":"wf_error"}]'
         )
-        mock_log.assert_called_with("check_auth")
+        mock_log.assert_called_with("check_auth_workflow_owner")
+        mock_engine.assert_called_with("wf_123", "wf_uid", 1)
+
+        client.get(
+            "/logs/wf_123?uid=wf_uid&max_failed_nodes=5",
+            headers={"Authorization": "bearer 1234"},
+        )
+        mock_engine.assert_called_with("wf_123", "wf_uid", 5)
+
+        client.get(
+            "/logs/wf_123?uid=wf_uid&all_failed_nodes=true",
+            headers={"Authorization": "bearer 1234"},
+        )
+        mock_engine.assert_called_with("wf_123", "wf_uid", None)
+
+
+def test_get_workflow_logs_mismatched_uid(client):
+    """the name of the user's own workflow cannot be combined with the uid of
+    another workflow, which the logs are read by"""
+
+    def handler(request):
+        assert request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}/own_wf"
+        return httpx.Response(
+            200,
+            json={
+                "metadata": {
+                    "name": "own_wf",
+                    "uid": "own_uid",
+                    "labels": {GEN3_USER_METADATA_LABEL: "user-test"},
+                }
+            },
+        )
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_logs"
+    ) as mock_engine, patch(
+        "argowrapper.routes.routes.argo_engine.http_client",
+        httpx.AsyncClient(
+            base_url="http://argo", transport=httpx.MockTransport(handler)
+        ),
+    ):
+        mock_auth.return_value = True
+        response = client.get(
+            "/logs/own_wf?uid=other_uid",
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 401
+        mock_engine.assert_not_called()
+
+
+def test_get_workflow_node_log(client):
+    log = b"line 1\nline 2\nline 3\n"
+
+    def handler(request):
+        assert request.url.path == "/artifacts-by-uid/wf_uid/wf_123-1234/main-logs"
+        return httpx.Response(200, content=log)
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_owner_labels"
+    ) as mock_workflow_details, patch(
+        "argowrapper.routes.routes.argo_engine.http_client",
+        httpx.AsyncClient(
+            base_url="http://argo", transport=httpx.MockTransport(handler)
+        ),
+    ), patch(
+        "argowrapper.routes.routes.log_auth_check_type"
+    ) as mock_log:
+        mock_auth.return_value = True
+        mock_workflow_details.return_value = {
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam"
+        }
+        headers = {"Authorization": "bearer 1234"}
+
+        response = client.get("/logs/wf_123/wf_123-1234?uid=wf_uid", headers=headers)
+        assert response.status_code == 200
+        assert response.content == log
+        mock_log.assert_called_with("check_auth_workflow_owner")
+
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid&tail_lines=1", headers=headers
+        )
+        assert response.status_code == 200
+        assert response.content == b"line 3\n"
+
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid",
+            headers={**headers, "Range": "bytes=7-12"},
+        )
+        assert response.status_code == 206
+        assert response.content == b"line 2"
+        assert response.headers["Content-Range"] == f"bytes 7-12/{len(log)}"
+
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid",
+            headers={**headers, "Range": "bytes=-7"},
+        )
+        assert response.status_code == 206
+        assert response.content == b"line 3\n"
+        assert response.headers["Content-Range"] == f"bytes 14-20/{len(log)}"
+
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid",
+            headers={**headers, "Range": "bytes=100-"},
+        )
+        assert response.status_code == 416
+
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid",
+            headers={**headers, "Range": "bytes=5-2"},
+        )
+        assert response.status_code == 416
+
+
+def test_get_workflow_node_log_not_found(client):
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_owner_labels"
+    ) as mock_workflow_details, patch(
+        "argowrapper.routes.routes.argo_engine.http_client",
+        httpx.AsyncClient(
+            base_url="http://argo",
+            transport=httpx.MockTransport(lambda request: httpx.Response(404)),
+        ),
+    ):
+        mock_auth.return_value = True
+        mock_workflow_details.return_value = {
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam"
+        }
+        response = client.get(
+            "/logs/wf_123/wf_123-1234?uid=wf_uid",
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 404
+
+
+def test_get_workflow_node_log_mismatched_uid(client):
+    """the name of the user's own workflow cannot be combined with the uid of
+    another workflow, which the node log is read by"""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(
+            200,
+            json={
+                "metadata": {
+                    "name": "own_wf",
+                    "uid": "own_uid",
+                    "labels": {GEN3_USER_METADATA_LABEL: "user-test"},
+                }
+            },
+        )
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.http_client",
+        httpx.AsyncClient(
+            base_url="http://argo", transport=httpx.MockTransport(handler)
+        ),
+    ):
+        mock_auth.return_value = True
+        response = client.get(
+            "/logs/own_wf/other_wf-1234?uid=other_uid",
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 401
+        # the artifact of the other workflow is not requested:
+        assert requests == [f"/api/v1/workflows/{ARGO_NAMESPACE}/own_wf"]
+
+
+def test_get_workflow_status_events(client):
+    phases = iter(["Running", "Succeeded"])
+
+    async def get_workflow_status(workflow_name, uid):
+        return {"name": workflow_name, "uid": uid, "phase": next(phases)}
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.get_workflow_owner_labels"
+    ) as mock_workflow_details, patch(
+        "argowrapper.routes.routes.workflow_status_watcher",
+        WorkflowStatusWatcher(get_workflow_status, poll_interval=0),
+    ), patch(
+        "argowrapper.routes.routes.log_auth_check_type"
+    ) as mock_log:
+        mock_auth.return_value = True
+        mock_workflow_details.return_value = {
+            GEN3_TEAM_PROJECT_METADATA_LABEL: "dummyteam"
+        }
+        response = client.get(
+            "/status/wf_123/events?uid=wf_uid",
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/event-stream")
+        assert response.text == (
+            'event: status\ndata: {"name": "wf_123", "uid": "wf_uid", "phase": "Running"}\n\n'
+            'event: status\ndata: {"name": "wf_123", "uid": "wf_uid", "phase": "Succeeded"}\n\n'
+        )
+        mock_log.assert_called_with("check_auth_workflow_owner")
+
+
+def test_get_workflow_status_events_mismatched_uid(client):
+    """the name of the user's own workflow cannot be combined with the uid of
+    another workflow, which the status is polled by"""
+
+    def handler(request):
+        assert request.url.path == f"/api/v1/workflows/{ARGO_NAMESPACE}/own_wf"
+        return httpx.Response(
+            200,
+            json={
+                "metadata": {
+                    "name": "own_wf",
+                    "uid": "own_uid",
+                    "labels": {GEN3_USER_METADATA_LABEL: "user-test"},
+                }
+            },
+        )
+
+    with patch("argowrapper.routes.routes.auth.authenticate") as mock_auth, patch(
+        "argowrapper.routes.routes.argo_engine.http_client",
+        httpx.AsyncClient(
+            base_url="http://argo", transport=httpx.MockTransport(handler)
+        ),
+    ), patch(
+        "argowrapper.routes.routes.workflow_status_watcher.subscribe"
+    ) as mock_subscribe:
+        mock_auth.return_value = True
+        response = client.get(
+            "/status/own_wf/events?uid=other_uid",
+            headers={"Authorization": "bearer 1234"},
+        )
+        assert response.status_code == 401
+        mock_subscribe.assert_not_called()
 
 
 def test_if_endpoints_are_set_to_the_right_check_auth(client):
@@ -530,13 +1219,13 @@ def test_if_endpoints_are_set_to_the_right_check_auth(client):
         mock_log.assert_called_with("check_auth")
 
         client.post("/cancel/workflow_123")
-        mock_log.assert_called_with("check_auth")
+        mock_log.assert_called_with("check_auth_workflow_owner")
 
         client.get("/workflows?team_projects=team1&team_projects=team2")
         mock_log.assert_called_with("check_auth_and_optional_team_projects")
 
         client.get("/logs/workflow_123?uid=workflow_uid")
-        mock_log.assert_called_with("check_auth")
+        mock_log.assert_called_with("check_auth_workflow_owner")
 
 
 def test_submit_workflow_with_billing_id_and_over_monthly_cap(client):
@@ -547,7 +1236,7 @@ def test_submit_workflow_with_billing_id_and_over_monthly_cap(client):
     ) as mock_check_billing_id, patch(
         "argowrapper.routes.routes.argo_engine.check_user_monthly_workflow_cap"
     ) as mock_check_monthly_cap, patch(
-        "requests.get"
+        "argowrapper.routes.routes.argo_engine.http_client.get"
     ) as mock_requests, mock.patch(
         "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict:
@@ -578,7 +1267,7 @@ def test_submit_workflow_over_monthly_cap(client):
     ) as mock_check_billing_id, patch(
         "argowrapper.routes.routes.argo_engine.check_user_monthly_workflow_cap"
     ) as mock_check_monthly_cap, patch(
-        "requests.get"
+        "argowrapper.routes.routes.argo_engine.http_client.get"
     ) as mock_requests, mock.patch(
         "argowrapper.engine.argo_engine.argo_engine_helper._get_argo_config_dict"
     ) as mock_config_dict:
@@ -609,7 +1298,7 @@ def test_submit_workflow_with_non_team_project_cohort(client):
     ) as mock_log, patch(
         "argowrapper.routes.routes.argo_engine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_check_billing_id, patch(
-        "requests.get"
+        "argowrapper.routes.routes.argo_engine.http_client.get"
     ) as mock_requests:
         mock_auth.return_value = True
         mock_engine.return_value = "workflow_123"
@@ -631,9 +1320,9 @@ def test_submit_workflow_with_non_team_project_cohort(client):
 
 def test_get_user_monthly_workflow(client):
     with patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.get_user_workflows_for_current_month"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.get_user_workflows_for_current_month"
     ) as mock_get_workflow, patch(
-        "argowrapper.engine.argo_engine.ArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
+        "argowrapper.engine.async_argo_engine.AsyncArgoEngine.check_user_info_for_billing_id_and_workflow_limit"
     ) as mock_check_billing_id:
         mock_get_workflow.return_value = [
             {"wf_name": "workflow1"},
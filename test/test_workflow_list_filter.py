@@ -0,0 +1,62 @@
+import pytest
+
+from argowrapper.constants import ARGO_WORKFLOW_PHASE_LABEL
+from argowrapper.engine.helpers.workflow_list_filter import WorkflowListFilter
+
+
+def _list_item(uid, created, started=None):
+    return {
+        "metadata": {"uid": uid, "creationTimestamp": created},
+        "status": {"startedAt": started},
+    }
+
+
+def test_workflow_list_filter_label_selector():
+    assert WorkflowListFilter().get_label_selector("user=a") == "user=a"
+    assert (
+        WorkflowListFilter(phases=["Succeeded", "Canceled"]).get_label_selector(
+            "user=a"
+        )
+        == f"user=a,{ARGO_WORKFLOW_PHASE_LABEL} in (Failed,Succeeded)"
+    )
+    # pending workflows may not have a phase label yet:
+    assert (
+        WorkflowListFilter(phases=["Pending", "Running"]).get_label_selector("user=a")
+        == "user=a"
+    )
+
+
+def test_workflow_list_filter_matches():
+    workflow_list_filter = WorkflowListFilter(
+        phases=["Canceled"],
+        submitted_after="2023-03-01T00:00:00Z",
+        submitted_before="2023-04-01T00:00:00Z",
+        wf_name_contains="My Run",
+    )
+    assert workflow_list_filter.matches_list_item(
+        _list_item("uid_1", "2023-03-01T00:00:00Z")
+    )
+    assert not workflow_list_filter.matches_list_item(
+        _list_item("uid_1", "2023-02-28T23:59:59Z")
+    )
+    assert not workflow_list_filter.matches_list_item(
+        _list_item("uid_1", "2023-04-01T00:00:00Z")
+    )
+    assert workflow_list_filter.matches({"phase": "Canceled", "wf_name": "my run 2"})
+    assert not workflow_list_filter.matches({"phase": "Failed", "wf_name": "my run"})
+    assert not workflow_list_filter.matches({"phase": "Canceled", "wf_name": None})
+
+
+def test_workflow_list_filter_sort_key():
+    item = _list_item("uid_1", "2023-03-01T00:00:00Z", "2023-03-01T00:01:00Z")
+    assert WorkflowListFilter().get_sort_key(item) == (
+        "2023-03-01T00:00:00Z",
+        "uid_1",
+    )
+    assert WorkflowListFilter(sort_by="startedAt").get_sort_key(item) == (
+        "2023-03-01T00:01:00Z",
+        "uid_1",
+    )
+    assert WorkflowListFilter(sort_by="finishedAt").get_sort_key(item) == ("", "uid_1")
+    with pytest.raises(ValueError):
+        WorkflowListFilter(sort_by="wf_name")
@@ -0,0 +1,47 @@
+import os
+
+from argowrapper.engine.helpers.workflow_logs_cache import WorkflowLogsCache
+
+WORKFLOW_LOGS = [{"name": "step_one_name(0)", "error_interpreted": "some error"}]
+
+
+def test_workflow_logs_cache_get_and_put(tmp_path):
+    cache = WorkflowLogsCache(str(tmp_path), max_bytes=1024 * 1024)
+    assert cache.get("wf_uid") is None
+
+    cache.put("wf_uid", WORKFLOW_LOGS)
+    assert cache.get("wf_uid") == WORKFLOW_LOGS
+    # entries are kept on disk, so they survive a restart:
+    assert WorkflowLogsCache(str(tmp_path), 1024 * 1024).get("wf_uid") == WORKFLOW_LOGS
+
+    # uids are not used as file names as is:
+    cache.put("../../wf_uid", [])
+    assert not os.path.exists(tmp_path.parent.parent / "wf_uid")
+    assert cache.get("../../wf_uid") == []
+
+
+def test_workflow_logs_cache_evicts_least_recently_used(tmp_path):
+    cache = WorkflowLogsCache(str(tmp_path), max_bytes=1024 * 1024)
+    os.utime(_put(cache, "uid_1"), (0, 300))
+    os.utime(_put(cache, "uid_2"), (0, 200))
+    # room for two entries only:
+    cache.max_bytes = 2 * os.path.getsize(cache._get_entry_path("uid_1"))
+
+    # reading marks uid_1 as recently used:
+    assert cache.get("uid_1") == WORKFLOW_LOGS
+
+    cache.put("uid_3", WORKFLOW_LOGS)
+    assert cache.get("uid_1") == WORKFLOW_LOGS
+    assert cache.get("uid_2") is None
+    assert cache.get("uid_3") == WORKFLOW_LOGS
+
+
+def test_workflow_logs_cache_disabled():
+    cache = WorkflowLogsCache("", max_bytes=1024)
+    cache.put("wf_uid", WORKFLOW_LOGS)
+    assert cache.get("wf_uid") is None
+
+
+def _put(cache, uid):
+    cache.put(uid, WORKFLOW_LOGS)
+    return cache._get_entry_path(uid)
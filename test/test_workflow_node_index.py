@@ -0,0 +1,52 @@
+from argowrapper.engine.argo_engine import ArgoEngineBase
+from argowrapper.engine.helpers.workflow_node_index import WorkflowNodeIndex
+
+NODES = {
+    "node_1": {
+        "name": "wf.step-b",
+        "type": "Retry",
+        "phase": "Failed",
+        "startedAt": "2023-03-22T17:00:00Z",
+    },
+    "node_2": {
+        "name": "wf.step-a",
+        "type": "Retry",
+        "phase": "Failed",
+        "startedAt": "2023-03-22T09:00:00Z",
+    },
+    "node_3": {"name": "wf.step-a(0)", "type": "Pod", "phase": "Failed"},
+    "node_4": {"name": "wf.step-b(0)", "type": "Pod", "phase": "Error"},
+    "node_5": {
+        "name": "wf.step-c",
+        "type": "Retry",
+        "phase": "Succeeded",
+        "startedAt": "2023-03-22T08:00:00Z",
+    },
+}
+
+
+def test_workflow_node_index():
+    node_index = WorkflowNodeIndex(NODES)
+    assert [node_id for node_id, _ in node_index.get_nodes("Retry", "Failed")] == [
+        "node_1",
+        "node_2",
+    ]
+    assert node_index.get_node_by_name("wf.step-b(0)") == ("node_4", NODES["node_4"])
+    assert node_index.get_node_by_name("wf.unknown") is None
+    assert [
+        node_id for node_id, _ in node_index.get_nodes_by_start_time("Retry", "Failed")
+    ] == ["node_2", "node_1"]
+    assert node_index.get_nodes_by_start_time("Retry", "Failed", 1)[0][0] == "node_2"
+    assert node_index.get_nodes_by_start_time("Pod", "Running") == []
+    assert WorkflowNodeIndex(None).get_nodes("Retry", "Failed") == []
+
+
+def test_get_failed_pods():
+    assert ArgoEngineBase._get_failed_pods("wf_uid", NODES) == [
+        ("node_3", NODES["node_3"])
+    ]
+    assert ArgoEngineBase._get_failed_pods("wf_uid", NODES, None) == [
+        ("node_3", NODES["node_3"]),
+        ("node_4", NODES["node_4"]),
+    ]
+    assert ArgoEngineBase._get_failed_pods("wf_uid", {}) == []
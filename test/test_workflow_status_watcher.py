@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from argowrapper.engine.helpers.workflow_status_watcher import WorkflowStatusWatcher
+
+
+def _status_source(phases):
+    """returns a fake status function that returns the given phases one poll at a time"""
+    calls = []
+
+    async def get_workflow_status(workflow_name, uid):
+        calls.append((workflow_name, uid))
+        phase = phases[min(len(calls), len(phases)) - 1]
+        if isinstance(phase, Exception):
+            raise phase
+        return {"name": workflow_name, "uid": uid, "phase": phase}
+
+    return get_workflow_status, calls
+
+
+async def _collect(subscription):
+    return [status async for status in subscription]
+
+
+@pytest.mark.asyncio
+async def test_workflow_status_watcher_pushes_changes_until_terminal_phase():
+    get_workflow_status, calls = _status_source(
+        ["Pending", "Running", "Running", "Succeeded"]
+    )
+    watcher = WorkflowStatusWatcher(get_workflow_status, poll_interval=0)
+    statuses = await _collect(watcher.subscribe("wf_1", "uid_1"))
+    assert [status["phase"] for status in statuses] == [
+        "Pending",
+        "Running",
+        "Succeeded",
+    ]
+    assert len(calls) == 4
+    assert not watcher._watches
+
+
+@pytest.mark.asyncio
+async def test_workflow_status_watcher_stops_at_canceled_workflow():
+    get_workflow_status, calls = _status_source(["Running", "Canceling", "Canceled"])
+    watcher = WorkflowStatusWatcher(get_workflow_status, poll_interval=0)
+    statuses = await _collect(watcher.subscribe("wf_1", "uid_1"))
+    assert [status["phase"] for status in statuses] == [
+        "Running",
+        "Canceling",
+        "Canceled",
+    ]
+    assert len(calls) == 3
+    assert not watcher._watches
+
+
+@pytest.mark.asyncio
+async def test_workflow_status_watcher_shares_one_poll_between_subscribers():
+    get_workflow_status, calls = _status_source(["Running"] * 3 + ["Failed"])
+    watcher = WorkflowStatusWatcher(get_workflow_status, poll_interval=0.01)
+    first, second = await asyncio.gather(
+        _collect(watcher.subscribe("wf_1", "uid_1")),
+        _collect(watcher.subscribe("wf_1", "uid_1")),
+    )
+    assert [status["phase"] for status in first] == ["Running", "Failed"]
+    assert first == second
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_workflow_status_watcher_stops_polling_without_subscribers():
+    get_workflow_status, calls = _status_source(["Running"])
+    watcher = WorkflowStatusWatcher(get_workflow_status, poll_interval=0.01)
+    subscription = watcher.subscribe("wf_1", "uid_1", heartbeat_interval=0.05)
+    assert (await subscription.__anext__())["phase"] == "Running"
+    # nothing changes, so the next item is a heartbeat:
+    assert await subscription.__anext__() is None
+    watch = watcher._watches[("wf_1", "uid_1")]
+    await subscription.aclose()
+    await asyncio.sleep(0)
+    assert watch.task.cancelled()
+    assert not watcher._watches
+
+
+@pytest.mark.asyncio
+async def test_workflow_status_watcher_ends_on_error():
+    get_workflow_status, _ = _status_source([Exception("workflow does not exist")])
+    watcher = WorkflowStatusWatcher(get_workflow_status, poll_interval=0)
+    assert await _collect(watcher.subscribe("wf_1", "uid_1")) == [
+        {"error": "workflow does not exist"}
+    ]